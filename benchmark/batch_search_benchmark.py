@@ -0,0 +1,42 @@
+"""
+Compares resolving a batch of queries with ItemHandler.search_many against a loop of ItemHandler.ranked_search calls,
+and reports how often both return the very same results for a query (which they should, always).
+
+Run from the repository's root (item list paths are relative to it):
+    python -m benchmark.batch_search_benchmark
+"""
+
+import random
+import time
+
+from benchmark.item_search_benchmark import misspell
+from src.handler.item import ItemHandler
+
+QUERIES = 1_000
+
+
+def main() -> None:
+    random.seed(0)
+    item_handler = ItemHandler()
+    items = list(item_handler.catalog.items)
+    item_handler._index(items)  # start from an empty search cache
+
+    queries = [misspell(random.choice(items).name) for _ in range(QUERIES)]
+
+    start = time.perf_counter()
+    looped = [item_handler.ranked_search(query) for query in queries]
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = item_handler.search_many(queries)
+    after = time.perf_counter() - start
+
+    agreements = sum(1 for a, b in zip(looped, batched) if a == b)
+    print(
+        "{} queries   ranked_search loop: {:>8.1f} ms   search_many: {:>7.1f} ms   speedup: {:>5.1f}x   "
+        "identical results: {:.1%}".format(QUERIES, before * 1000, after * 1000, before / after, agreements / QUERIES)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares the catalog's cold start: parsing the JSON item list (with the former quadratic collision check, and with the
+current linear one) against loading the compiled snapshot.
+
+Run from the repository's root (item list paths are relative to it):
+    python -m benchmark.catalog_snapshot_benchmark
+"""
+
+import json
+import os
+import tempfile
+import timeit
+from typing import List
+
+from src.entity.item import Item
+from src.handler.item import ITEM_LIST_PATH, ItemHandler
+from src.index.snapshot import CatalogSnapshot
+
+REPETITIONS = 5
+
+
+def quadratic_read_item_list() -> List[Item]:
+    """ItemHandler's item list parsing as it was before the snapshot: every insert scans every loaded item."""
+    items: List[Item] = list()
+    with open(ITEM_LIST_PATH) as json_file:
+        for i in json.load(json_file):
+            if i["precio"] != "-":
+                item2add = Item(i["nombre"], i["precio"])
+                if any(item2add.uid == item.uid for item in items):
+                    raise Exception("Item UID collision detected with item {}.".format(item2add))
+                items.append(item2add)
+    return items
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = CatalogSnapshot(ITEM_LIST_PATH, os.path.join(directory, "items.snapshot"))
+        _, from_snapshot = snapshot.load(ItemHandler._read_item_list)  # compile it
+        assert not from_snapshot
+
+        timings = {
+            "json, quadratic check": quadratic_read_item_list,
+            "json, linear check": ItemHandler._read_item_list,
+            "snapshot": lambda: snapshot.load(ItemHandler._read_item_list),
+        }
+
+        for label, load in timings.items():
+            elapsed = min(timeit.repeat(load, number=1, repeat=REPETITIONS))
+            print("{:<24} {:>8.3f} ms".format(label, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measures a burst of concurrent $sell commands against durable storages (the journal, fsync'ed on every write, and
+SQLite): every command writing on its own, versus all of them going through group commit.
+
+Run from the repository's root:
+    python -m benchmark.group_commit_benchmark
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from typing import Callable
+
+from src.entity.sale import Sale
+from src.storage.group_commit import GroupCommitter
+from src.storage.journal_sale_storage import JournalSaleStorage
+from src.storage.sale_storage import SaleStorage
+from src.storage.sqlite_sale_storage import SQLiteSaleStorage
+
+COMMANDS = 2000
+WINDOW = 0.01
+MAX_BATCH = 100
+
+
+def new_sale() -> Sale:
+    return Sale("0000002A", 1, 100, "seller#0001", 1234, 1000.0, 2000.0)
+
+
+async def one_by_one(storage: SaleStorage) -> None:
+    async def sell() -> None:
+        storage.insert(new_sale())  # blocks the event loop for a whole write
+
+    await asyncio.gather(*(sell() for _ in range(COMMANDS)))
+
+
+async def grouped(storage: SaleStorage) -> str:
+    committer = GroupCommitter(storage, window=WINDOW, max_batch=MAX_BATCH)
+    await asyncio.gather(*(committer.insert(new_sale()) for _ in range(COMMANDS)))
+    committer.close()
+    return str(committer.stats)
+
+
+def measure(label: str, build_storage: Callable[[str], SaleStorage]) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        storage = build_storage(os.path.join(directory, "one_by_one"))
+        start = time.perf_counter()
+        asyncio.run(one_by_one(storage))
+        print("{:<8} one by one   {:>8.1f} ms".format(label, (time.perf_counter() - start) * 1000))
+        storage.close()
+
+        storage = build_storage(os.path.join(directory, "grouped"))
+        start = time.perf_counter()
+        stats = asyncio.run(grouped(storage))
+        print("{:<8} group commit {:>8.1f} ms ({})".format(label, (time.perf_counter() - start) * 1000, stats))
+        storage.close()
+
+
+def main() -> None:
+    print("{} concurrent $sell commands".format(COMMANDS))
+    measure("journal", lambda path: JournalSaleStorage(path + ".journal"))
+    measure("sqlite", lambda path: SQLiteSaleStorage(path + ".sqlite3"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compares the indexed ItemCatalog lookups against the linear scans they replaced.
+
+Run from the repository's root (item list paths are relative to it):
+    python -m benchmark.item_catalog_benchmark
+"""
+
+import random
+import timeit
+from typing import List, Optional
+
+from unidecode import unidecode
+
+from src.entity.item import Item
+from src.handler.item import ItemHandler
+
+SALES_TO_RENDER = 500
+REPETITIONS = 5
+
+
+def linear_uid_search(items: List[Item], uid: str) -> Optional[Item]:
+    return next((item for item in items if item.uid.__eq__(uid)), None)
+
+
+def linear_name_search(items: List[Item], sanitized_name: str) -> Optional[Item]:
+    return next((item for item in items if unidecode(item.name.lower()).__eq__(sanitized_name)), None)
+
+
+def main() -> None:
+    item_handler = ItemHandler()
+    catalog = item_handler.catalog
+    items = list(catalog.items)
+
+    # emulate a $list of SALES_TO_RENDER sales, each one resolving its item by UID
+    uids = [random.choice(items).uid for _ in range(SALES_TO_RENDER)]
+    names = [random.choice(items).sanitized_name for _ in range(SALES_TO_RENDER)]
+
+    def report(label: str, before: float, after: float) -> None:
+        print(
+            "{:<24} linear: {:>9.3f} ms   indexed: {:>9.3f} ms   speedup: {:>8.1f}x".format(
+                label, before * 1000, after * 1000, before / after
+            )
+        )
+
+    print("Catalog size: {} items; {} lookups per run".format(len(catalog), SALES_TO_RENDER))
+
+    before = min(timeit.repeat(lambda: [linear_uid_search(items, uid) for uid in uids], number=1, repeat=REPETITIONS))
+    after = min(timeit.repeat(lambda: [catalog.get_by_uid(uid) for uid in uids], number=1, repeat=REPETITIONS))
+    report("uid lookup", before, after)
+
+    before = min(timeit.repeat(lambda: [linear_name_search(items, n) for n in names], number=1, repeat=REPETITIONS))
+    after = min(timeit.repeat(lambda: [catalog.get_by_sanitized_name(n) for n in names], number=1, repeat=REPETITIONS))
+    report("exact name lookup", before, after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Measures ItemHandler.search's latency as the catalog grows, against the full-scan pipeline it replaced, and reports
+the recall of both: how often a misspelled item name still yields the intended item.
+
+The catalog is grown synthetically out of resources/items.json, emulating modded servers' item lists.
+
+Run from the repository's root (item list paths are relative to it):
+    python -m benchmark.item_search_benchmark
+"""
+
+import difflib
+import itertools
+import random
+import time
+from typing import List, Set
+
+from unidecode import unidecode
+
+from src.entity.item import Item
+from src.handler.item import RANKED_SEARCH_RESULTS, ItemHandler
+
+CATALOG_SIZES = [1_000, 10_000, 30_000]
+QUERIES = 50
+
+VARIANTS = ["+1", "+2", "+3", "de Fuego", "de Hielo", "Reforzada", "Elfica", "Oscura", "Antigua", "Legendaria"]
+
+
+def full_scan_search(items: List[Item], search_param: str) -> Set[Item]:
+    """ItemHandler.search as it was before indexing: substring filter plus SequenceMatcher over every item."""
+    search_param = unidecode(search_param.lower())
+
+    substring_name_matches = {item for item in items if search_param in item.sanitized_name}
+    fuzzy_name_matches: List[Item] = list()
+    for item in items:
+        if len(fuzzy_name_matches) > 100:
+            break
+        if difflib.SequenceMatcher(None, search_param, item.sanitized_name).ratio() >= 0.6:
+            fuzzy_name_matches.append(item)
+
+    return substring_name_matches.union(fuzzy_name_matches)
+
+
+def grow_catalog(base: List[Item], size: int) -> List[Item]:
+    items = list(base)
+    for variant in itertools.chain(VARIANTS, itertools.count()):
+        for item in base:
+            if len(items) >= size:
+                return items
+            items.append(Item("{} {}".format(item.name, variant), item.base_price))
+    return items
+
+
+def misspell(name: str) -> str:
+    chars = list(name)
+    position = random.randrange(len(chars))
+    chars[position] = random.choice("aeiourstln")
+    return "".join(chars)
+
+
+def main() -> None:
+    random.seed(0)
+    item_handler = ItemHandler()
+    base = list(item_handler.catalog.items)
+
+    for size in CATALOG_SIZES:
+        items = grow_catalog(base, size)
+        item_handler._index(items)
+
+        intended = random.sample(base, QUERIES)
+        queries = [misspell(item.name) for item in intended]
+
+        start = time.perf_counter()
+        expected = [full_scan_search(items, query) for query in queries]
+        before = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = [item_handler.search(query) for query in queries]
+        after = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ranked = [item_handler.ranked_search(query) for query in queries]
+        ranked_time = time.perf_counter() - start
+
+        print(
+            "{:>6} items   full scan: {:>8.3f} ms/query ({:.0%} recall)   indexed: {:>7.3f} ms/query ({:.0%} recall)"
+            "   ranked top-{}: {:>7.3f} ms/query ({:.0%} best match)   speedup: {:>6.1f}x".format(
+                len(items),
+                before * 1000 / len(queries),
+                sum(item in result for item, result in zip(intended, expected)) / len(queries),
+                after * 1000 / len(queries),
+                sum(item in result for item, result in zip(intended, actual)) / len(queries),
+                RANKED_SEARCH_RESULTS,
+                ranked_time * 1000 / len(queries),
+                sum(result[0].item is item for item, result in zip(intended, ranked) if result) / len(queries),
+                before / after,
+            )
+        )
+
+    item_handler._index(base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures splitting a listing of 10k sales into Discord messages: the former textwrap-based partitioning (which re-flows
+the listing, splitting sales across messages) against packing whole lines into messages and into embeds. Reports the
+time taken, the amount of messages (or embeds), and how many sales ended up split across two of them.
+
+Run from the repository's root (item list paths are relative to it):
+    python -m benchmark.message_packing_benchmark
+"""
+
+import random
+import textwrap
+import timeit
+from datetime import datetime
+from typing import Callable, List, Set
+
+from src.entity.sale import Sale
+from src.handler.item import ItemHandler
+from src.i18n.i18n import LOCALE_ES_AR, I18n
+from src.outbound.dispatcher import MESSAGE_MAX_LENGTH
+from src.outbound.packer import pack_embeds, pack_lines
+from src.render.sale_renderer import SaleRenderer
+
+SALES = 10_000
+REPETITIONS = 5
+
+
+def build_lines() -> List[str]:
+    rng = random.Random(42)
+    item_uids = [item.uid for item in ItemHandler().catalog]
+    now = datetime.today().timestamp()
+    sales = [
+        Sale(rng.choice(item_uids), rng.randint(1, 1000), rng.randint(1, 100_000), "seller#0001", 1234, now, now + 1)
+        for _ in range(SALES)
+    ]
+    return list(SaleRenderer().render_lines(sales))
+
+
+def former_partition(lines: List[str]) -> List[str]:
+    """CommandHandler.send_partitioned_message as it was before packing lines."""
+    return textwrap.wrap(text="\n".join(lines), width=MESSAGE_MAX_LENGTH, replace_whitespace=False)
+
+
+def packed_messages(lines: List[str]) -> List[str]:
+    return list(pack_lines(lines))
+
+
+def packed_embeds(lines: List[str]) -> List[str]:
+    return ["\n".join(fields) for fields in pack_embeds(lines)]
+
+
+def split_lines(chunks: List[str], lines: List[str]) -> int:
+    """Counts the lines that aren't whole within a single chunk."""
+    whole: Set[str] = {line for chunk in chunks for line in chunk.split("\n")}
+    return sum(1 for line in lines if line not in whole)
+
+
+def measure(label: str, partition: Callable[[List[str]], List[str]], lines: List[str]) -> None:
+    elapsed = min(timeit.repeat(lambda: partition(lines), number=1, repeat=REPETITIONS))
+    chunks = partition(lines)
+    print(
+        "{:<16} {:>8.2f} ms {:>6} chunks {:>6} split sales".format(
+            label, elapsed * 1000, len(chunks), split_lines(chunks, lines)
+        )
+    )
+
+
+def main() -> None:
+    I18n().with_lang(LOCALE_ES_AR).init()
+    lines = build_lines()
+
+    print("Partitioning {} sales ({} characters)".format(SALES, sum(len(line) + 1 for line in lines) - 1))
+    measure("former textwrap", former_partition, lines)
+    measure("packed messages", packed_messages, lines)
+    measure("packed embeds", packed_embeds, lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Measures the memory footprint and allocation cost of a large market: parsing 100k persisted sales into Sale instances
+(as every listing does) and rendering them all. The former dict-backed Sale is compared against the current slotted one.
+
+Run from the repository's root (item list paths are relative to it):
+    python -m benchmark.sale_memory_benchmark
+"""
+
+import gc
+import random
+import timeit
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from src.entity.sale import Sale
+from src.handler.item import ItemHandler
+from src.i18n.i18n import LOCALE_EN, I18n
+
+SALES = 100_000
+SELLERS = 500
+REPETITIONS = 3
+
+
+class DictSale:
+    """Sale as it was before: a plain class with a per-instance __dict__, which works dates out on every render."""
+
+    def __init__(
+        self,
+        item_uid: str,
+        quantity: int,
+        price: int,
+        seller: str,
+        seller_discord_id: int,
+        from_date_timestamp: float,
+        to_date_timestamp: float,
+        sale_uid: str,
+    ):
+        self._item_uid = item_uid
+        self._quantity = quantity
+        self._price = price
+        self._seller = seller
+        self._seller_discord_id = seller_discord_id
+        self._from_date_timestamp = from_date_timestamp
+        self._to_date_timestamp = to_date_timestamp
+        self._sale_uid = sale_uid
+
+    @staticmethod
+    def from_dict(dic: Dict) -> "DictSale":
+        return DictSale(
+            item_uid=dic["_item_uid"],
+            quantity=dic["_quantity"],
+            price=dic["_price"],
+            seller=dic["_seller"],
+            seller_discord_id=dic["_seller_discord_id"],
+            from_date_timestamp=dic["_from_date_timestamp"],
+            to_date_timestamp=dic["_to_date_timestamp"],
+            sale_uid=dic["_sale_uid"],
+        )
+
+    def __str__(self) -> str:
+        return (
+            I18n()
+            .gettext("User [{}] offers [{}] units of item [{}] for [{}] coins, from [{}] until [{}]. Sale's UID: {}")
+            .format(
+                self._seller,
+                self._quantity,
+                ItemHandler().catalog.get_by_uid(self._item_uid).name,
+                self._price,
+                datetime.fromtimestamp(self._from_date_timestamp).date(),
+                datetime.fromtimestamp(self._to_date_timestamp).date(),
+                self._sale_uid,
+            )
+        )
+
+
+def persisted_sales() -> List[Dict[str, Any]]:
+    """Sales as read from the database: every row holds its own copy of every string, just like decoded JSON does."""
+    rng = random.Random(42)
+    item_uids = [item.uid for item in ItemHandler().catalog]
+    sellers = ["seller#{:04d}".format(i) for i in range(SELLERS)]
+    now = datetime.today().timestamp()
+
+    return [
+        {
+            "_item_uid": "".join(rng.choice(item_uids)),
+            "_quantity": rng.randint(1, 1000),
+            "_price": rng.randint(1, 100_000),
+            "_seller": "".join(rng.choice(sellers)),
+            "_seller_discord_id": rng.getrandbits(60),
+            "_from_date_timestamp": now - rng.uniform(0, 7 * 86400),
+            "_to_date_timestamp": now + rng.uniform(0, 7 * 86400),
+            "_sale_uid": "{:032x}".format(rng.getrandbits(128)),
+        }
+        for _ in range(SALES)
+    ]
+
+
+def measure(label: str, from_dict: Callable[[Dict], Any]) -> None:
+    gc.collect()
+    tracemalloc.start()
+
+    def parse() -> List[Any]:
+        # the persisted rows are dropped once parsed, as they would be after a listing
+        return [from_dict(row) for row in persisted_sales()]
+
+    sales = parse()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    elapsed = min(timeit.repeat(lambda: "\n".join(str(sale) for sale in sales), number=1, repeat=REPETITIONS))
+
+    gc.collect()
+    tracemalloc.start()
+    rendered = "\n".join(str(sale) for sale in sales)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        "{:<12} retained {:>7.1f} MiB ({:>4} B/sale) | render {:>7.1f} ms, peak {:>6.1f} MiB, {} chars".format(
+            label,
+            retained / 2**20,
+            retained // SALES,
+            elapsed * 1000,
+            peak / 2**20,
+            len(rendered),
+        )
+    )
+
+
+def main() -> None:
+    I18n().with_lang(LOCALE_EN).init()
+    ItemHandler()  # load the catalog outside of the measurements
+
+    measure("dict Sale", DictSale.from_dict)
+    measure("slotted Sale", Sale.from_dict)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Measures rendering a listing of 10k sales: the former per-sale rendering (translating the template, and looking the item
+up through the ItemHandler singleton, on every single line) against SaleRenderer, both with its line cache cold (the
+first listing of every sale) and warm (every later one).
+
+Run from the repository's root (item list paths are relative to it):
+    python -m benchmark.sale_render_benchmark
+"""
+
+import random
+import timeit
+from datetime import datetime
+from typing import Callable, List
+
+from src.entity.sale import Sale
+from src.handler.item import ItemHandler
+from src.i18n.i18n import LOCALE_ES_AR, I18n
+from src.render.sale_renderer import SaleRenderer
+
+SALES = 10_000
+REPETITIONS = 5
+
+_: Callable[[str], str] = lambda s: I18n().gettext(s)
+
+
+def former_render(sale: Sale) -> str:
+    """Sale.__str__ as it was before SaleRenderer."""
+    return _("User [{}] offers [{}] units of item [{}] for [{}] coins, from [{}] until [{}]. Sale's UID: {}").format(
+        sale.seller,
+        sale.quantity,
+        sale.item.name,
+        sale.price,
+        sale.from_day,
+        sale.to_day,
+        sale.sale_uid,
+    )
+
+
+def build_sales() -> List[Sale]:
+    rng = random.Random(42)
+    item_uids = [item.uid for item in ItemHandler().catalog]
+    now = datetime.today().timestamp()
+    return [
+        Sale(rng.choice(item_uids), rng.randint(1, 1000), rng.randint(1, 100_000), "seller#0001", 1234, now, now + 1)
+        for _ in range(SALES)
+    ]
+
+
+def measure(label: str, render: Callable[[List[Sale]], str], sales: List[Sale], before: Callable[[], None]) -> None:
+    def run() -> str:
+        before()
+        return render(sales)
+
+    elapsed = min(timeit.repeat(run, number=1, repeat=REPETITIONS))
+    print("{:<22} {:>8.2f} ms ({:.2f} µs/sale)".format(label, elapsed * 1000, elapsed / SALES * 1_000_000))
+
+
+def main() -> None:
+    I18n().with_lang(LOCALE_ES_AR).init()
+    renderer = SaleRenderer()
+    sales = build_sales()
+
+    def drop_cache() -> None:
+        for sale in sales:
+            renderer.invalidate(sale.sale_uid)
+
+    def nothing() -> None:
+        pass
+
+    assert "\n".join(former_render(sale) for sale in sales) == renderer.render_list(sales)
+
+    print("Rendering {} sales".format(SALES))
+    measure("former", lambda s: "\n".join(former_render(sale) for sale in s), sales, nothing)
+    # cold timings include dropping the cache, which is about as costly as a cache hit
+    measure("SaleRenderer (cold)", renderer.render_list, sales, drop_cache)
+    measure("SaleRenderer (warm)", renderer.render_list, sales, nothing)
+
+
+if __name__ == "__main__":
+    main()
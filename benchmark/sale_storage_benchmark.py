@@ -0,0 +1,88 @@
+"""
+Compares the latency of the operations behind $sell (insert), $buy (lookup and removal by Sale UID) and $list (lookup
+by Item UIDs, or a page) across sale storages, with a market of 100k live sales; both on their own and behind the
+in-memory index.
+
+Run from the repository's root:
+    python -m benchmark.sale_storage_benchmark
+"""
+
+import os
+import random
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, List
+
+from src.entity.sale import Sale
+from src.storage.indexed_sale_storage import IndexedSaleStorage
+from src.storage.journal_sale_storage import JournalSaleStorage
+from src.storage.sale_storage import SaleStorage
+from src.storage.sqlite_sale_storage import SQLiteSaleStorage
+from src.storage.tinydb_sale_storage import TinyDBSaleStorage
+
+SALES = 100_000
+ITEMS = 463
+# TinyDB rewrites (or rescans) its whole file on every operation, so it only gets a few rounds
+ROUNDS = {
+    "tinydb": 3,
+    "sqlite": 200,
+    "journal": 200,
+    "indexed tinydb": 3,
+    "indexed sqlite": 200,
+    "indexed journal": 200,
+}
+
+
+def build_sales(rng: random.Random, amount: int) -> List[Sale]:
+    # live for a week: the in-memory index hides expired sales from reads
+    now = time.time()
+    item_uids = ["{:08X}".format(i) for i in range(ITEMS)]
+    return [
+        Sale(rng.choice(item_uids), 1, 100, "seller#{:04d}".format(rng.randrange(500)), 1234, now, now + 7 * 86400)
+        for _ in range(amount)
+    ]
+
+
+def measure(label: str, storage: SaleStorage, rounds: int) -> None:
+    rng = random.Random(42)
+    sales = build_sales(rng, SALES)
+    storage.insert_many(sales)
+
+    new_sales = iter(build_sales(rng, rounds))
+    bought = iter(rng.sample(sales, rounds))
+    operations: Dict[str, Callable[[], object]] = {
+        "$sell  insert": lambda: storage.insert(next(new_sales)),
+        "$buy   get by sale UID": lambda: storage.get_by_sale_uid(rng.choice(sales).sale_uid),
+        "$list  get by 1 item UID": lambda: storage.get_by_item_uids([rng.choice(sales).item_uid]),
+        "$list  get by 5 item UIDs": lambda: storage.get_by_item_uids([s.item_uid for s in rng.sample(sales, 5)]),
+        "$buy   remove by sale UID": lambda: storage.remove_by_sale_uid(next(bought).sale_uid),
+    }
+    if isinstance(storage, IndexedSaleStorage):
+        middle = storage.get_page(SALES // 2).next_cursor
+        operations["$list  page of 10"] = lambda: storage.get_page(10, cursor=middle)
+        operations["$list  page of 10, 1 item UID"] = lambda: storage.get_page(
+            10, cursor=middle, item_uids=[rng.choice(sales).item_uid]
+        )
+
+    for operation, run in operations.items():
+        elapsed = timeit.timeit(run, number=rounds) / rounds
+        print("{:<16} {:<28} {:>10.3f} ms".format(label, operation, elapsed * 1000))
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        measure("tinydb", TinyDBSaleStorage(os.path.join(directory, "sale.json")), ROUNDS["tinydb"])
+        measure("sqlite", SQLiteSaleStorage(os.path.join(directory, "sale.sqlite3")), ROUNDS["sqlite"])
+        measure("journal", JournalSaleStorage(os.path.join(directory, "sale.journal")), ROUNDS["journal"])
+
+        for kind, storage in [
+            ("indexed tinydb", TinyDBSaleStorage(os.path.join(directory, "indexed_sale.json"))),
+            ("indexed sqlite", SQLiteSaleStorage(os.path.join(directory, "indexed_sale.sqlite3"))),
+            ("indexed journal", JournalSaleStorage(os.path.join(directory, "indexed_sale.journal"))),
+        ]:
+            measure(kind, IndexedSaleStorage(storage), ROUNDS[kind])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """
+    Asynchronous front of a thread or process pool, bounding both how much work may be pending on it and how long any
+    piece of work may be waited for.
+
+    Work beyond the bound waits for a slot (backpressure) rather than piling up in the pool's queue; and a slot is only
+    freed once its work is actually done, even if whoever submitted it stopped waiting, so that work that overruns its
+    timeout still counts against the bound while it keeps a worker busy. Work that times out before starting never
+    starts.
+    """
+
+    def __init__(self, executor: Executor, max_pending: int, timeout: float) -> None:
+        """
+        :param executor: The pool to run work on. It gets shut down along with this.
+        :param max_pending: The maximum amount of work submitted to the pool and not done yet.
+        :param timeout: How long, in seconds, work may be waited for, waiting for a slot included.
+        """
+        if max_pending < 1:
+            raise ValueError("Maximum pending work must be a positive integer, but was {}".format(max_pending))
+        if timeout <= 0:
+            raise ValueError("Timeout must be positive, but was {}".format(timeout))
+
+        self._executor = executor
+        self._max_pending = max_pending
+        self._timeout = timeout
+        self._pending = 0
+        self._slots: Optional[asyncio.Semaphore] = None  # made on first use, within the running event loop
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        """
+        Runs the given blocking call on the pool.
+
+        :param function: The blocking call. It must be picklable to run on a process pool.
+        :param args: Its arguments.
+        :raises asyncio.TimeoutError: If the call didn't return within the timeout.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_pending)
+
+        deadline = time.monotonic() + self._timeout
+        await asyncio.wait_for(self._slots.acquire(), timeout=self._timeout)
+
+        try:
+            work: "Future[T]" = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._pending += 1
+        loop = asyncio.get_event_loop()
+        work.add_done_callback(lambda _: loop.is_closed() or loop.call_soon_threadsafe(self._release))
+
+        # timing out cancels the work, which only works if it didn't start yet; either way, its slot is freed once done
+        return await asyncio.wait_for(asyncio.wrap_future(work), timeout=max(deadline - time.monotonic(), 0))
+
+    @property
+    def pending(self) -> int:
+        """Returns the amount of work submitted to the pool and not done yet."""
+        return self._pending
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _release(self) -> None:
+        assert self._slots is not None  # made before any work was submitted
+        self._pending -= 1
+        self._slots.release()
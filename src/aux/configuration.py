@@ -10,6 +10,30 @@ DEFAULT_ROOT = "MERCADOAO"
 DISCORD_TOKEN_KEY = "discord_token"
 ANNOUNCEMENT_CHANNEL_ID_KEY = "announcement_channel_id"
 DEBUG_MODE_KEY = "debug_mode"
+SEARCH_NGRAM_SIZE_KEY = "search_ngram_size"
+SEARCH_CACHE_SIZE_KEY = "search_cache_size"
+ITEM_SEARCH_EXECUTOR_KEY = "item_search_executor"
+ITEM_SEARCH_WORKERS_KEY = "item_search_workers"
+ITEM_SEARCH_TIMEOUT_KEY = "item_search_timeout"
+ITEM_SEARCH_MAX_PENDING_KEY = "item_search_max_pending"
+SALE_RENDER_CACHE_SIZE_KEY = "sale_render_cache_size"
+SALE_STORAGE_KEY = "sale_storage"
+SALE_JOURNAL_FSYNC_KEY = "sale_journal_fsync"
+SALE_JOURNAL_COMPACTION_THRESHOLD_KEY = "sale_journal_compaction_threshold"
+SALE_GROUP_COMMIT_WINDOW_KEY = "sale_group_commit_window"
+SALE_GROUP_COMMIT_MAX_BATCH_KEY = "sale_group_commit_max_batch"
+ANNOUNCEMENT_DIGEST_INTERVAL_KEY = "announcement_digest_interval"
+ANNOUNCEMENT_DIGEST_MAX_SIZE_KEY = "announcement_digest_max_size"
+HOME_GUILD_ID_KEY = "home_guild_id"
+GUILD_IDLE_TIMEOUT_KEY = "guild_idle_timeout"
+
+ITEM_SEARCH_INLINE = "inline"
+ITEM_SEARCH_THREAD = "thread"
+ITEM_SEARCH_PROCESS = "process"
+
+SALE_STORAGE_SQLITE = "sqlite"
+SALE_STORAGE_TINYDB = "tinydb"
+SALE_STORAGE_JOURNAL = "journal"
 
 
 class Configuration:
@@ -47,11 +71,109 @@ class Configuration:
         """Returns whether the application should run on debug mode or not."""
         return bool(util.strtobool(self._config[DEFAULT_ROOT][DEBUG_MODE_KEY]))
 
+    def get_announcement_digest_interval(self) -> float:
+        """
+        Returns how long, in seconds, sale announcements are buffered to be sent together as a single digest. Zero
+        disables digests: every sale is then announced on its own, right away.
+        """
+        return float(self._config[DEFAULT_ROOT][ANNOUNCEMENT_DIGEST_INTERVAL_KEY])
+
+    def get_announcement_digest_max_size(self) -> int:
+        """Returns the amount of buffered sale announcements that get sent as a digest right away, without waiting."""
+        return int(self._config[DEFAULT_ROOT][ANNOUNCEMENT_DIGEST_MAX_SIZE_KEY])
+
+    def get_search_ngram_size(self) -> int:
+        """Returns the size of the character n-grams used to index item names for searching."""
+        return int(self._config[DEFAULT_ROOT][SEARCH_NGRAM_SIZE_KEY])
+
+    def get_search_cache_size(self) -> int:
+        """Returns the maximum amount of item search results kept in cache."""
+        return int(self._config[DEFAULT_ROOT][SEARCH_CACHE_SIZE_KEY])
+
+    def get_item_search_executor(self) -> str:
+        """
+        Returns where item searches run: either 'inline' (right on the event loop), 'thread' (on a thread pool) or
+        'process' (on a pool of worker processes).
+        """
+        return self._config[DEFAULT_ROOT][ITEM_SEARCH_EXECUTOR_KEY]
+
+    def get_item_search_workers(self) -> int:
+        """Returns the amount of threads or processes item searches run on, when not run inline."""
+        return int(self._config[DEFAULT_ROOT][ITEM_SEARCH_WORKERS_KEY])
+
+    def get_item_search_timeout(self) -> float:
+        """Returns how long, in seconds, an item search may take when not run inline, waiting for a worker included."""
+        return float(self._config[DEFAULT_ROOT][ITEM_SEARCH_TIMEOUT_KEY])
+
+    def get_item_search_max_pending(self) -> int:
+        """Returns the maximum amount of item searches handed to workers at once; further ones wait for a slot."""
+        return int(self._config[DEFAULT_ROOT][ITEM_SEARCH_MAX_PENDING_KEY])
+
+    def get_sale_render_cache_size(self) -> int:
+        """Returns the maximum amount of rendered sale lines kept in cache."""
+        return int(self._config[DEFAULT_ROOT][SALE_RENDER_CACHE_SIZE_KEY])
+
+    def get_sale_storage(self) -> str:
+        """Returns the storage backend sales are kept in: either 'sqlite', 'journal' or 'tinydb'."""
+        return self._config[DEFAULT_ROOT][SALE_STORAGE_KEY]
+
+    def get_sale_journal_fsync(self) -> str:
+        """Returns when the sale journal gets fsync'ed: either 'always', 'periodic' or 'never'."""
+        return self._config[DEFAULT_ROOT][SALE_JOURNAL_FSYNC_KEY]
+
+    def get_sale_journal_compaction_threshold(self) -> int:
+        """Returns the size, in bytes, past which the sale journal gets compacted into a snapshot."""
+        return int(self._config[DEFAULT_ROOT][SALE_JOURNAL_COMPACTION_THRESHOLD_KEY])
+
+    def get_sale_group_commit_window(self) -> float:
+        """
+        Returns how long, in milliseconds, sale writes wait for others to share a single write with. Zero disables group
+        commit: every sale write is then made on its own, right away.
+        """
+        return float(self._config[DEFAULT_ROOT][SALE_GROUP_COMMIT_WINDOW_KEY])
+
+    def get_sale_group_commit_max_batch(self) -> int:
+        """Returns the amount of pending sale writes that get written together right away, without waiting further."""
+        return int(self._config[DEFAULT_ROOT][SALE_GROUP_COMMIT_MAX_BATCH_KEY])
+
+    def get_home_guild_id(self) -> Optional[int]:
+        """
+        Returns the ID of MercadoAO's home guild, whose market is the one DMs are served from and the one kept in the
+        legacy sale database; or None if there is no such guild.
+        """
+        if self._config[DEFAULT_ROOT][HOME_GUILD_ID_KEY]:
+            return int(self._config[DEFAULT_ROOT][HOME_GUILD_ID_KEY])
+        else:
+            return None
+
+    def get_guild_idle_timeout(self) -> float:
+        """Returns how long, in seconds, a guild's market may go unused before its sale storage gets closed."""
+        return float(self._config[DEFAULT_ROOT][GUILD_IDLE_TIMEOUT_KEY])
+
     @staticmethod
     def build_defaults() -> Mapping[str, Mapping[str, Any]]:
         """Builds the default configuration mapping."""
         config: Dict[str, Any] = dict()
 
-        config[DEFAULT_ROOT] = {DISCORD_TOKEN_KEY: "", ANNOUNCEMENT_CHANNEL_ID_KEY: ""}
+        config[DEFAULT_ROOT] = {
+            DISCORD_TOKEN_KEY: "",
+            ANNOUNCEMENT_CHANNEL_ID_KEY: "",
+            ANNOUNCEMENT_DIGEST_INTERVAL_KEY: "30",
+            ANNOUNCEMENT_DIGEST_MAX_SIZE_KEY: "10",
+            SEARCH_NGRAM_SIZE_KEY: "3",
+            SEARCH_CACHE_SIZE_KEY: "1024",
+            ITEM_SEARCH_EXECUTOR_KEY: ITEM_SEARCH_INLINE,
+            ITEM_SEARCH_WORKERS_KEY: "2",
+            ITEM_SEARCH_TIMEOUT_KEY: "5",
+            ITEM_SEARCH_MAX_PENDING_KEY: "32",
+            SALE_RENDER_CACHE_SIZE_KEY: "10000",
+            SALE_STORAGE_KEY: SALE_STORAGE_SQLITE,
+            SALE_JOURNAL_FSYNC_KEY: "always",
+            SALE_JOURNAL_COMPACTION_THRESHOLD_KEY: "4194304",
+            SALE_GROUP_COMMIT_WINDOW_KEY: "10",
+            SALE_GROUP_COMMIT_MAX_BATCH_KEY: "100",
+            HOME_GUILD_ID_KEY: "",
+            GUILD_IDLE_TIMEOUT_KEY: "3600",
+        }
 
         return config
@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+from typing import Generic, Hashable, NamedTuple, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class CacheStats(NamedTuple):
+    """Point-in-time usage metrics of a cache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return "hits: {}, misses: {}, evictions: {}, hit rate: {:.2%}, size: {}/{}".format(
+            self.hits, self.misses, self.evictions, self.hit_rate, self.size, self.maxsize
+        )
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe, size-bounded mapping that evicts its least recently used entry once full. It keeps track of its own
+    hits, misses and evictions.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError("Cache size must be a positive integer, but was {}".format(maxsize))
+
+        self._maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Returns the value cached under the given key (marking it as the most recently used one), or None on a miss.
+
+        :param key: The key to look up.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: K, value: V) -> None:
+        """
+        Caches the given value under the given key, evicting the least recently used entry if the cache is full.
+
+        :param key: The key to cache the value under.
+        :param value: The value to cache.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        """
+        Drops the value cached under the given key, returning it; or None if there was none. It isn't a lookup.
+
+        :param key: The key to drop.
+        """
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops every cached entry. Metrics are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._entries), self._maxsize)
+
+    def __contains__(self, key: object) -> bool:
+        # membership checks don't count as lookups, nor refresh the entry's recency
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
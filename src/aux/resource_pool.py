@@ -0,0 +1,112 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, List, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+R = TypeVar("R")
+
+
+class _Entry(Generic[R]):
+    __slots__ = ("resource", "users", "last_used")
+
+    def __init__(self, resource: "asyncio.Future[R]", now: float) -> None:
+        self.resource = resource
+        self.users = 0
+        self.last_used = now
+
+
+class ResourcePool(Generic[K, R]):
+    """
+    Resources opened lazily by key, on first use; shared by everyone using the same key at once; and closed once nobody
+    has used them for a while. Opening and closing are asynchronous, and a resource is only ever opened once at a time:
+    concurrent first users all wait on the same opening, and a resource being closed is only reopened once it closed.
+    """
+
+    def __init__(
+        self,
+        open_resource: Callable[[K], Awaitable[R]],
+        close_resource: Callable[[R], Awaitable[None]],
+        idle_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param open_resource: Opens the resource of the given key.
+        :param close_resource: Closes the given resource.
+        :param idle_timeout: How long, in seconds, a resource must go unused to be closed by close_idle.
+        :param clock: Returns the current time, in seconds.
+        """
+        self._open_resource = open_resource
+        self._close_resource = close_resource
+        self._idle_timeout = idle_timeout
+        self._clock = clock
+        self._entries: Dict[K, _Entry[R]] = dict()
+        self._closing: Dict[K, "asyncio.Future[bool]"] = dict()
+
+    @asynccontextmanager
+    async def use(self, key: K) -> AsyncIterator[R]:
+        """
+        Uses the resource of the given key, opening it if needed. It won't be closed while in use.
+
+        :param key: The resource's key.
+        """
+        while key in self._closing:
+            await asyncio.shield(self._closing[key])
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(asyncio.ensure_future(self._open_resource(key)), self._clock())
+
+        entry.users += 1
+        try:
+            try:
+                resource = await asyncio.shield(entry.resource)  # a cancelled user doesn't cancel others' opening
+            except Exception:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]  # next use will try again
+                raise
+            yield resource
+        finally:
+            entry.users -= 1
+            entry.last_used = self._clock()
+
+    async def close_idle(self) -> List[K]:
+        """
+        Closes every opened resource that nobody is using, nor has used during the idle timeout.
+
+        :return: The keys of the closed resources.
+        """
+        idle = [key for key, entry in self._entries.items() if self._is_idle(entry)]
+        # closing is asynchronous: each resource is checked again right before closing it, as it may be in use by now
+        return [key for key in idle if await self._close(key, only_if_idle=True)]
+
+    async def close_all(self) -> None:
+        """Closes every opened resource, in use or not."""
+        for key in list(self._entries.keys()):
+            await self._close(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _is_idle(self, entry: _Entry[R]) -> bool:
+        return entry.users == 0 and self._clock() - entry.last_used >= self._idle_timeout and entry.resource.done()
+
+    async def _close(self, key: K, only_if_idle: bool = False) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or (only_if_idle and not self._is_idle(entry)):
+            return False  # closed, or used, meanwhile
+        del self._entries[key]
+        closing = self._closing[key] = asyncio.ensure_future(self._close_entry(entry))
+        closing.add_done_callback(lambda _: self._closing.pop(key, None))
+        return await asyncio.shield(closing)
+
+    async def _close_entry(self, entry: _Entry[R]) -> bool:
+        try:
+            resource = await entry.resource
+        except Exception:
+            return False  # it never opened
+        await self._close_resource(resource)
+        return True
@@ -0,0 +1,59 @@
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: it holds up to `capacity` tokens, refilled at `rate` tokens per second, and every action
+    takes one. Bursts of up to `capacity` actions go right away; past that, actions get paced at `rate` per second.
+
+    Tokens are reserved rather than waited for: reserve() takes a token right away (going into debt if there is none)
+    and tells how long to wait before using it, so that concurrent callers queue up instead of racing for each refill.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param rate: Tokens refilled per second.
+        :param capacity: The maximum amount of tokens held; that is, the largest burst.
+        :param clock: Returns the current time, in seconds.
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError(
+                "Token bucket rate must be positive and capacity at least 1, but were {} and {}".format(rate, capacity)
+            )
+
+        self._rate = rate
+        self._capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._last_refill = clock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token.
+
+        :return: How long, in seconds, to wait before acting on it.
+        """
+        self._refill()
+        self._tokens -= 1
+        return max(-self._tokens / self._rate, 0)
+
+    def block(self, seconds: float) -> None:
+        """
+        Empties the bucket so that the next token is only available after the given time; as when told to retry later.
+
+        :param seconds: How long to hold back the next token.
+        """
+        self._refill()
+        self._tokens = min(self._tokens, 1 - seconds * self._rate)
+
+    @property
+    def tokens(self) -> float:
+        """Returns the amount of tokens currently held; negative if some are owed to reservations."""
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self._tokens + (now - self._last_refill) * self._rate, self._capacity)
+        self._last_refill = now
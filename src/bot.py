@@ -1,3 +1,5 @@
+from typing import Awaitable, Callable, List
+
 from discord.ext import commands
 
 from src.aux.logger import Logger
@@ -12,6 +14,7 @@ class MercadoAO(commands.Bot):
         super().__init__(**options)
 
         self._logger = Logger(self.__class__.__name__)
+        self._close_hooks: List[Callable[[], Awaitable[None]]] = list()
 
         self._logger.info("=== Initializing MercadoAO Discord Bot ===")
         # bot will be truly ready when the on_ready() function gets called
@@ -19,3 +22,21 @@ class MercadoAO(commands.Bot):
     async def on_ready(self) -> None:
         self._logger.debug("Logged on as {0}!".format(self.user))
         self._logger.info("=== MercadoAO initialized ===")
+
+    def add_close_hook(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """
+        Registers a coroutine function to be awaited as the bot shuts down, while still connected to Discord.
+
+        :param hook: The coroutine function. Hooks are awaited in the order they were registered.
+        """
+        self._close_hooks.append(hook)
+
+    async def close(self) -> None:
+        self._logger.info("=== Shutting down MercadoAO ===")
+        for hook in self._close_hooks:
+            try:
+                await hook()
+            except Exception as e:
+                self._logger.error("Shutdown hook [{}] failed: {}".format(hook, e))
+        self._close_hooks.clear()  # close may get called more than once
+        await super().close()
@@ -1,21 +1,36 @@
-import textwrap
+import asyncio
 import time
-from typing import Callable, List, Optional, Set
+from typing import Callable, Iterable, List, Optional, Sequence, Union
 
 from discord import User
+from discord.abc import Messageable
 from discord.ext.commands import Context
 
+from src.aux.configuration import Configuration
 from src.aux.logger import Logger
 from src.aux.typing import get_or_else_throw
 from src.entity.item import Item
 from src.entity.sale import Sale
-from src.handler.item import ItemHandler
-from src.handler.sale import SaleHandler
+from src.handler.async_item import AsyncItemHandler
+from src.handler.guild_sale import GuildSaleHandlers
+from src.handler.item import RANKED_SEARCH_RESULTS, ItemHandler
 from src.i18n.i18n import I18n
-from src.scheduler.stale_offer_cleanup_job import StaleOfferCleanupJob
+from src.index.attribute import AttributeQuery, parse_query
+from src.index.ranking import ScoredItem
+from src.outbound.announcement_digest import AnnouncementDigest
+from src.outbound.dispatcher import MESSAGE_MAX_LENGTH, OutboundDispatcher, send_to_discord
+from src.outbound.packer import pack_lines
+from src.outbound.user_resolver import UserResolver
+from src.render.sale_renderer import SaleRenderer
+from src.storage.pagination import SalePage
 
 _: Callable[[str], str] = lambda s: I18n().gettext(s)
 
+# sales per $list page: short enough for a page to fit in a single message
+SALES_PAGE_SIZE: int = 10
+# $list query that lists every sale, so that a page can be asked for
+LIST_ALL_QUERY: str = "*"
+
 
 class CommandHandler:
     def __init__(self) -> None:
@@ -24,10 +39,31 @@ class CommandHandler:
 
         self._logger.info("Initializing command handler...")
         self._item_handler = ItemHandler()
-        self._sale_handler = SaleHandler()
+        self._item_search = AsyncItemHandler()
+        self._sale_renderer = SaleRenderer()
+        self._dispatcher = OutboundDispatcher(send_to_discord)
+        self._user_resolver = UserResolver()
+
+        configuration = Configuration()
+        self._announcements = AnnouncementDigest(
+            self.send_partitioned_message,
+            interval=configuration.get_announcement_digest_interval(),
+            max_size=configuration.get_announcement_digest_max_size(),
+        )
 
         self._logger.info("Setting up background jobs...")
-        self._stale_offers_cleanup_scheduler = StaleOfferCleanupJob().start()
+        self._sale_handlers = GuildSaleHandlers().start()
+
+    async def close(self) -> None:
+        """
+        Sends every buffered announcement and queued message, closes every market once their pending writes are done,
+        and stops the item search workers, if any.
+        """
+        self._logger.info("Closing command handler...")
+        self._announcements.flush_all()
+        await self._dispatcher.drain()
+        await self._sale_handlers.close()
+        self._item_search.close()
 
     async def sell_handler(
         self,
@@ -48,94 +84,157 @@ class CommandHandler:
         if self._item_handler.is_uid(query=item_to_sell):
             item = get_or_else_throw(self._item_handler.uid_search(uid=item_to_sell))
         else:
-            search: Set[Item] = self._item_handler.search(search_param=item_to_sell)
+            search: Optional[List[ScoredItem]] = await self._ranked_search(ctx, query=item_to_sell)
+            if search is None:
+                return
             if len(search) != 1:
-                await self.send_partitioned_message(
+                self.send_partitioned_message(
                     ctx.author,
                     _(
                         "Your sale of [{}] matched multiple items. "
                         "Please make your offer again with a more specific argument (uid's are also accepted). "
                         "Potential matches: {}"
-                    ).format(item_to_sell, set(map(lambda x: str(x), search))),
+                    ).format(item_to_sell, list(map(lambda x: str(x.item), search))),
                 )
                 return
-            item = search.pop()
+            item = search[0].item
 
-        sale: Sale = self._sale_handler.create_sale(
-            item=item, quantity=quantity, price=price, seller=str(ctx.author), seller_id=ctx.author.id
-        )
+        async with self._sale_handlers.use(self.get_guild_id(ctx)) as sale_handler:
+            sale: Sale = await sale_handler.create_sale(
+                item=item, quantity=quantity, price=price, seller=str(ctx.author), seller_id=ctx.author.id
+            )
+            self._logger.debug(
+                "Sale group commit of {}: {}".format(sale_handler.market, sale_handler.group_commit_stats)
+            )
 
-        await ctx.author.send(
+        self.send_message(
+            ctx.author,
             _("Your sale of [{}] units of [{}] for [{}] has been accepted and published").format(
                 sale.quantity, item.name, sale.price
-            )
+            ),
         )
 
         if announce and announcement_channel_id:
-            await self.send_announcement(ctx, announcement_channel_id, str(sale))
+            self.send_announcement(ctx, announcement_channel_id, str(sale))
 
     async def buy_handler(self, ctx: Context, sale_uid: str) -> None:
         self._logger.debug(
             "[BUY] - [{}] command called by [{}] with argument [{}]".format(ctx.command, ctx.author, sale_uid)
         )
 
-        sale: Optional[Sale] = self._sale_handler.get_sale_by_sale_uid(sale_uid=sale_uid)
+        # claimed before anyone gets notified: of several buyers racing for the same sale, only one gets it
+        async with self._sale_handlers.use(self.get_guild_id(ctx)) as sale_handler:
+            sale: Optional[Sale] = await sale_handler.claim_sale(sale_uid=sale_uid, buyer=str(ctx.author))
+            self._logger.debug(
+                "Sale group commit of {}: {}".format(sale_handler.market, sale_handler.group_commit_stats)
+            )
 
         if not sale:
-            await ctx.author.send(
+            self.send_message(
+                ctx.author,
                 _(
                     "Your buy request for ID [{}] did not match any ongoing sales. Maybe it has been bought already? "
                     "Check ID and try again."
-                ).format(sale_uid)
+                ).format(sale_uid),
             )
             return
 
         buyer: User = ctx.author
-        await ctx.author.send(
-            _(
-                "Congratulations! You have bought [{}] units of [{}] for [{}]! "
-                "I have already DMed the seller [{}] with details of the transaction. "
-                "Message him to complete delivery."
-            ).format(sale.quantity, sale.item, sale.price, sale.seller)
-        )
-        await self.get_user_by_id(ctx, user_id=sale.seller_discord_id).send(
-            _(
-                "Congratulations! Your sale of [{}] units of [{}] for [{}] has been bought by [{}]! "
-                "DM buyer to complete the transaction!"
-            ).format(sale.quantity, sale.item, sale.price, buyer)
+        # both parties get notified at once: resolving the seller (a round trip if not cached) doesn't hold the buyer up
+        await asyncio.gather(
+            self.notify_user(
+                ctx,
+                buyer,
+                _(
+                    "Congratulations! You have bought [{}] units of [{}] for [{}]! "
+                    "I have already DMed the seller [{}] with details of the transaction. "
+                    "Message him to complete delivery."
+                ).format(sale.quantity, sale.item, sale.price, sale.seller),
+            ),
+            self.notify_user(
+                ctx,
+                sale.seller_discord_id,
+                _(
+                    "Congratulations! Your sale of [{}] units of [{}] for [{}] has been bought by [{}]! "
+                    "DM buyer to complete the transaction!"
+                ).format(sale.quantity, sale.item, sale.price, buyer),
+            ),
         )
-        self._sale_handler.remove_sale_by_sale_uid(sale.sale_uid)
+        self._logger.debug("User cache: {}".format(self._user_resolver.cache_stats))
 
-    async def list_all_handler(self, ctx: Context) -> None:
-        self._logger.debug("[LIST ALL] - [{}] command called by [{}]".format(ctx.command, ctx.author))
+    async def list_all_handler(self, ctx: Context, page: int = 1) -> None:
+        self._logger.debug(
+            "[LIST ALL] - [{}] command called by [{}] with page [{}]".format(ctx.command, ctx.author, page)
+        )
 
-        search_results: List[Sale] = self._sale_handler.get_all_sales()
+        sales_page: Optional[SalePage] = await self._get_sales_page(ctx, page)
 
-        if not search_results:
-            await ctx.author.send(_("No sales currently going on"))
-        else:
-            await ctx.author.send(_("The following sales are currently undergoing:"))
-            await self.send_partitioned_message(ctx.author, "\n".join(str(sale) for sale in search_results))
+        if page == 1 and not sales_page:
+            self.send_message(ctx.author, _("No sales currently going on"))
+        elif page == 1:
+            self.send_message(ctx.author, _("The following sales are currently undergoing:"))
+        self._send_sales_page(ctx, sales_page, page, LIST_ALL_QUERY)
 
-    async def list_handler(self, ctx: Context, query: str) -> None:
+    async def list_handler(self, ctx: Context, query: str, page: int = 1) -> None:
         self._logger.debug(
-            "[LIST] - [{}] command called by [{}] with argument [{}]".format(ctx.command, ctx.author, query)
+            "[LIST] - [{}] command called by [{}] with arguments [{}] [{}]".format(ctx.command, ctx.author, query, page)
         )
 
-        search_results: List[Sale]
+        item_uids: List[str]
         sanitized_uid: Optional[str] = self._item_handler.sanitize_uid(uid=query)
         if sanitized_uid:
-            search_results = self._sale_handler.get_sales_by_item_uid(item_uid=sanitized_uid)
+            item_uids = [sanitized_uid]
         else:
-            search_results = self._sale_handler.get_sales_by_item_uids(
-                list(map(lambda x: x.uid, self._item_handler.search(search_param=query)))
+            search: Optional[List[ScoredItem]] = await self._ranked_search(ctx, query, k=None)
+            if search is None:
+                return
+            item_uids = list(map(lambda x: x.item.uid, search))
+
+        sales_page: Optional[SalePage] = await self._get_sales_page(ctx, page, item_uids)
+
+        if page == 1 and not sales_page:
+            self.send_message(ctx.author, _("No sales currently going on for query [{}]").format(query))
+        elif page == 1:
+            self.send_message(
+                ctx.author, _("The following sales are currently undergoing for query [{}]:").format(query)
             )
+        self._send_sales_page(ctx, sales_page, page, query)
 
-        if not search_results:
-            await ctx.author.send(_("No sales currently going on for query [{}]").format(query))
-        else:
-            await ctx.author.send(_("The following sales are currently undergoing for query [{}]:").format(query))
-            await self.send_partitioned_message(ctx.author, "\n".join(str(sale) for sale in search_results))
+    async def _get_sales_page(
+        self, ctx: Context, page: int, item_uids: Optional[List[str]] = None
+    ) -> Optional[SalePage]:
+        """
+        Returns the given page of sales of the context's market, or None if there is no such page. Former pages are
+        walked through by cursor, without being rendered.
+
+        :param ctx: The command's Context.
+        :param page: The page's number, starting from 1.
+        :param item_uids: The UIDs of the items whose sales to page through; or None for every sale.
+        """
+        async with self._sale_handlers.use(self.get_guild_id(ctx)) as sale_handler:
+            sales_page: SalePage = await sale_handler.get_sales_page(SALES_PAGE_SIZE, item_uids=item_uids)
+            for _former_page in range(1, page):
+                if sales_page.next_cursor is None:
+                    return None
+                sales_page = await sale_handler.get_sales_page(
+                    SALES_PAGE_SIZE, cursor=sales_page.next_cursor, item_uids=item_uids
+                )
+
+        return sales_page if sales_page.sales else None
+
+    def _send_sales_page(self, ctx: Context, sales_page: Optional[SalePage], page: int, query: str) -> None:
+        if sales_page is None:
+            if page > 1:
+                self.send_message(ctx.author, _("There are no sales on page [{}].").format(page))
+            return
+
+        self.send_lines(ctx.author, self._sale_renderer.render_lines(sales_page.sales))
+        if sales_page.next_cursor is not None:
+            next_page_command = '$list "{}" {}' if " " in query else "$list {} {}"
+            self.send_message(
+                ctx.author,
+                _("Page [{}]. For more sales, use: {}").format(page, next_page_command.format(query, page + 1)),
+            )
 
     async def search_handler(self, ctx: Context, query: str) -> None:
         self._logger.debug(
@@ -147,17 +246,106 @@ class CommandHandler:
             await self.search_uid_handler(ctx, query)
             return
 
+        cached: bool = self._item_handler.is_search_cached(search_param=query)
         start = time.time()
-        search_results: Set[Item] = self._item_handler.search(search_param=query)
+        search_results: Optional[List[ScoredItem]] = await self._ranked_search(ctx, query)
         end = time.time()
+        if search_results is None:
+            return
+
+        self._logger.debug("Item search cache: {}".format(self._item_handler.search_cache_stats))
 
         if not search_results:
-            await ctx.author.send(_("Your search for ['{}'] awarded 0 results.").format(query))
+            self.send_message(ctx.author, _("Your search for ['{}'] awarded 0 results.").format(query))
+        elif cached:
+            self.send_partitioned_message(
+                ctx.author,
+                _("Your search for ['{}'] awarded {} and was served from cache in {} seconds.").format(
+                    query, list(map(lambda x: str(x.item), search_results)), round(end - start, 4)
+                ),
+            )
         else:
-            await self.send_partitioned_message(
+            self.send_partitioned_message(
                 ctx.author,
                 _("Your search for ['{}'] awarded {} and was completed in {} seconds.").format(
-                    query, set(map(lambda x: str(x), search_results)), round(end - start, 4)
+                    query, list(map(lambda x: str(x.item), search_results)), round(end - start, 4)
+                ),
+            )
+
+    async def _ranked_search(
+        self, ctx: Context, query: str, k: Optional[int] = RANKED_SEARCH_RESULTS
+    ) -> Optional[List[ScoredItem]]:
+        """
+        Searches for items off the event loop, if so configured (see AsyncItemHandler). Should the search take too
+        long, the author gets told so.
+
+        :param ctx: The command's Context.
+        :param query: The search's query.
+        :param k: The maximum amount of results. Unbounded if None.
+        :return: The best matches, best first; or None if the search took too long.
+        """
+        try:
+            return await self._item_search.ranked_search(search_param=query, k=k)
+        except asyncio.TimeoutError:
+            self._logger.warning(
+                "Search for [{}] timed out ({} searches pending)".format(query, self._item_search.pending)
+            )
+            self.send_message(
+                ctx.author,
+                _("Your search for ['{}'] took too long. Please try again with a more specific query.").format(query),
+            )
+            return None
+
+    async def complete_handler(self, ctx: Context, prefix: str) -> None:
+        self._logger.debug(
+            "[COMPLETE] - [{}] command called by [{}] with argument [{}]".format(ctx.command, ctx.author, prefix)
+        )
+
+        start = time.time()
+        search_results: List[Item] = self._item_handler.complete(prefix=prefix)
+        end = time.time()
+
+        if not search_results:
+            self.send_message(ctx.author, _("No items start with ['{}'].").format(prefix))
+        else:
+            self.send_partitioned_message(
+                ctx.author,
+                _("Items starting with ['{}']: {}. Completed in {} seconds.").format(
+                    prefix, list(map(lambda x: str(x), search_results)), round(end - start, 6)
+                ),
+            )
+
+    async def filter_handler(self, ctx: Context, expressions: Sequence[str]) -> None:
+        self._logger.debug(
+            "[FILTER] - [{}] command called by [{}] with arguments {}".format(
+                ctx.command, ctx.author, list(expressions)
+            )
+        )
+
+        query: AttributeQuery
+        try:
+            query = parse_query(expressions)
+        except ValueError as e:
+            self._logger.debug("Invalid filter: {}".format(e))
+            self.send_message(
+                ctx.author,
+                _(
+                    "Invalid filter [{}]. Filters look like 'clase=Trabajador', 'daño_max>=10' or 'orden=precio'."
+                ).format(" ".join(expressions)),
+            )
+            return
+
+        start = time.time()
+        search_results: List[Item] = self._item_handler.filter_items(query=query)
+        end = time.time()
+
+        if not search_results:
+            self.send_message(ctx.author, _("No items match filters [{}].").format(" ".join(expressions)))
+        else:
+            self.send_partitioned_message(
+                ctx.author,
+                _("Items matching filters [{}]: {}. Completed in {} seconds.").format(
+                    " ".join(expressions), list(map(lambda x: str(x), search_results)), round(end - start, 6)
                 ),
             )
 
@@ -171,18 +359,19 @@ class CommandHandler:
         end = time.time()
 
         if not search_result:
-            await ctx.author.send(_("Your search for ['{}'] awarded 0 results.").format(item_uid))
+            self.send_message(ctx.author, _("Your search for ['{}'] awarded 0 results.").format(item_uid))
         else:
-            await self.send_partitioned_message(
+            self.send_partitioned_message(
                 ctx.author,
                 _("Your search for ['{}'] awarded [{}] and was completed in {} seconds.").format(
                     item_uid, str(search_result), round(end - start, 4)
                 ),
             )
 
-    async def send_announcement(self, ctx: Context, channel_id: int, msg: str) -> None:
+    def send_announcement(self, ctx: Context, channel_id: int, msg: str) -> None:
         """
-        Sends a global announcement to the given channel
+        Sends a global announcement to the given channel; within the next digest of announcements, unless digests are
+        disabled (see AnnouncementDigest).
 
         :param ctx: The message's Context.
         :param channel_id: The target Channel's ID.
@@ -191,30 +380,84 @@ class CommandHandler:
         channel = ctx.bot.get_channel(channel_id)
         if channel is not None:
             self._logger.info("Announcing message [{}] in channel [{}]".format(msg, str(channel)))
-            await channel.send(msg)
+            self._announcements.announce(channel, msg)
+            self._logger.debug("Announcement digests: {}".format(self._announcements.stats))
         else:
             self._logger.error(
                 "Should have announced message in channel [{}], but it couldn't be found".format(str(channel))
             )
 
     @staticmethod
-    def get_user_by_id(ctx: Context, user_id: int) -> User:
+    def get_guild_id(ctx: Context) -> Optional[int]:
+        """
+        Retrieves the ID of the guild the command was called from.
+
+        :param ctx: The command's Context.
+        :return: The guild's ID, or None if the command was DMed.
         """
-        Retrieves the corresponding Discord's User by ID.
+        return ctx.guild.id if ctx.guild is not None else None
+
+    async def get_user_by_id(self, ctx: Context, user_id: int) -> Optional[User]:
+        """
+        Retrieves the corresponding Discord's User by ID; from the bot's cache if there, fetching it otherwise (see
+        UserResolver).
 
         :param ctx: The search's Context.
         :param user_id: The ID to be searched.
+        :return: The User, or None if there is no such user.
         """
-        return ctx.bot.get_user(user_id)
+        return await self._user_resolver.resolve(ctx.bot, user_id)
 
-    @staticmethod
-    async def send_partitioned_message(target: Context, msg: str, wrap_at=2000) -> None:
+    async def notify_user(self, ctx: Context, user: Union[User, int], msg: str) -> None:
         """
-        Sends a message to Author/Channel, honoring Discord's maximum message length.
+        Sends a message to the given user, resolving it first if given by ID. Failures are logged rather than raised, so
+        that notifying several users at once isn't cut short by any one of them.
+
+        :param ctx: The message's Context.
+        :param user: The User to notify, or its ID.
+        :param msg: The message to send.
+        """
+        try:
+            target: Optional[User] = await self.get_user_by_id(ctx, user) if isinstance(user, int) else user
+        except Exception as e:
+            self._logger.error("User [{}] could not be resolved: {}".format(user, e))
+            return
+
+        if target is None:
+            self._logger.error("Should have notified user [{}], but it couldn't be found".format(user))
+            return
+        self.send_message(target, msg)
 
-        :param target: The message's Context.
+    def send_message(self, target: Messageable, msg: str) -> "asyncio.Future[None]":
+        """
+        Sends a message to Author/Channel. It returns right away: the message gets queued up to be sent, paced within
+        Discord's rate limits (see OutboundDispatcher).
+
+        :param target: The User or Channel to send the message to.
+        :param msg: The message to send.
+        :return: A future that completes once the message got delivered, or fails if it couldn't be.
+        """
+        return self._dispatcher.send(target, msg)
+
+    def send_partitioned_message(self, target: Messageable, msg: str, wrap_at=MESSAGE_MAX_LENGTH) -> None:
+        """
+        Sends a message to Author/Channel, honoring Discord's maximum message length: it gets split between lines, and
+        only lines too long for a single message get split themselves. It returns right away, as send_message does.
+
+        :param target: The User or Channel to send the message to.
         :param msg: The message to partition.
         :param wrap_at: The maximum message length. Defaults to Discord's max.
         """
-        for line in textwrap.wrap(text=msg, width=wrap_at, replace_whitespace=False):
-            await target.send(line)
+        self.send_lines(target, msg.split("\n"), wrap_at=wrap_at)
+
+    def send_lines(self, target: Messageable, lines: Iterable[str], wrap_at=MESSAGE_MAX_LENGTH) -> None:
+        """
+        Sends the given lines to Author/Channel, packed into as few messages as possible without splitting any of them
+        (see pack_lines). It returns right away, as send_message does.
+
+        :param target: The User or Channel to send the lines to.
+        :param lines: The lines to send, such as rendered sales.
+        :param wrap_at: The maximum message length. Defaults to Discord's max.
+        """
+        for message in pack_lines(lines, max_length=wrap_at):
+            self.send_message(target, message)
@@ -1,7 +1,11 @@
 import hashlib
+import sys
+from typing import Optional
 
 from unidecode import unidecode
 
+from src.entity.item_attributes import ItemAttributes
+
 UID_PREFIX: str = "uid:"
 
 
@@ -10,12 +14,27 @@ class Item:
     Represents a sellable entity.
     """
 
-    def __init__(self, name: str, base_price: int):
-        md5 = hashlib.md5()
-        md5.update(name.encode(encoding="UTF-8", errors="strict"))
-        self._uid = md5.hexdigest()[:8].upper()  # reasonably collision-free UID for dataset
+    __slots__ = ("_uid", "_name", "_sanitized_name", "_base_price", "_attributes")
+
+    def __init__(
+        self,
+        name: str,
+        base_price: Optional[int],
+        uid: Optional[str] = None,
+        sanitized_name: Optional[str] = None,
+        attributes: ItemAttributes = ItemAttributes(),
+    ):
+        if not uid:
+            md5 = hashlib.md5()
+            md5.update(name.encode(encoding="UTF-8", errors="strict"))
+            uid = md5.hexdigest()[:8].upper()  # reasonably collision-free UID for dataset
+
+        self._uid = sys.intern(uid)  # sales reference Items by UID; interned, they all share the catalog's string
         self._name = name
+        # computed once; names are immutable
+        self._sanitized_name = sanitized_name if sanitized_name is not None else unidecode(name.lower())
         self._base_price = base_price
+        self._attributes = attributes
 
     @property
     def uid(self) -> str:
@@ -27,11 +46,15 @@ class Item:
 
     @property
     def sanitized_name(self) -> str:
-        return unidecode(self._name.lower())
+        return self._sanitized_name
 
     @property
-    def base_price(self) -> int:
+    def base_price(self) -> Optional[int]:
         return self._base_price
 
+    @property
+    def attributes(self) -> ItemAttributes:
+        return self._attributes
+
     def __str__(self) -> str:
         return "{} <{}{}>".format(self.name, UID_PREFIX, self.uid)
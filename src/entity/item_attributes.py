@@ -0,0 +1,158 @@
+import re
+from typing import Any, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from unidecode import unidecode
+
+CLASSES: Tuple[str, ...] = (
+    "Asesino",
+    "Bandido",
+    "Bardo",
+    "Clérigo",
+    "Druida",
+    "Guerrero",
+    "Ladrón",
+    "Mago",
+    "Minero",
+    "Paladín",
+    "Trabajador",
+)
+RACES: Tuple[str, ...] = ("Humano", "Elfo", "Elfo Oscuro", "Enano", "Gnomo")
+GENDERS: Tuple[str, ...] = ("Hombre", "Mujer")
+
+_CLASSES_BY_SANITIZED_NAME: Dict[str, str] = {unidecode(c.lower()): c for c in CLASSES}
+_RACES_BY_SANITIZED_NAME: Dict[str, str] = {unidecode(r.lower()): r for r in RACES}
+_GENDERS_BY_SANITIZED_NAME: Dict[str, str] = {unidecode(g.lower()): g for g in GENDERS}
+# races are listed glued together ('HumanoElfoElfo Oscuro'), so they are matched longest name first
+_RACES_LONGEST_FIRST: Tuple[str, ...] = tuple(sorted(RACES, key=len, reverse=True))
+
+_RANGE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+_EXCEPT_PATTERN = re.compile(r"^todas menos (.+)$")
+
+
+class ItemAttributes(NamedTuple):
+    """
+    Typed attributes of an Item, as listed in the item list. Missing attributes are None.
+
+    Restrictions (classes, races and gender) are None when the Item is usable by everyone; otherwise they hold the
+    names of whoever may use it.
+    """
+
+    min_damage: Optional[int] = None
+    max_damage: Optional[int] = None
+    min_defense: Optional[int] = None
+    max_defense: Optional[int] = None
+    min_magic_defense: Optional[int] = None
+    max_magic_defense: Optional[int] = None
+    hunger: Optional[int] = None
+    thirst: Optional[int] = None
+    classes: Optional[FrozenSet[str]] = None
+    races: Optional[FrozenSet[str]] = None
+    genders: Optional[FrozenSet[str]] = None
+
+    @staticmethod
+    def from_item_list_entry(entry: Dict[str, Any]) -> "ItemAttributes":
+        """
+        Parses the attributes out of an item list entry. Raises a ValueError if any of them is malformed.
+
+        :param entry: The item list entry, as read from the JSON item list.
+        """
+        min_damage, max_damage = _parse_range(entry.get("daño"))
+        min_defense, max_defense = _parse_range(entry.get("def"))
+        min_magic_defense, max_magic_defense = _parse_range(entry.get("def mag"))
+
+        return ItemAttributes(
+            min_damage=min_damage,
+            max_damage=max_damage,
+            min_defense=min_defense,
+            max_defense=max_defense,
+            min_magic_defense=min_magic_defense,
+            max_magic_defense=max_magic_defense,
+            hunger=_parse_int(entry.get("hambre")),
+            thirst=_parse_int(entry.get("sed")),
+            classes=_parse_classes(entry.get("clases permitidas")),
+            races=_parse_races(entry.get("raza")),
+            genders=_parse_genders(entry.get("género")),
+        )
+
+
+def parse_class(name: str) -> str:
+    """
+    Returns the canonical name of the given class, which may come in any case and with or without accents. Raises a
+    ValueError if there is no such class.
+
+    :param name: A class name.
+    """
+    return _canonical(name, _CLASSES_BY_SANITIZED_NAME, "class")
+
+
+def parse_race(name: str) -> str:
+    """
+    Returns the canonical name of the given race, which may come in any case and with or without accents. Raises a
+    ValueError if there is no such race.
+
+    :param name: A race name.
+    """
+    return _canonical(name, _RACES_BY_SANITIZED_NAME, "race")
+
+
+def parse_gender(name: str) -> str:
+    """
+    Returns the canonical name of the given gender, which may come in any case and with or without accents. Raises a
+    ValueError if there is no such gender.
+
+    :param name: A gender name.
+    """
+    return _canonical(name, _GENDERS_BY_SANITIZED_NAME, "gender")
+
+
+def _canonical(name: str, names: Dict[str, str], kind: str) -> str:
+    canonical = names.get(" ".join(unidecode(name.lower()).split()))
+    if canonical is None:
+        raise ValueError("Unknown {} [{}]".format(kind, name))
+    return canonical
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    value = (value or "").strip()
+    return int(value) if value else None
+
+
+def _parse_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    value = (value or "").strip()
+    if not value:
+        return None, None
+
+    match = _RANGE_PATTERN.match(value)
+    if match is None:
+        raise ValueError("Malformed range [{}]".format(value))
+    return int(match.group(1)), int(match.group(2))
+
+
+def _parse_classes(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Parses 'Todas', '-', 'Guerrero', 'Guerrero y Ladrón' and 'Todas menos Mago y Bardo' alike."""
+    value = " ".join(unidecode((value or "").lower()).split())
+    if value in ("", "-", "todas"):
+        return None
+
+    excluded = _EXCEPT_PATTERN.match(value)
+    names = frozenset(parse_class(name) for name in (excluded.group(1) if excluded else value).split(" y "))
+    return frozenset(CLASSES) - names if excluded else names
+
+
+def _parse_races(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Parses both 'Enano Gnomo' and 'HumanoElfoElfo Oscuro' alike."""
+    value = (value or "").strip()
+    races = set()
+    while value:
+        race = next((r for r in _RACES_LONGEST_FIRST if value.startswith(r)), None)
+        if race is None:
+            raise ValueError("Malformed race restriction [{}]".format(value))
+        races.add(race)
+        value = value[len(race) :].strip()
+
+    return frozenset(races) if races and races != set(RACES) else None
+
+
+def _parse_genders(value: Optional[str]) -> Optional[FrozenSet[str]]:
+    value = (value or "").strip()
+    return None if value in ("", "Ambos") else frozenset([parse_gender(value)])
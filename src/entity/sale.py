@@ -1,22 +1,40 @@
 from __future__ import annotations
 
+import sys
 import uuid
-from datetime import datetime
-from typing import Callable, Dict
+from datetime import date, datetime
+from typing import Any, Dict, Optional
 
 from src.aux.typing import get_or_else_throw
 from src.entity.item import Item
 from src.handler.item import ItemHandler
-from src.i18n.i18n import I18n
-
-_: Callable[[str], str] = lambda s: I18n().gettext(s)
+from src.render.sale_renderer import SaleRenderer
 
 
 class Sale:
     """
     Represents a sale-offer entity.
+
+    Markets may list a great many sales at once, so instances are slotted (no per-instance __dict__); the UIDs and
+    sellers that repeat across sales are interned; and the sale's dates are only worked out of its timestamps once.
     """
 
+    __slots__ = (
+        "_item_uid",
+        "_quantity",
+        "_price",
+        "_seller",
+        "_seller_discord_id",
+        "_from_date_timestamp",
+        "_to_date_timestamp",
+        "_sale_uid",
+        "_from_day",
+        "_to_day",
+    )
+
+    # fields that make up the persisted form of a sale
+    PERSISTED_FIELDS = __slots__[:8]
+
     def __init__(
         self,
         item_uid: str,
@@ -29,14 +47,17 @@ class Sale:
         sale_uid: str = None,
     ):
 
-        self._item_uid = item_uid
+        self._item_uid = sys.intern(item_uid)
         self._quantity = quantity
         self._price = price
-        self._seller = seller
+        self._seller = sys.intern(seller)
         self._seller_discord_id = seller_discord_id
         self._from_date_timestamp = from_date_timestamp
         self._to_date_timestamp = to_date_timestamp
         self._sale_uid = sale_uid if sale_uid else str(uuid.uuid4())
+        # calendar days, derived lazily from the timestamps above
+        self._from_day: Optional[date] = None
+        self._to_day: Optional[date] = None
 
     @property
     def sale_uid(self) -> str:
@@ -62,6 +83,14 @@ class Sale:
     def seller_discord_id(self) -> int:
         return self._seller_discord_id
 
+    @property
+    def from_date_timestamp(self) -> float:
+        return self._from_date_timestamp
+
+    @property
+    def to_date_timestamp(self) -> float:
+        return self._to_date_timestamp
+
     @property
     def from_date(self) -> datetime:
         return datetime.fromtimestamp(self._from_date_timestamp)
@@ -70,10 +99,22 @@ class Sale:
     def to_date(self) -> datetime:
         return datetime.fromtimestamp(self._to_date_timestamp)
 
+    @property
+    def from_day(self) -> date:
+        if self._from_day is None:
+            self._from_day = date.fromtimestamp(self._from_date_timestamp)
+        return self._from_day
+
+    @property
+    def to_day(self) -> date:
+        if self._to_day is None:
+            self._to_day = date.fromtimestamp(self._to_date_timestamp)
+        return self._to_day
+
     @property
     def item(self) -> Item:
         # sale's item's UID is guaranteed to yield a valid result
-        return get_or_else_throw(ItemHandler().uid_search(self._item_uid))
+        return get_or_else_throw(ItemHandler().catalog.get_by_uid(self._item_uid))
 
     @staticmethod
     def from_dict(dic: Dict) -> Sale:
@@ -88,15 +129,9 @@ class Sale:
             sale_uid=dic["_sale_uid"],
         )
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the sale's persisted form (see from_dict)."""
+        return {field: getattr(self, field) for field in Sale.PERSISTED_FIELDS}
+
     def __str__(self) -> str:
-        return _(
-            "User [{}] offers [{}] units of item [{}] for [{}] coins, from [{}] until [{}]. Sale's UID: {}"
-        ).format(
-            self.seller,
-            self.quantity,
-            self.item.name,
-            self.price,
-            self.from_date.date(),
-            self.to_date.date(),
-            self.sale_uid,
-        )
+        return SaleRenderer().render(self)
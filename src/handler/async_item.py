@@ -0,0 +1,117 @@
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from src.aux.bounded_executor import BoundedExecutor
+from src.aux.configuration import ITEM_SEARCH_INLINE, ITEM_SEARCH_PROCESS, ITEM_SEARCH_THREAD, Configuration
+from src.aux.logger import Logger
+from src.aux.singleton import Singleton
+from src.aux.typing import get_or_else_throw
+from src.entity.item import Item
+from src.handler.item import FUZZY_CUTOFF, RANKED_SEARCH_RESULTS, ItemHandler
+from src.index.ranking import ScoredItem
+
+
+def _load_catalog() -> None:
+    """Worker process initializer: loads (and indexes) the item catalog once, as the worker starts; unless inherited."""
+    ItemHandler()
+
+
+def _ranked_search(search_param: str, k: Optional[int], cutoff: float) -> List[Tuple[str, float]]:
+    """Runs a ranked search on a worker, returning item UIDs rather than Items: they are cheaper to send back."""
+    return [(match.item.uid, match.score) for match in ItemHandler().uncached_ranked_search(search_param, k, cutoff)]
+
+
+class AsyncItemHandler(metaclass=Singleton):
+    """
+    Asynchronous counterpart of ItemHandler's fuzzy searches, meant to be awaited from the event loop.
+
+    Searches are CPU-bound, and a pathological query may take long enough to stall the bot (gateway heartbeats
+    included). So, if configured to, they run on a pool of worker processes (each holding the catalog, loaded once as
+    it starts) or of threads, with a timeout and a bounded amount of pending searches; further searches wait for a slot.
+    By default they run inline, as they always did. Either way, results are cached on the event loop's side.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._logger = Logger(self.__class__.__name__)
+        self._logger.info("Initializing async Item handler...")
+
+        configuration = Configuration()
+        self._item_handler = ItemHandler()
+        self._executor: Optional[BoundedExecutor] = None
+
+        kind: str = configuration.get_item_search_executor()
+        if kind != ITEM_SEARCH_INLINE:
+            self._logger.info(
+                "Running item searches on {} {} workers...".format(configuration.get_item_search_workers(), kind)
+            )
+            self._executor = BoundedExecutor(
+                self._build_executor(kind, configuration.get_item_search_workers()),
+                max_pending=configuration.get_item_search_max_pending(),
+                timeout=configuration.get_item_search_timeout(),
+            )
+
+    @staticmethod
+    def _build_executor(kind: str, workers: int) -> Executor:
+        """
+        Builds the configured pool of search workers.
+
+        :param kind: Either 'thread' or 'process'.
+        :param workers: The amount of workers.
+        """
+        if kind == ITEM_SEARCH_THREAD:
+            return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="item-search")
+        if kind == ITEM_SEARCH_PROCESS:
+            # forked where possible, as the bot starts: workers inherit the already loaded catalog, and don't re-run the
+            # bot's main module (as spawned ones do). Elsewhere, each spawned worker loads the catalog itself
+            start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(start_method), initializer=_load_catalog
+            )
+            for _worker in range(workers):
+                executor.submit(_load_catalog)  # starts the workers right away, rather than on the first search
+            return executor
+        raise Exception(
+            "Unknown item search executor [{}]. Expected either 'inline', 'thread' or 'process'.".format(kind)
+        )
+
+    async def ranked_search(
+        self, search_param: str, k: Optional[int] = RANKED_SEARCH_RESULTS, cutoff: float = FUZZY_CUTOFF
+    ) -> List[ScoredItem]:
+        """
+        See ItemHandler.ranked_search.
+
+        :raises asyncio.TimeoutError: If the search took longer than the configured timeout.
+        """
+        if self._executor is None:
+            return self._item_handler.ranked_search(search_param, k, cutoff)
+
+        cached: Optional[List[ScoredItem]] = self._item_handler.get_cached_search(search_param, k, cutoff)
+        if cached is not None:
+            return cached
+
+        matches: List[Tuple[str, float]] = await self._executor.run(_ranked_search, search_param, k, cutoff)
+        catalog = self._item_handler.catalog
+        result = [ScoredItem(get_or_else_throw(catalog.get_by_uid(uid)), score) for uid, score in matches]
+        self._item_handler.cache_search(search_param, k, cutoff, result)
+
+        return result
+
+    async def search(self, search_param: str) -> Set[Item]:
+        """
+        See ItemHandler.search.
+
+        :raises asyncio.TimeoutError: If the search took longer than the configured timeout.
+        """
+        return {match.item for match in await self.ranked_search(search_param, k=None)}
+
+    @property
+    def pending(self) -> int:
+        """Returns the amount of searches handed to workers and not done yet."""
+        return self._executor.pending if self._executor is not None else 0
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from src.aux.configuration import Configuration
+from src.aux.logger import Logger
+from src.entity.item import Item
+from src.entity.sale import Sale
+from src.handler.sale import SaleHandler
+from src.storage.async_sale_storage import AsyncSaleStorage
+from src.storage.group_commit import GroupCommitStats
+from src.storage.pagination import SalePage
+
+
+class AsyncSaleHandler:
+    """
+    Asynchronous counterpart of SaleHandler, meant to be awaited from the event loop: storage work runs on a dedicated
+    thread pool (reads on several threads, writes on a single one and in order), so it never stalls the bot. With group
+    commit on, writes of concurrent commands get batched into a single write to the storage.
+    """
+
+    def __init__(self, sale_handler: SaleHandler) -> None:
+        """
+        :param sale_handler: The handler of the market to front.
+        """
+        super().__init__()
+
+        self._logger = Logger(self.__class__.__name__)
+        self._logger.info("Initializing async Sale handler of {}...".format(sale_handler.market))
+
+        configuration = Configuration()
+        self._sale_handler = sale_handler
+        self._storage = AsyncSaleStorage(
+            self._sale_handler.storage,
+            group_commit_window=configuration.get_sale_group_commit_window() / 1000,
+            group_commit_max_batch=configuration.get_sale_group_commit_max_batch(),
+        )
+
+    async def create_sale(self, item: Item, quantity: int, price: int, seller: str, seller_id: int) -> Sale:
+        result: Sale = self._sale_handler.new_sale(item, quantity, price, seller, seller_id)
+        await self._storage.insert(result)
+        return result
+
+    async def get_sale_by_sale_uid(self, sale_uid: str) -> Optional[Sale]:
+        return await self._storage.get_by_sale_uid(sale_uid)
+
+    async def get_all_sales(self) -> List[Sale]:
+        return await self._storage.get_all()
+
+    async def get_sales_by_item_uid(self, item_uid: str) -> List[Sale]:
+        return await self._storage.get_by_item_uids([item_uid])
+
+    async def get_sales_by_item_uids(self, item_uids: List[str]) -> List[Sale]:
+        return await self._storage.get_by_item_uids(item_uids)
+
+    async def get_sales_page(
+        self, page_size: int, cursor: Optional[str] = None, item_uids: Optional[List[str]] = None
+    ) -> SalePage:
+        """See SaleHandler.get_sales_page."""
+        return await self._storage.read(self._sale_handler.get_sales_page, page_size, cursor, item_uids)
+
+    async def remove_sale_by_sale_uid(self, sale_uid: str) -> int:
+        return await self._storage.remove_by_sale_uid(sale_uid)
+
+    async def claim_sale(self, sale_uid: str, buyer: str) -> Optional[Sale]:
+        """See SaleHandler.claim_sale."""
+        sale: Optional[Sale] = await self._storage.claim(sale_uid)
+        if sale is not None:
+            self._logger.debug("Sale [{}] claimed by [{}].".format(sale_uid, buyer))
+        return sale
+
+    async def remove_stale_sales(self) -> int:
+        return await self._storage.remove_expired(datetime.today().timestamp())
+
+    async def get_next_expiry(self) -> Optional[float]:
+        """Returns the end timestamp of the sale that expires the soonest, or None if there are no sales."""
+        return await self._storage.read(self._sale_handler.get_next_expiry)
+
+    def add_expiry_listener(self, listener: Callable[[float], None]) -> None:
+        """See SaleHandler.add_expiry_listener. The listener gets called from the writer thread."""
+        self._sale_handler.add_expiry_listener(listener)
+
+    async def check_consistency(self) -> bool:
+        """See SaleHandler.check_consistency. It runs in order with writes, as it may rebuild the index."""
+        return await self._storage.write(self._sale_handler.check_consistency)
+
+    async def close(self) -> None:
+        """Waits for every pending write, then closes the underlying sale storage."""
+        await self._storage.drain()  # on the event loop: group commits are queued up there
+        await asyncio.get_event_loop().run_in_executor(None, self._close_storage)
+
+    def _close_storage(self) -> None:
+        # blocks until every write is done
+        self._storage.close()
+        self._sale_handler.close()
+
+    @property
+    def guild_id(self) -> Optional[int]:
+        """See SaleHandler.guild_id."""
+        return self._sale_handler.guild_id
+
+    @property
+    def market(self) -> str:
+        """See SaleHandler.market."""
+        return self._sale_handler.market
+
+    @property
+    def group_commit_stats(self) -> Optional[GroupCommitStats]:
+        """Returns the metrics of batched sale writes, or None if group commit is off."""
+        return self._storage.group_commit_stats
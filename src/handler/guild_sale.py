@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from src.aux.configuration import Configuration
+from src.aux.logger import Logger
+from src.aux.resource_pool import ResourcePool
+from src.aux.singleton import Singleton
+from src.handler.async_sale import AsyncSaleHandler
+from src.handler.sale import SaleHandler
+from src.scheduler.stale_offer_cleanup_job import StaleOfferCleanupJob
+
+# how often markets that went idle get looked for, as a fraction of the idle timeout
+IDLE_CHECK_FRACTION: float = 0.25
+
+
+class GuildSaleHandlers(metaclass=Singleton):
+    """
+    The sale markets of every guild the bot serves, each with storage, index and stale offers cleanup of its own: a
+    guild's commands only ever pay for the size of that guild's market, and a busy guild doesn't slow down the others.
+
+    Markets are opened on first use, and closed after going unused for the configured idle timeout. DMs (and the
+    configured home guild) are served from the home market.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._logger = Logger(self.__class__.__name__)
+        self._logger.info("Initializing guild Sale handlers...")
+
+        configuration = Configuration()
+        self._home_guild_id: Optional[int] = configuration.get_home_guild_id()
+        self._idle_timeout: float = configuration.get_guild_idle_timeout()
+        self._markets: ResourcePool[Optional[int], AsyncSaleHandler] = ResourcePool(
+            self._open, self._close, idle_timeout=self._idle_timeout
+        )
+        self._cleanup_jobs: Dict[Optional[int], StaleOfferCleanupJob] = dict()
+        self._janitor: Optional[asyncio.Task] = None
+
+    def market_of(self, guild_id: Optional[int]) -> Optional[int]:
+        """
+        Returns the key of the market that serves the given guild: None (the home market) for DMs and for the home
+        guild; the guild's ID otherwise.
+
+        :param guild_id: The guild's ID; or None for DMs.
+        """
+        return None if guild_id == self._home_guild_id else guild_id
+
+    @asynccontextmanager
+    async def use(self, guild_id: Optional[int]) -> AsyncIterator[AsyncSaleHandler]:
+        """
+        Uses the market that serves the given guild, opening it if needed. It won't be closed while in use.
+
+        :param guild_id: The guild's ID; or None for DMs.
+        """
+        async with self._markets.use(self.market_of(guild_id)) as sale_handler:
+            yield sale_handler
+
+    def start(self) -> GuildSaleHandlers:
+        """Starts closing markets as they go idle."""
+        self._janitor = asyncio.get_event_loop().create_task(self._close_idle_markets())
+        return self
+
+    async def close(self) -> None:
+        """Stops closing idle markets, and closes every market."""
+        if self._janitor is not None:
+            self._janitor.cancel()
+        await self._markets.close_all()
+
+    async def _close_idle_markets(self) -> None:
+        while True:
+            await asyncio.sleep(self._idle_timeout * IDLE_CHECK_FRACTION)
+            closed: List[Optional[int]] = await self._markets.close_idle()
+            if closed:
+                self._logger.info("Closed {} idle markets. {} remain open.".format(len(closed), len(self._markets)))
+
+    async def _open(self, market: Optional[int]) -> AsyncSaleHandler:
+        # loading a market reads its whole storage: keep it off the event loop
+        sale_handler = AsyncSaleHandler(await asyncio.get_event_loop().run_in_executor(None, SaleHandler, market))
+        self._cleanup_jobs[market] = StaleOfferCleanupJob(sale_handler).start()
+        return sale_handler
+
+    async def _close(self, sale_handler: AsyncSaleHandler) -> None:
+        job: StaleOfferCleanupJob = self._cleanup_jobs.pop(sale_handler.guild_id)
+        job.stop()
+        await job.stopped()
+        await sale_handler.close()
@@ -1,12 +1,32 @@
-import difflib
 import json
-from typing import Iterable, List, Optional, Set
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 import unidecode
 
+from src.aux.configuration import Configuration
 from src.aux.logger import Logger
+from src.aux.lru_cache import CacheStats, LRUCache
 from src.aux.singleton import Singleton
 from src.entity.item import UID_PREFIX, Item
+from src.entity.item_attributes import ItemAttributes
+from src.index.attribute import AttributeIndex, AttributeQuery
+from src.index.catalog import ItemCatalog
+from src.index.ngram import NGramIndex
+from src.index.prefix import PrefixIndex
+from src.index.ranking import ScoredItem, rank
+from src.index.snapshot import CatalogSnapshot
+from src.index.typo import TypoIndex
+
+ITEM_LIST_PATH: str = "resources/items.json"
+ITEM_LIST_SNAPSHOT_PATH: str = "db/items.snapshot"
+
+# maximum amount of n-gram candidates that get scored by the fuzzy matcher on each search
+FUZZY_CANDIDATES_LIMIT: int = 250
+# minimum SequenceMatcher ratio for a non-substring candidate to be considered a match
+FUZZY_CUTOFF: float = 0.6
+# default amount of results of a ranked search
+RANKED_SEARCH_RESULTS: int = 25
 
 
 class ItemHandler(metaclass=Singleton):
@@ -16,26 +36,74 @@ class ItemHandler(metaclass=Singleton):
         self._logger = Logger(self.__class__.__name__)
         self._logger.info("Initializing Item handler...")
 
+        configuration = Configuration()
+        self._ngram_size: int = configuration.get_search_ngram_size()
+        self._search_cache: LRUCache[Tuple[str, Optional[int], float], Tuple[ScoredItem, ...]] = LRUCache(
+            configuration.get_search_cache_size()
+        )
+
         self._logger.info("Loading item list...")
-        self._items: Set[Item] = set()
+        start = time.perf_counter()
+
+        items, from_snapshot = CatalogSnapshot(ITEM_LIST_PATH, ITEM_LIST_SNAPSHOT_PATH).load(self._read_item_list)
+        loaded = time.perf_counter()
+        self._index(items)
+        indexed = time.perf_counter()
+
+        self._logger.info(
+            "Loaded {} sellable items {} in {} ms (indexed in {} ms)...".format(
+                self._catalog.__len__(),
+                "from snapshot" if from_snapshot else "from item list",
+                round((loaded - start) * 1000, 2),
+                round((indexed - loaded) * 1000, 2),
+            )
+        )
+
+    @staticmethod
+    def _read_item_list() -> List[Item]:
+        """
+        Parses the sellable Items (and their typed attributes) out of the item list, checking for UID collisions.
+        """
+        items: Dict[str, Item] = dict()
 
-        with open("resources/items.json") as json_file:
+        with open(ITEM_LIST_PATH) as json_file:
             data = json.load(json_file)
 
             for i in data:
                 if i["precio"] != "-":
-                    item2add: Item = Item(i["nombre"], i["precio"])
+                    item2add: Item = Item(
+                        i["nombre"],
+                        int(i["precio"]) if i["precio"].isdigit() else None,  # some items are listed as 'No se vende'
+                        attributes=ItemAttributes.from_item_list_entry(i),
+                    )
 
-                    if any(item2add.uid == item.uid for item in self._items):
+                    if item2add.uid in items:
                         # this scenario is _EXTREMELY_ unlikely is dataset was correct to begin with.
                         # collision(s) are a strong indicator of repeated items inside dataset.
                         raise Exception(
                             "Item UID collision detected with item {}. Aborting operation.".format(item2add)
                         )
 
-                    self._items.add(item2add)
+                    items[item2add.uid] = item2add
+
+        return list(items.values())
+
+    def _index(self, items: Iterable[Item]) -> None:
+        """
+        (Re)builds the catalog and every search index over the given Items.
+
+        :param items: The complete list of sellable Items.
+        """
+        self._catalog: ItemCatalog = ItemCatalog(items)
+        self._ngram_index: NGramIndex = NGramIndex(self._catalog.items, n=self._ngram_size)
+        self._prefix_index: PrefixIndex = PrefixIndex(self._catalog.items)
+        self._typo_index: TypoIndex = TypoIndex(self._catalog.items)
+        self._attribute_index: AttributeIndex = AttributeIndex(self._catalog.items)
+        self._search_cache.clear()  # cached results belong to the previous catalog
 
-        self._logger.info("Loaded {} sellable items...".format(self._items.__len__()))
+    @property
+    def catalog(self) -> ItemCatalog:
+        return self._catalog
 
     def is_uid(self, query: str) -> bool:
         """
@@ -62,46 +130,210 @@ class ItemHandler(metaclass=Singleton):
         :return:
         """
         uid = uid.replace(UID_PREFIX, "")
-        return next((item for item in self._items if item.uid.__eq__(uid)), None)
+        return self._catalog.get_by_uid(uid)
+
+    def complete(self, prefix: str, k: Optional[int] = RANKED_SEARCH_RESULTS) -> List[Item]:
+        """
+        Returns the potentially sellable Item(s) from the game whose name, or any word in it, starts with the given
+        prefix; in lexical order. Meant for autocompletion: it is a sorted index lookup, not a fuzzy search.
+
+        :param prefix: the beginning of the desired Item's name (or of any of its words).
+        :param k: the maximum amount of results. Unbounded if None.
+        """
+        return self._prefix_index.complete(unidecode.unidecode(prefix.lower()), k=k)
+
+    def filter_items(self, query: AttributeQuery, k: Optional[int] = RANKED_SEARCH_RESULTS) -> List[Item]:
+        """
+        Returns the potentially sellable Item(s) from the game whose attributes satisfy every filter of the given query
+        (for example: usable by Trabajador, with a max damage of at least 10); sorted as the query says. Runs over a
+        columnar attribute index, see AttributeIndex.
+
+        :param query: the attribute query; see parse_query.
+        :param k: the maximum amount of results. Unbounded if None.
+        """
+        return self._attribute_index.query(query, k=k)
 
     def search(self, search_param: str) -> Set[Item]:
         """
         Returns a list of potentially sellable Item(s) from the game that match the given query.
 
-        It uses a mix between literal substring comparisons and difflib's SequenceMatcher. The best matches among the
-        possibilities are returned in a set.
+        It uses a mix between literal substring comparisons and difflib's SequenceMatcher (see ranked_search). All the
+        "good enough" matches among the possibilities are returned in a set.
 
         :param search_param: word for which close matches are desired
         :return: a list of the best "good enough" matches.
         """
+        return {match.item for match in self.ranked_search(search_param, k=None)}
 
-        # initialize search ---
+    def ranked_search(
+        self, search_param: str, k: Optional[int] = RANKED_SEARCH_RESULTS, cutoff: float = FUZZY_CUTOFF
+    ) -> List[ScoredItem]:
+        """
+        Returns the k potentially sellable Item(s) from the game that best match the given query, alongside their
+        similarity score, best match first.
 
-        search_param = unidecode.unidecode(search_param.lower())  # sanitize input
+        It uses a mix between literal substring comparisons and difflib's SequenceMatcher. Both only look at the Items
+        that share character n-grams with the query, which are fetched from an inverted index instead of scanning the
+        whole catalog, so the work per query is bounded. Substring matches are always eligible, and rank above any other
+        candidate, which must score at least the given cutoff. Should nothing qualify, Items whose name (or any word in it) is within a
+        couple of typos of the query are returned instead, looked up in an edit-distance index.
 
-        def sequence_matcher(items: Iterable[Item], n: int, cutoff: float) -> List[Item]:  # define aux fuzzy matcher
-            matches: List = list()
-            for item in items:
-                if len(matches) > n:
-                    break
-                if difflib.SequenceMatcher(None, search_param, item.sanitized_name).ratio() >= cutoff:
-                    matches.append(item)
-            return matches
+        :param search_param: word for which close matches are desired
+        :param k: the maximum amount of results. Unbounded if None.
+        :param cutoff: the minimum score of non-substring matches, between 0 and 1.
+        :return: an ordered list of the best "good enough" matches.
+        """
+        cached: Optional[List[ScoredItem]] = self.get_cached_search(search_param, k, cutoff)
+        if cached is not None:
+            return cached
+
+        result = self.uncached_ranked_search(search_param, k, cutoff)
+        self.cache_search(search_param, k, cutoff, result)
 
-        # execute search algorithm ---
+        return result
 
-        full_match: Optional[Item] = next(
-            (item for item in self._items if item.sanitized_name.__eq__(search_param)), None
+    def uncached_ranked_search(
+        self, search_param: str, k: Optional[int] = RANKED_SEARCH_RESULTS, cutoff: float = FUZZY_CUTOFF
+    ) -> List[ScoredItem]:
+        """
+        Same as ranked_search, but bypassing the search cache: it neither reads nor writes it, so it can be run from any
+        thread (or process) at once.
+
+        :param search_param: word for which close matches are desired
+        :param k: the maximum amount of results. Unbounded if None.
+        :param cutoff: the minimum score of non-substring matches, between 0 and 1.
+        """
+        return self._ranked_search(self._search_cache_key(search_param, k, cutoff)[0], k, cutoff)
+
+    def get_cached_search(
+        self, search_param: str, k: Optional[int] = RANKED_SEARCH_RESULTS, cutoff: float = FUZZY_CUTOFF
+    ) -> Optional[List[ScoredItem]]:
+        """
+        Returns the cached results of the given ranked search, or None if they aren't cached.
+
+        :param search_param: word for which close matches are desired
+        :param k: the maximum amount of results. Unbounded if None.
+        :param cutoff: the minimum score of non-substring matches, between 0 and 1.
+        """
+        cached: Optional[Tuple[ScoredItem, ...]] = self._search_cache.get(
+            self._search_cache_key(search_param, k, cutoff)
+        )
+        return list(cached) if cached is not None else None
+
+    def cache_search(self, search_param: str, k: Optional[int], cutoff: float, results: Sequence[ScoredItem]) -> None:
+        """
+        Caches the results of the given ranked search, as computed elsewhere (see uncached_ranked_search).
+
+        :param search_param: word for which close matches are desired
+        :param k: the maximum amount of results. Unbounded if None.
+        :param cutoff: the minimum score of non-substring matches, between 0 and 1.
+        :param results: the search's results.
+        """
+        self._search_cache.put(self._search_cache_key(search_param, k, cutoff), tuple(results))
+
+    def search_many(
+        self,
+        search_params: Sequence[str],
+        k: Optional[int] = RANKED_SEARCH_RESULTS,
+        cutoff: float = FUZZY_CUTOFF,
+    ) -> List[List[ScoredItem]]:
+        """
+        Batch version of ranked_search, meant for bulk workloads (such as resolving a whole price sheet at once). Each
+        query's results are the same ranked_search would return.
+
+        The fuzzy candidates of all the queries are fetched from the n-gram index in a handful of vectorized passes (see
+        NGramIndex.search_many) instead of one query at a time; they are then scored, and fall back to typos, just like
+        ranked_search does.
+
+        :param search_params: words for which close matches are desired
+        :param k: the maximum amount of results per query. Unbounded if None.
+        :param cutoff: the minimum score of non-substring matches, between 0 and 1.
+        :return: for each query (in the same order), an ordered list of its best "good enough" matches.
+        """
+        sanitized_params: List[str] = [
+            self._search_cache_key(search_param, k, cutoff)[0] for search_param in search_params
+        ]
+        full_matches: List[Optional[Item]] = [self._catalog.get_by_sanitized_name(p) for p in sanitized_params]
+
+        fuzzy_candidates = iter(
+            self._ngram_index.search_many(
+                [p for p, full_match in zip(sanitized_params, full_matches) if full_match is None],
+                k=FUZZY_CANDIDATES_LIMIT,
+            )
         )
+
+        results: List[List[ScoredItem]] = list()
+        for search_param, full_match in zip(sanitized_params, full_matches):
+            if full_match is not None:
+                results.append([ScoredItem(full_match, 1.0)])
+                continue
+
+            candidates: List[Item] = [item for item, _ in next(fuzzy_candidates)]
+            results.append(
+                self._rank_candidates(
+                    search_param, self._ngram_index.substring_search(search_param), candidates, k, cutoff
+                )
+            )
+        return results
+
+    def is_search_cached(
+        self, search_param: str, k: Optional[int] = RANKED_SEARCH_RESULTS, cutoff: float = FUZZY_CUTOFF
+    ) -> bool:
+        """
+        Returns whether the results of the given ranked search are already cached. Does not count as a cache lookup.
+
+        :param search_param: word for which close matches are desired
+        :param k: the maximum amount of results. Unbounded if None.
+        :param cutoff: the minimum score of non-substring matches, between 0 and 1.
+        """
+        return self._search_cache_key(search_param, k, cutoff) in self._search_cache
+
+    @property
+    def search_cache_stats(self) -> CacheStats:
+        return self._search_cache.stats
+
+    @staticmethod
+    def _search_cache_key(search_param: str, k: Optional[int], cutoff: float) -> Tuple[str, Optional[int], float]:
+        return unidecode.unidecode(search_param.lower()), k, cutoff  # sanitize input
+
+    def _ranked_search(self, search_param: str, k: Optional[int], cutoff: float) -> List[ScoredItem]:
+        full_match: Optional[Item] = self._catalog.get_by_sanitized_name(search_param)
         if full_match is not None:
-            return {full_match}  # if we got one full match, stop searching - save resources
+            return [ScoredItem(full_match, 1.0)]  # if we got one full match, stop searching - save resources
 
         # if we didn't get one full match, we are going to do a best-effort fuzzy search
-        substring_name_matches: Set[Item] = set(
-            filter(lambda x: True if search_param in x.sanitized_name else False, self._items)
-        )
-        fuzzy_name_matches: List[Item] = sequence_matcher(self._items, 100, 0.6)
+        substring_name_matches: List[Item] = self._ngram_index.substring_search(search_param)
+        fuzzy_candidates: List[Item] = [
+            item for item, _ in self._ngram_index.search(search_param, k=FUZZY_CANDIDATES_LIMIT)
+        ]
+        return self._rank_candidates(search_param, substring_name_matches, fuzzy_candidates, k, cutoff)
 
-        substring_name_matches.update(fuzzy_name_matches)
+    def _rank_candidates(
+        self,
+        search_param: str,
+        substring_name_matches: List[Item],
+        fuzzy_candidates: List[Item],
+        k: Optional[int],
+        cutoff: float,
+    ) -> List[ScoredItem]:
+        """Scores the candidates of a query (substring matches first), falling back to typos should none qualify."""
+        # substring matches always rank above fuzzy ones, however well those score: they contain what was asked for
+        matches: List[ScoredItem] = rank(search_param, substring_name_matches, k=k, cutoff=0.0)
+        if k is None or len(matches) < k:
+            substrings: Set[Item] = set(substring_name_matches)
+            matches += rank(
+                search_param,
+                (item for item in fuzzy_candidates if item not in substrings),
+                k=None if k is None else k - len(matches),
+                cutoff=cutoff,
+            )
+        if matches:
+            return matches
 
-        return substring_name_matches
+        # nothing was "good enough": fall back to names (or words) within a couple of typos - "did you mean...?"
+        # closest first; scores decay linearly with distance
+        max_distance = self._typo_index.max_distance
+        return [
+            ScoredItem(item, 1 - distance / (max_distance + 1))
+            for item, distance in self._typo_index.lookup(search_param)[:k]
+        ]
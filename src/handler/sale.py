@@ -1,65 +1,189 @@
+import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-
-from tinydb import Query, TinyDB
+from typing import Callable, List, Optional
 
+from src.aux.configuration import SALE_STORAGE_JOURNAL, SALE_STORAGE_SQLITE, SALE_STORAGE_TINYDB, Configuration
 from src.aux.logger import Logger
-from src.aux.singleton import Singleton
 from src.entity.item import Item
 from src.entity.sale import Sale
-
-
-class SaleHandler(metaclass=Singleton):
-    def __init__(self) -> None:
+from src.storage.indexed_sale_storage import IndexedSaleStorage
+from src.storage.journal_sale_storage import JournalSaleStorage
+from src.storage.migration import migrate_tinydb_sales
+from src.storage.pagination import SalePage
+from src.storage.sale_storage import SaleStorage
+from src.storage.sqlite_sale_storage import SQLiteSaleStorage
+from src.storage.tinydb_sale_storage import TinyDBSaleStorage
+
+# the home market's sales are kept right in here; every other guild's, in a folder of its own under GUILDS_DIRECTORY
+SALE_DIRECTORY: str = "db"
+GUILDS_DIRECTORY: str = "db/guilds"
+SALE_TINYDB_FILE: str = "sale.json"
+SALE_SQLITE_FILE: str = "sale.sqlite3"
+SALE_JOURNAL_FILE: str = "sale.journal"
+
+
+class SaleHandler:
+    """
+    The sales of a single market: the home one (which DMs are served from), or a guild's. Each market has storage and
+    index of its own, so that its cost depends only on its own sales.
+    """
+
+    def __init__(self, guild_id: Optional[int] = None) -> None:
+        """
+        :param guild_id: The ID of the guild whose market to handle; or None for the home market.
+        """
         super().__init__()
 
         self._logger = Logger(self.__class__.__name__)
-        self._logger.info("Initializing Sale handler...")
+        self._guild_id = guild_id
+        self._directory = SALE_DIRECTORY if guild_id is None else os.path.join(GUILDS_DIRECTORY, str(guild_id))
+        self._logger.info("Initializing Sale handler of {}...".format(self.market))
+        os.makedirs(self._directory, exist_ok=True)
+
+        # reads are served from memory; writes go through to the configured storage
+        self._storage: IndexedSaleStorage = IndexedSaleStorage(self._build_storage(Configuration().get_sale_storage()))
+        self._logger.info("Loaded and indexed {} sales...".format(self._storage.count()))
+
+    def _build_storage(self, kind: str) -> SaleStorage:
+        """
+        Builds the configured sale storage. Sales from a former TinyDB database are migrated into SQLite (or into the
+        journal) on first use.
+
+        :param kind: Either 'sqlite', 'journal' or 'tinydb'.
+        """
+        tinydb_path: str = os.path.join(self._directory, SALE_TINYDB_FILE)
+        if kind == SALE_STORAGE_TINYDB:
+            self._logger.info("Storing sales in TinyDB database [{}]...".format(tinydb_path))
+            return TinyDBSaleStorage(tinydb_path)
+
+        storage: SaleStorage
+        if kind == SALE_STORAGE_SQLITE:
+            sqlite_path: str = os.path.join(self._directory, SALE_SQLITE_FILE)
+            self._logger.info("Storing sales in SQLite database [{}]...".format(sqlite_path))
+            storage = SQLiteSaleStorage(sqlite_path)
+        elif kind == SALE_STORAGE_JOURNAL:
+            journal_path: str = os.path.join(self._directory, SALE_JOURNAL_FILE)
+            self._logger.info("Storing sales in journal [{}]...".format(journal_path))
+            configuration = Configuration()
+            storage = JournalSaleStorage(
+                journal_path,
+                fsync=configuration.get_sale_journal_fsync(),
+                compaction_threshold=configuration.get_sale_journal_compaction_threshold(),
+            )
+        else:
+            raise Exception("Unknown sale storage [{}]. Expected either 'sqlite', 'journal' or 'tinydb'.".format(kind))
 
-        self._db = TinyDB("db/sale.json")
+        migrate_tinydb_sales(tinydb_path, storage)
+        return storage
 
     def create_sale(self, item: Item, quantity: int, price: int, seller: str, seller_id: int) -> Sale:
-        result: Sale = Sale(
-            item_uid=item.uid,
-            quantity=quantity,
-            price=price,
-            seller=seller,
-            seller_discord_id=seller_id,
-            from_date_timestamp=datetime.today().timestamp(),
-            to_date_timestamp=(datetime.today() + timedelta(days=7)).timestamp(),
-        )
-        self._db.insert(result.__dict__)
-
+        result: Sale = self.new_sale(item, quantity, price, seller, seller_id)
+        self._storage.insert(result)
         return result
 
     def get_sale_by_sale_uid(self, sale_uid: str) -> Optional[Sale]:
-        sale = Query()
-        result = self._db.get(sale["_sale_uid"] == sale_uid)
-
-        if not result:
-            return None
-        else:
-            return Sale.from_dict(result)
+        return self._storage.get_by_sale_uid(sale_uid)
 
     def get_all_sales(self) -> List[Sale]:
-        return self._parse_entities(self._db.all())
+        return self._storage.get_all()
 
     def get_sales_by_item_uid(self, item_uid: str) -> List[Sale]:
-        sale = Query()
-        return self._parse_entities(self._db.search(sale["_item_uid"] == item_uid))
+        return self._storage.get_by_item_uids([item_uid])
 
     def get_sales_by_item_uids(self, item_uids: List[str]) -> List[Sale]:
-        sale = Query()
-        return self._parse_entities(self._db.search(sale["_item_uid"].one_of(item_uids)))
+        return self._storage.get_by_item_uids(item_uids)
+
+    def get_sales_page(
+        self, page_size: int, cursor: Optional[str] = None, item_uids: Optional[List[str]] = None
+    ) -> SalePage:
+        """
+        Returns a page of sales, ordered by creation time.
+
+        :param page_size: The maximum amount of sales in the page.
+        :param cursor: The continuation token of the former page; or None for the first one.
+        :param item_uids: The UIDs of the items whose sales to page through; or None for every sale.
+        :raises ValueError: If the cursor is malformed.
+        """
+        return self._storage.get_page(page_size, cursor=cursor, item_uids=item_uids)
 
     def remove_sale_by_sale_uid(self, sale_uid: str) -> int:
-        sale = Query()
-        return len(self._db.remove(sale["_sale_uid"] == sale_uid))
+        return self._storage.remove_by_sale_uid(sale_uid)
+
+    def claim_sale(self, sale_uid: str, buyer: str) -> Optional[Sale]:
+        """
+        Atomically removes the given sale on behalf of the given buyer: of several buyers racing for the same sale, only
+        one gets it. Claims are serialized by the index (see IndexedSaleStorage.claim).
+
+        :param sale_uid: The sale's UID.
+        :param buyer: Who claims the sale.
+        :return: The claimed sale, or None if there was none (or it was claimed by someone else first).
+        """
+        sale: Optional[Sale] = self._storage.claim(sale_uid)
+        if sale is not None:
+            self._logger.debug("Sale [{}] claimed by [{}].".format(sale_uid, buyer))
+        return sale
 
     def remove_stale_sales(self) -> int:
-        sale = Query()
-        return len(self._db.remove(sale["_to_date_timestamp"] < datetime.today().timestamp()))
+        return self._storage.remove_expired(datetime.today().timestamp())
+
+    def get_next_expiry(self) -> Optional[float]:
+        """Returns the end timestamp of the sale that expires the soonest, or None if there are no sales."""
+        return self._storage.next_expiry()
+
+    def add_expiry_listener(self, listener: Callable[[float], None]) -> None:
+        """
+        Registers a listener to be called, with the new earliest expiry, whenever a sale gets created that expires
+        sooner than all the others. It may be called from any thread.
+
+        :param listener: The listener to register.
+        """
+        self._storage.add_expiry_listener(listener)
+
+    def check_consistency(self) -> bool:
+        """
+        Verifies the in-memory sale index against the sale storage, rebuilding the index should they disagree.
+
+        :return: Whether they agreed.
+        """
+        discrepancies: List[str] = self._storage.check_consistency()
+        for discrepancy in discrepancies:
+            self._logger.warning("Sale index inconsistency: {}".format(discrepancy))
+
+        if discrepancies:
+            self._logger.warning("Rebuilding sale index...")
+            self._storage.rebuild()
+
+        return not discrepancies
+
+    def close(self) -> None:
+        """Closes the underlying sale storage. The handler must not be used afterwards."""
+        self._logger.info("Closing Sale handler of {}...".format(self.market))
+        self._storage.close()
+
+    @property
+    def guild_id(self) -> Optional[int]:
+        """Returns the ID of the guild whose market this is, or None if it is the home market."""
+        return self._guild_id
+
+    @property
+    def market(self) -> str:
+        """Returns a human-readable name of this market, for logging."""
+        return "home market" if self._guild_id is None else "guild [{}]".format(self._guild_id)
+
+    @property
+    def storage(self) -> IndexedSaleStorage:
+        """Returns the underlying sale storage, indexed in memory."""
+        return self._storage
 
     @staticmethod
-    def _parse_entities(entities: List[Dict]) -> List[Sale]:
-        return list(map(lambda x: Sale.from_dict(x), entities))
+    def new_sale(item: Item, quantity: int, price: int, seller: str, seller_id: int) -> Sale:
+        """Builds a new sale of the given item, starting right now and lasting for a week. It doesn't get stored."""
+        return Sale(
+            item_uid=item.uid,
+            quantity=quantity,
+            price=price,
+            seller=seller,
+            seller_discord_id=seller_id,
+            from_date_timestamp=datetime.today().timestamp(),
+            to_date_timestamp=(datetime.today() + timedelta(days=7)).timestamp(),
+        )
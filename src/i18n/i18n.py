@@ -1,8 +1,7 @@
 from __future__ import annotations
 
 import gettext
-from collections import Callable
-from typing import Optional
+from typing import Callable, Optional
 
 from src.aux.logger import TRACE_LEVELV_NUM, Logger
 from src.aux.singleton import Singleton
@@ -74,6 +73,10 @@ class I18n(metaclass=Singleton):
         )
         return self
 
+    @property
+    def language(self) -> str:
+        return self._language
+
     @property
     def gettext(self) -> Callable[[str], str]:
         if self._gettext is None:
@@ -0,0 +1,222 @@
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from unidecode import unidecode
+
+from src.entity.item import Item
+from src.entity.item_attributes import CLASSES, GENDERS, RACES, parse_class, parse_gender, parse_race
+
+# numeric attributes, alongside how to read them off an Item
+NUMERIC_ATTRIBUTES: Dict[str, Callable[[Item], Optional[int]]] = {
+    "base_price": lambda item: item.base_price,
+    "min_damage": lambda item: item.attributes.min_damage,
+    "max_damage": lambda item: item.attributes.max_damage,
+    "min_defense": lambda item: item.attributes.min_defense,
+    "max_defense": lambda item: item.attributes.max_defense,
+    "min_magic_defense": lambda item: item.attributes.min_magic_defense,
+    "max_magic_defense": lambda item: item.attributes.max_magic_defense,
+    "hunger": lambda item: item.attributes.hunger,
+    "thirst": lambda item: item.attributes.thirst,
+}
+# restriction attributes: an Item matches if it is usable by the given class, race or gender
+RESTRICTION_ATTRIBUTES: Tuple[str, ...] = ("class", "race", "gender")
+
+OPERATORS: Tuple[str, ...] = ("<", "<=", "=", "!=", ">=", ">")
+SORT_ATTRIBUTE: str = "sort"
+
+# user-facing attribute names (sanitized: lowercase, unaccented, words joined by underscores), both Spanish and English
+ATTRIBUTE_ALIASES: Dict[str, str] = {
+    "precio": "base_price",
+    "price": "base_price",
+    "dano_min": "min_damage",
+    "damage_min": "min_damage",
+    "min_damage": "min_damage",
+    "dano_max": "max_damage",
+    "damage_max": "max_damage",
+    "max_damage": "max_damage",
+    "def_min": "min_defense",
+    "defense_min": "min_defense",
+    "min_defense": "min_defense",
+    "def_max": "max_defense",
+    "defense_max": "max_defense",
+    "max_defense": "max_defense",
+    "def_mag_min": "min_magic_defense",
+    "magic_defense_min": "min_magic_defense",
+    "min_magic_defense": "min_magic_defense",
+    "def_mag_max": "max_magic_defense",
+    "magic_defense_max": "max_magic_defense",
+    "max_magic_defense": "max_magic_defense",
+    "hambre": "hunger",
+    "hunger": "hunger",
+    "sed": "thirst",
+    "thirst": "thirst",
+    "clase": "class",
+    "class": "class",
+    "raza": "race",
+    "race": "race",
+    "genero": "gender",
+    "gender": "gender",
+    "orden": SORT_ATTRIBUTE,
+    "sort": SORT_ATTRIBUTE,
+}
+
+_EXPRESSION_PATTERN = re.compile(r"^\s*([^<>=!]+?)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$")
+
+
+class AttributeFilter(NamedTuple):
+    """A single condition over an Item attribute, such as max_damage >= 10 or class = Trabajador."""
+
+    attribute: str
+    operator: str
+    value: Union[float, str]
+
+
+class AttributeQuery(NamedTuple):
+    """A conjunction of AttributeFilters, and the numeric attribute its results are sorted by (if any)."""
+
+    filters: Tuple[AttributeFilter, ...] = ()
+    sort_by: Optional[str] = None
+    descending: bool = False
+
+
+def parse_query(expressions: Sequence[str]) -> AttributeQuery:
+    """
+    Parses an AttributeQuery out of user-provided expressions, such as ['clase=Trabajador', 'daño_max>=10',
+    'orden=precio']. Attribute names are accepted in both Spanish and English; a leading '-' on the sort attribute
+    ('orden=-precio') sorts in descending order. Raises a ValueError on the first malformed expression.
+
+    :param expressions: The expressions to parse. All of them must hold for an Item to match.
+    """
+    filters: List[AttributeFilter] = list()
+    sort_by: Optional[str] = None
+    descending = False
+
+    for expression in expressions:
+        match = _EXPRESSION_PATTERN.match(expression)
+        if match is None:
+            raise ValueError("Malformed filter [{}]".format(expression))
+
+        name, comparison, value = match.groups()
+        attribute = ATTRIBUTE_ALIASES.get("_".join(unidecode(name.lower()).split()))
+        if attribute is None:
+            raise ValueError("Unknown attribute [{}]".format(name))
+
+        if attribute == SORT_ATTRIBUTE:
+            sort_name = unidecode(value.lower())
+            descending = sort_name.startswith("-")
+            sort_by = ATTRIBUTE_ALIASES.get(sort_name.lstrip("-"))
+            if comparison != "=" or sort_by not in NUMERIC_ATTRIBUTES:
+                raise ValueError("Cannot sort by [{}]".format(value))
+        elif attribute in RESTRICTION_ATTRIBUTES:
+            if comparison != "=":
+                raise ValueError("Attribute [{}] only supports '='".format(name))
+            # underscores stand for spaces, so that 'elfo_oscuro' doesn't need quoting
+            value = value.replace("_", " ")
+            parse = {"class": parse_class, "race": parse_race, "gender": parse_gender}[attribute]
+            filters.append(AttributeFilter(attribute, comparison, parse(value)))
+        else:
+            try:
+                filters.append(AttributeFilter(attribute, comparison, float(value)))
+            except ValueError:
+                raise ValueError("Attribute [{}] must be compared against a number, not [{}]".format(name, value))
+
+    return AttributeQuery(tuple(filters), sort_by, descending)
+
+
+class AttributeIndex:
+    """
+    Column-oriented index over the attributes of a sequence of Items.
+
+    Every numeric attribute is stored as a float array (NaN where an Item lacks it), alongside its stable ascending and
+    descending sort orders; and every restriction (classes, races and gender) as a boolean matrix of who may use each
+    Item. Both are built once, so a query never parses nor touches the Items themselves: numeric conditions are range
+    lookups (binary searches) over the pre-sorted columns, restrictions are column reads of the matrices, and sorting
+    the matches is a mask over a pre-computed order. Items lacking an attribute never satisfy a condition over it, and
+    always sort last.
+    """
+
+    def __init__(self, items: Sequence[Item]) -> None:
+        self._items: Tuple[Item, ...] = tuple(items)
+        size = len(self._items)
+
+        self._ascending: Dict[str, np.ndarray] = dict()
+        self._descending: Dict[str, np.ndarray] = dict()
+        self._sorted_columns: Dict[str, np.ndarray] = dict()
+        for attribute, read in NUMERIC_ATTRIBUTES.items():
+            column = np.array([_as_float(read(item)) for item in self._items], dtype=np.float64)
+            # argsort places NaNs last in both directions, as the negation of NaN is still NaN
+            ascending = np.argsort(column, kind="stable")
+
+            self._ascending[attribute] = ascending
+            self._descending[attribute] = np.argsort(-column, kind="stable")
+            self._sorted_columns[attribute] = column[ascending][: np.count_nonzero(~np.isnan(column))]
+
+        self._restrictions: Dict[str, Tuple[Dict[str, int], np.ndarray]] = dict()
+        for attribute, names, read_restriction in (
+            ("class", CLASSES, lambda item: item.attributes.classes),
+            ("race", RACES, lambda item: item.attributes.races),
+            ("gender", GENDERS, lambda item: item.attributes.genders),
+        ):
+            matrix = np.ones((size, len(names)), dtype=bool)
+            for position, item in enumerate(self._items):
+                allowed = read_restriction(item)
+                if allowed is not None:
+                    matrix[position] = [name in allowed for name in names]
+            self._restrictions[attribute] = ({name: i for i, name in enumerate(names)}, matrix)
+
+    def query(self, query: AttributeQuery, k: Optional[int] = None) -> List[Item]:
+        """
+        Returns the Items that satisfy every filter of the given query; sorted by its sort attribute, or in indexing
+        order if it has none.
+
+        :param query: The query to run.
+        :param k: The maximum amount of results. Unbounded if None.
+        """
+        mask = np.ones(len(self._items), dtype=bool)
+        for attribute_filter in query.filters:
+            mask &= self._matches(attribute_filter)
+
+        if query.sort_by is None:
+            positions = np.flatnonzero(mask)
+        else:
+            order = (self._descending if query.descending else self._ascending)[query.sort_by]
+            positions = order[mask[order]]
+
+        return [self._items[position] for position in positions[:k].tolist()]
+
+    def _matches(self, attribute_filter: AttributeFilter) -> np.ndarray:
+        attribute, comparison, value = attribute_filter
+
+        if attribute in self._restrictions:
+            columns, matrix = self._restrictions[attribute]
+            return matrix[:, columns[str(value)]]
+
+        if comparison not in OPERATORS:
+            raise ValueError("Unknown operator [{}]".format(comparison))
+
+        # the matching values are a contiguous range of the sorted column (or its complement, for '!=')
+        sorted_column = self._sorted_columns[attribute]
+        left = int(np.searchsorted(sorted_column, value, side="left"))
+        right = int(np.searchsorted(sorted_column, value, side="right"))
+        start, end = {
+            "<": (0, left),
+            "<=": (0, right),
+            "=": (left, right),
+            "!=": (left, right),
+            ">=": (left, len(sorted_column)),
+            ">": (right, len(sorted_column)),
+        }[comparison]
+
+        matches = np.zeros(len(self._items), dtype=bool)
+        matches[self._ascending[attribute][start:end]] = True
+        if comparison == "!=":
+            matches[self._ascending[attribute][: len(sorted_column)]] ^= True
+        return matches
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _as_float(value: Optional[int]) -> float:
+    return float("nan") if value is None else float(value)
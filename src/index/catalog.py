@@ -0,0 +1,54 @@
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+from src.entity.item import Item
+
+
+class ItemCatalog:
+    """
+    Immutable, pre-indexed view over the complete list of sellable Items.
+
+    It is built once at load time and never mutated afterwards, so every lookup that used to be a linear scan over the
+    whole item set (by UID, or by exact sanitized name) becomes a single dictionary access.
+    """
+
+    def __init__(self, items: Iterable[Item]) -> None:
+        by_uid: Dict[str, Item] = dict()
+        by_sanitized_name: Dict[str, Item] = dict()
+
+        for item in items:
+            by_uid[item.uid] = item
+            by_sanitized_name.setdefault(item.sanitized_name, item)
+
+        self._items: Tuple[Item, ...] = tuple(by_uid.values())
+        self._by_uid: Mapping[str, Item] = MappingProxyType(by_uid)
+        self._by_sanitized_name: Mapping[str, Item] = MappingProxyType(by_sanitized_name)
+
+    @property
+    def items(self) -> Tuple[Item, ...]:
+        return self._items
+
+    def get_by_uid(self, uid: str) -> Optional[Item]:
+        """
+        Returns the Item that matches the given (unprefixed) UID, or None if there was no match.
+
+        :param uid: The UID to search for.
+        """
+        return self._by_uid.get(uid)
+
+    def get_by_sanitized_name(self, sanitized_name: str) -> Optional[Item]:
+        """
+        Returns the Item whose sanitized name is exactly the given one, or None if there was no match.
+
+        :param sanitized_name: An already lowercased and unidecoded name.
+        """
+        return self._by_sanitized_name.get(sanitized_name)
+
+    def __contains__(self, uid: object) -> bool:
+        return uid in self._by_uid
+
+    def __iter__(self) -> Iterator[Item]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
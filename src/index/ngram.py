@@ -0,0 +1,200 @@
+import heapq
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.entity.item import Item
+
+DEFAULT_NGRAM_SIZE: int = 3
+
+# upper bound on the cells of each (queries x items) score matrix computed by search_many
+BATCH_MATRIX_CELLS: int = 4_000_000
+
+
+class NGramIndex:
+    """
+    Character n-gram inverted index over the sanitized names of a sequence of Items.
+
+    Every name is padded with one blank on each side before being split into n-grams, so that words' beginnings and
+    endings carry some weight of their own. Each n-gram maps to the (ascending) positions of the Items that contain it,
+    which allows fetching a small candidate set of Items sharing n-grams with a query without scanning the whole
+    catalog. Candidates are meant to be scored exactly afterwards.
+    """
+
+    def __init__(self, items: Sequence[Item], n: int = DEFAULT_NGRAM_SIZE) -> None:
+        if n < 1:
+            raise ValueError("N-gram size must be a positive integer, but was {}".format(n))
+
+        self._n = n
+        self._items: Tuple[Item, ...] = tuple(items)
+
+        postings: Dict[str, List[int]] = defaultdict(list)
+        gram_counts: List[int] = list()
+        for position, item in enumerate(self._items):
+            grams = self.ngrams(item.sanitized_name)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings[gram].append(position)
+
+        self._postings: Dict[str, Tuple[int, ...]] = {gram: tuple(positions) for gram, positions in postings.items()}
+        self._gram_counts: Tuple[int, ...] = tuple(gram_counts)
+
+        # the same postings, laid out as flat NumPy arrays (CSR-like) for batch searches
+        self._gram_ids: Dict[str, int] = {gram: gram_id for gram_id, gram in enumerate(self._postings)}
+        self._posting_offsets: np.ndarray = np.cumsum([0] + [len(p) for p in self._postings.values()], dtype=np.int64)
+        self._flat_postings: np.ndarray = np.fromiter(
+            chain.from_iterable(self._postings.values()), dtype=np.int64, count=int(self._posting_offsets[-1])
+        )
+        self._gram_counts_array: np.ndarray = np.array(gram_counts, dtype=np.int64)
+
+    @property
+    def n(self) -> int:
+        return self._n
+
+    def ngrams(self, text: str) -> Set[str]:
+        """
+        Returns the set of (blank-padded) n-grams of the given text.
+
+        :param text: An already sanitized text.
+        """
+        padded = " {} ".format(text)
+        return {padded[i : i + self._n] for i in range(len(padded) - self._n + 1)}
+
+    def shared_ngram_counts(self, sanitized_query: str) -> Counter:
+        """
+        Returns how many n-grams each indexed Item shares with the given query, keyed by the Item's position. Items
+        sharing no n-gram at all are absent.
+
+        :param sanitized_query: An already lowercased and unidecoded query.
+        """
+        return Counter(chain.from_iterable(self._postings.get(gram, ()) for gram in self.ngrams(sanitized_query)))
+
+    def substring_search(self, sanitized_query: str) -> List[Item]:
+        """
+        Returns the Items whose sanitized name contains the given query, in indexing order.
+
+        Any such name necessarily contains every (distinct) unpadded n-gram of the query, so only Items sharing at least
+        that many n-grams are verified. Queries shorter than the n-gram size carry no unpadded n-gram and are answered
+        with a plain scan instead.
+
+        :param sanitized_query: An already lowercased and unidecoded query.
+        """
+        required = self._required_ngrams(sanitized_query)
+        if required < 1:
+            return [item for item in self._items if sanitized_query in item.sanitized_name]
+
+        return [
+            self._items[position]
+            for position, shared in sorted(self.shared_ngram_counts(sanitized_query).items())
+            if shared >= required and sanitized_query in self._items[position].sanitized_name
+        ]
+
+    def search(self, sanitized_query: str, k: Optional[int] = None) -> List[Tuple[Item, float]]:
+        """
+        Returns the k Items most similar to the given query, alongside their similarity, ranked best first. Only Items
+        sharing at least one n-gram with the query are considered; ties are broken by indexing order.
+
+        Similarity is the Dice coefficient between the query's and the name's n-gram sets, which ranges from 0 (nothing
+        in common) to 1 (same n-grams).
+
+        :param sanitized_query: An already lowercased and unidecoded query.
+        :param k: The maximum amount of results. Unbounded if None.
+        """
+        query_grams = len(self.ngrams(sanitized_query))
+        scored = (
+            (2 * shared / (query_grams + self._gram_counts[position]), -position)
+            for position, shared in self.shared_ngram_counts(sanitized_query).items()
+        )
+        ranked = heapq.nlargest(k, scored) if k is not None else sorted(scored, reverse=True)
+        return [(self._items[-position], score) for score, position in ranked]
+
+    def search_many(
+        self, sanitized_queries: Sequence[str], k: Optional[int] = None, cutoff: float = 0.0
+    ) -> List[List[Tuple[Item, float]]]:
+        """
+        Batch version of search: scores every query against every indexed Item in vectorized passes and returns, for
+        each query, its k most similar Items alongside their similarity, ranked best first. Scores and tie-breaking are
+        identical to those of search.
+
+        The postings of all the queries' n-grams are expanded into (query, Item) pairs and counted with a single
+        bincount, which yields the (queries x Items) matrix of shared n-grams; that is, the product of the queries' and
+        the Items' sparse n-gram incidence matrices. Queries are processed in chunks to bound the matrix's size.
+
+        :param sanitized_queries: Already lowercased and unidecoded queries.
+        :param k: The maximum amount of results per query. Unbounded if None.
+        :param cutoff: The minimum similarity of the returned Items. Items whose name contains the query are exempt.
+        :return: The ranked results of each query, in the same order as the queries.
+        """
+        results: List[List[Tuple[Item, float]]] = list()
+        if not self._items:
+            return [list() for _ in sanitized_queries]
+
+        chunk_size = max(1, BATCH_MATRIX_CELLS // len(self._items))
+        for start in range(0, len(sanitized_queries), chunk_size):
+            results.extend(self._search_chunk(sanitized_queries[start : start + chunk_size], k, cutoff))
+
+        return results
+
+    def _search_chunk(
+        self, sanitized_queries: Sequence[str], k: Optional[int], cutoff: float
+    ) -> List[List[Tuple[Item, float]]]:
+        items = len(self._items)
+        query_grams = [self.ngrams(query) for query in sanitized_queries]
+        query_gram_ids = [[self._gram_ids[gram] for gram in grams if gram in self._gram_ids] for grams in query_grams]
+
+        # expand every (query, n-gram) pair into the postings' (query, Item) pairs, and count them
+        owners = np.repeat(np.arange(len(sanitized_queries)), [len(ids) for ids in query_gram_ids])
+        gram_ids = np.fromiter(chain.from_iterable(query_gram_ids), dtype=np.int64, count=len(owners))
+        starts = self._posting_offsets[gram_ids]
+        lengths = self._posting_offsets[gram_ids + 1] - starts
+        first_pair = np.cumsum(lengths) - lengths
+        pairs = np.repeat(starts - first_pair, lengths) + np.arange(int(lengths.sum()), dtype=np.int64)
+
+        shared = np.bincount(
+            np.repeat(owners, lengths) * items + self._flat_postings[pairs], minlength=len(sanitized_queries) * items
+        ).reshape(len(sanitized_queries), items)
+
+        sizes = np.array([len(grams) for grams in query_grams], dtype=np.int64)
+        scores = 2.0 * shared / (sizes[:, np.newaxis] + self._gram_counts_array[np.newaxis, :])
+
+        results: List[List[Tuple[Item, float]]] = list()
+        for row, query in enumerate(sanitized_queries):
+            eligible = (shared[row] > 0) & (scores[row] >= cutoff)
+            for position in self._substring_positions(query, shared[row]):
+                eligible[position] = True
+
+            positions = np.flatnonzero(eligible)
+            row_scores = scores[row, positions]
+            if k is not None and k < len(positions):
+                best = np.argpartition(-row_scores, k - 1)[:k]
+                # keep every Item tied with the k-th best score, so that ties can be broken by position
+                best = np.flatnonzero(row_scores >= row_scores[best].min())
+                positions, row_scores = positions[best], row_scores[best]
+
+            order = np.lexsort((positions, -row_scores))[:k]
+            results.append([(self._items[positions[i]], float(row_scores[i])) for i in order])
+
+        return results
+
+    def _required_ngrams(self, sanitized_query: str) -> int:
+        """
+        Returns how many n-grams an Item must share with the given query for its name to possibly contain it: as many as
+        the query's distinct unpadded n-grams, since shared n-grams are counted once however often they repeat.
+        """
+        return len({sanitized_query[i : i + self._n] for i in range(len(sanitized_query) - self._n + 1)})
+
+    def _substring_positions(self, sanitized_query: str, shared: np.ndarray) -> List[int]:
+        required = self._required_ngrams(sanitized_query)
+        if required < 1:
+            return [position for position, item in enumerate(self._items) if sanitized_query in item.sanitized_name]
+
+        return [
+            int(position)
+            for position in np.flatnonzero(shared >= required)
+            if sanitized_query in self._items[position].sanitized_name
+        ]
+
+    def __len__(self) -> int:
+        return len(self._items)
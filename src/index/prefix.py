@@ -0,0 +1,55 @@
+import bisect
+from typing import List, Optional, Sequence, Tuple
+
+from src.entity.item import Item
+
+
+class PrefixIndex:
+    """
+    Sorted-array index over the word-boundary suffixes of the sanitized names of a sequence of Items.
+
+    Every name is indexed under each of its suffixes that starts at a word: 'daga de plata' is indexed under 'daga de
+    plata', 'de plata' and 'plata'. All keys sharing a prefix are contiguous in the sorted array, so a prefix lookup is
+    a binary search plus a walk over the matching keys, stopping as soon as enough Items are found.
+    """
+
+    def __init__(self, items: Sequence[Item]) -> None:
+        self._items: Tuple[Item, ...] = tuple(items)
+
+        entries: List[Tuple[str, int]] = list()
+        for position, item in enumerate(self._items):
+            words = item.sanitized_name.split(" ")
+            entries.extend((" ".join(words[i:]), position) for i in range(len(words)) if words[i])
+
+        entries.sort()
+        self._keys: Tuple[str, ...] = tuple(key for key, _ in entries)
+        self._positions: Tuple[int, ...] = tuple(position for _, position in entries)
+
+    def complete(self, sanitized_prefix: str, k: Optional[int] = None) -> List[Item]:
+        """
+        Returns the Items whose sanitized name, or any word in it, starts with the given prefix. Results come in lexical
+        order of the matched text, and each Item shows up only once.
+
+        :param sanitized_prefix: An already lowercased and unidecoded prefix.
+        :param k: The maximum amount of results. Unbounded if None.
+        """
+        results: List[Item] = list()
+        if not sanitized_prefix or k is not None and k < 1:
+            return results
+
+        seen = set()
+        for i in range(bisect.bisect_left(self._keys, sanitized_prefix), len(self._keys)):
+            if not self._keys[i].startswith(sanitized_prefix):
+                break
+
+            position = self._positions[i]
+            if position not in seen:
+                seen.add(position)
+                results.append(self._items[position])
+                if k is not None and len(results) >= k:
+                    break
+
+        return results
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,71 @@
+import difflib
+import heapq
+from typing import AbstractSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.entity.item import Item
+
+
+class ScoredItem(NamedTuple):
+    """An Item alongside its similarity to a query, from 0 (nothing in common) to 1 (identical)."""
+
+    item: Item
+    score: float
+
+
+def rank(
+    sanitized_query: str,
+    candidates: Iterable[Item],
+    k: Optional[int],
+    cutoff: float,
+    unconditional: AbstractSet[Item] = frozenset(),
+) -> List[ScoredItem]:
+    """
+    Scores the given candidates against the query with difflib's SequenceMatcher and returns the k best ones, best
+    first. Ties are broken by candidate order, so results are deterministic for a given candidate sequence.
+
+    Only a bounded heap of the best k candidates is kept. Before paying for the expensive ratio() of each candidate,
+    its cheap real_quick_ratio() and quick_ratio() upper bounds are checked against the worst score that could still
+    make it into the results (the cutoff, or the heap's minimum once it is full), and the candidate is discarded early
+    if it can't possibly beat it.
+
+    :param sanitized_query: An already lowercased and unidecoded query.
+    :param candidates: The Items to score. Duplicates are ignored.
+    :param k: The maximum amount of results. Unbounded if None.
+    :param cutoff: The minimum score a candidate must reach in order to be returned.
+    :param unconditional: Candidates exempt from the cutoff (for instance, substring matches). They still compete for
+                          the k available places.
+    :return: The best matches, alongside their scores.
+    """
+    if k is not None and k < 1:
+        return list()
+
+    # as difflib.get_close_matches does, the query is the matcher's second sequence: the one it builds its lookup tables
+    # (b2j, and quick_ratio()'s character counts) out of, only once; candidates are the first one, which costs nothing
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(sanitized_query)
+    heap: List[Tuple[float, int, Item]] = list()  # min-heap of (score, -position, item)
+    seen = set()
+
+    for position, item in enumerate(candidates):
+        if item in seen:
+            continue
+        seen.add(item)
+
+        heap_is_full = k is not None and len(heap) >= k
+        threshold = 0.0 if item in unconditional else cutoff  # scores must reach this...
+        floor = heap[0][0] if heap_is_full else -1.0  # ...and strictly beat this, as later candidates lose ties
+
+        matcher.set_seq1(item.sanitized_name)
+        if not threshold <= matcher.real_quick_ratio() > floor or not threshold <= matcher.quick_ratio() > floor:
+            continue  # upper bounds already fall short; skip the expensive ratio()
+
+        score = matcher.ratio()
+        if not threshold <= score > floor:
+            continue
+
+        if heap_is_full:
+            heapq.heapreplace(heap, (score, -position, item))
+        else:
+            heapq.heappush(heap, (score, -position, item))
+
+    return [ScoredItem(item, score) for score, _, item in sorted(heap, reverse=True)]
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import pickle
+from typing import Callable, List, Optional, Tuple
+
+from src.aux.logger import Logger
+from src.entity.item import Item
+from src.entity.item_attributes import ItemAttributes
+
+# bump whenever the snapshot's layout (or the way Items are derived from the item list) changes
+SNAPSHOT_VERSION: int = 2
+
+
+class CatalogSnapshot:
+    """
+    Compiled, binary snapshot of the sellable Items parsed out of the item list.
+
+    Parsing the JSON item list, filtering it and hashing every name on each start up is wasted work as long as the list
+    doesn't change. The snapshot keeps the already filtered, hashed and sanitized catalog as pickled column arrays
+    (names, UIDs, sanitized names, prices and attributes), tagged with the MD5 digest of the item list it was compiled
+    from. Should the item list change, the digest won't match anymore and the snapshot gets transparently recompiled.
+    """
+
+    def __init__(self, source_path: str, snapshot_path: str) -> None:
+        self._logger = Logger(self.__class__.__name__)
+
+        self._source_path = source_path
+        self._snapshot_path = snapshot_path
+
+    def load(self, build: Callable[[], List[Item]]) -> Tuple[List[Item], bool]:
+        """
+        Returns the snapshot's Items if it is up to date with its item list. Otherwise, builds the Items from scratch
+        and (re)compiles the snapshot out of them.
+
+        :param build: Builds the Items out of the item list.
+        :return: The Items, and whether they came from the snapshot or not.
+        """
+        digest = self._source_digest()
+
+        items = self._read(digest)
+        if items is not None:
+            return items, True
+
+        self._logger.info("Item list snapshot is missing or outdated. Compiling a new one...")
+        items = build()
+        self._write(digest, items)
+
+        return items, False
+
+    def _source_digest(self) -> str:
+        md5 = hashlib.md5()
+        with open(self._source_path, "rb") as source_file:
+            md5.update(source_file.read())
+        return md5.hexdigest()
+
+    def _read(self, digest: str) -> Optional[List[Item]]:
+        if not os.path.exists(self._snapshot_path):
+            return None
+
+        try:
+            with open(self._snapshot_path, "rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+
+            if snapshot["version"] != SNAPSHOT_VERSION or snapshot["digest"] != digest:
+                return None
+
+            return [
+                Item(name, base_price, uid=uid, sanitized_name=sanitized_name, attributes=ItemAttributes(*attributes))
+                for name, uid, sanitized_name, base_price, attributes in zip(
+                    snapshot["names"],
+                    snapshot["uids"],
+                    snapshot["sanitized_names"],
+                    snapshot["base_prices"],
+                    snapshot["attributes"],
+                )
+            ]
+        except Exception as e:
+            # a corrupt snapshot is never fatal: it can always be compiled again out of the item list
+            self._logger.warning("Could not read item list snapshot [{}]: {}".format(self._snapshot_path, e))
+            return None
+
+    def _write(self, digest: str, items: List[Item]) -> None:
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "digest": digest,
+            "names": [item.name for item in items],
+            "uids": [item.uid for item in items],
+            "sanitized_names": [item.sanitized_name for item in items],
+            "base_prices": [item.base_price for item in items],
+            # plain tuples, so that the snapshot doesn't depend on where ItemAttributes lives
+            "attributes": [tuple(item.attributes) for item in items],
+        }
+
+        try:
+            # write to a temporary file first and swap it in, so that a crash never leaves a half-written snapshot
+            temporary_path = "{}.tmp".format(self._snapshot_path)
+            with open(temporary_path, "wb") as snapshot_file:
+                pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._snapshot_path)
+        except OSError as e:
+            self._logger.warning("Could not write item list snapshot [{}]: {}".format(self._snapshot_path, e))
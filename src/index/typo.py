@@ -0,0 +1,128 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from src.entity.item import Item
+
+DEFAULT_MAX_DISTANCE: int = 2
+DEFAULT_PREFIX_LENGTH: int = 7
+# words shorter than this ('de', 'la', ...) are too ambiguous to be corrected on their own
+MIN_WORD_LENGTH: int = 3
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Returns the Damerau-Levenshtein distance (optimal string alignment variant) between both strings: the minimum amount
+    of single-character insertions, deletions, substitutions and adjacent transpositions that turn one into the other.
+
+    Computation stops early once the distance is known to exceed max_distance, in which case max_distance + 1 is
+    returned.
+
+    :param a: A string.
+    :param b: Another string.
+    :param max_distance: The maximum distance of interest.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous_previous: List[int] = list()
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+
+    return min(previous[-1], max_distance + 1)
+
+
+class TypoIndex:
+    """
+    SymSpell-style deletion dictionary over the sanitized names of a sequence of Items, and over their individual words.
+
+    Two strings within edit distance d of each other always share a variant obtainable by deleting at most d characters
+    from each. Hence, every indexed term (or rather, its first prefix_length characters) gets stored under all of its
+    deletion variants up to max_distance; and a lookup only needs to generate the query's own deletion variants and
+    verify the terms stored under them. No term is compared against the query unless they share a variant, so lookups
+    never scan the catalog.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[Item],
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+        prefix_length: int = DEFAULT_PREFIX_LENGTH,
+    ) -> None:
+        if prefix_length <= max_distance:
+            raise ValueError(
+                "Prefix length ({}) must be greater than the maximum distance ({})".format(prefix_length, max_distance)
+            )
+
+        self._items: Tuple[Item, ...] = tuple(items)
+        self._max_distance = max_distance
+        self._prefix_length = prefix_length
+
+        terms: Dict[str, List[int]] = defaultdict(list)
+        for position, item in enumerate(self._items):
+            for term in {item.sanitized_name, *(w for w in item.sanitized_name.split() if len(w) >= MIN_WORD_LENGTH)}:
+                terms[term].append(position)
+
+        deletes: Dict[str, Set[str]] = defaultdict(set)
+        for term in terms:
+            for variant in self._deletes(term[:prefix_length]):
+                deletes[variant].add(term)
+
+        self._terms: Dict[str, Tuple[int, ...]] = {term: tuple(positions) for term, positions in terms.items()}
+        self._deletes_index: Dict[str, Tuple[str, ...]] = {v: tuple(sorted(t)) for v, t in deletes.items()}
+
+    @property
+    def max_distance(self) -> int:
+        return self._max_distance
+
+    def lookup(self, sanitized_query: str, max_distance: Optional[int] = None) -> List[Tuple[Item, int]]:
+        """
+        Returns the Items whose sanitized name, or any of its words, is within the given edit distance of the query;
+        alongside said distance. Closest Items come first; ties are broken by indexing order.
+
+        :param sanitized_query: An already lowercased and unidecoded query.
+        :param max_distance: The maximum edit distance. Defaults to (and may not exceed) the index's.
+        """
+        max_distance = self._max_distance if max_distance is None else min(max_distance, self._max_distance)
+
+        distances: Dict[int, int] = dict()
+        verified: Set[str] = set()
+        for variant in self._deletes(sanitized_query[: self._prefix_length], max_distance):
+            for term in self._deletes_index.get(variant, ()):
+                if term in verified:
+                    continue
+                verified.add(term)
+
+                distance = edit_distance(sanitized_query, term, max_distance)
+                if distance <= max_distance:
+                    for position in self._terms[term]:
+                        distances[position] = min(distance, distances.get(position, distance))
+
+        return [(self._items[position], distance) for position, distance in sorted(distances.items(), key=_by_distance)]
+
+    def _deletes(self, term: str, max_distance: Optional[int] = None) -> Set[str]:
+        """Returns the term alongside every variant of it obtained by deleting up to max_distance characters."""
+        max_distance = self._max_distance if max_distance is None else max_distance
+
+        variants = {term}
+        frontier = {term}
+        for _ in range(max_distance):
+            frontier = {v[:i] + v[i + 1 :] for v in frontier for i in range(len(v))} - variants
+            variants.update(frontier)
+        return variants
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _by_distance(entry: Tuple[int, int]) -> Tuple[int, int]:
+    position, distance = entry
+    return distance, position
@@ -1,11 +1,11 @@
-from typing import Callable
+from typing import Callable, Optional
 
 from discord.ext.commands import Context
 
 from src.aux.configuration import Configuration
 from src.aux.debug import Debug
 from src.bot import MercadoAO
-from src.command_handler import CommandHandler
+from src.command_handler import LIST_ALL_QUERY, CommandHandler
 from src.i18n.i18n import LOCALE_ES_AR, I18n
 
 # read parameters from configuration -----------------------------------------------------------------------------------
@@ -33,12 +33,13 @@ bot = MercadoAO(
     description="MercadoAO Bot - Version {} - https://github.com/DazedNConfused-/MercadoAO".format(version),
 )
 commandHandler = CommandHandler()
+bot.add_close_hook(commandHandler.close)
 
 # define bot commands --------------------------------------------------------------------------------------------------
 
 
 @bot.command(name="buy")
-async def buy(ctx: Context, sale_uid: str = None):
+async def buy(ctx: Context, sale_uid: Optional[str] = None):
     """
     Claims an ongoing sale as a buyer, effectively ending it and notifying all parties with details of the transaction.
 
@@ -46,14 +47,16 @@ async def buy(ctx: Context, sale_uid: str = None):
     """
 
     if not sale_uid:
-        await ctx.author.send(_("The Sale's UID is required in order to buy!"))
+        commandHandler.send_message(ctx.author, _("The Sale's UID is required in order to buy!"))
         return
 
     await commandHandler.buy_handler(ctx=ctx, sale_uid=sale_uid)
 
 
 @bot.command(name="sell")
-async def sell(ctx: Context, item_to_sell: str = None, quantity: int = None, price: int = None):
+async def sell(
+    ctx: Context, item_to_sell: Optional[str] = None, quantity: Optional[int] = None, price: Optional[int] = None
+):
     """
     Publishes a sale. It will be listed on the market for a whole week.
 
@@ -63,8 +66,8 @@ async def sell(ctx: Context, item_to_sell: str = None, quantity: int = None, pri
     """
 
     if not item_to_sell or not quantity or not price:
-        await ctx.author.send(
-            _("All params ([item_to_sell] [quantity] [price]) must be specified in order to make a sale!")
+        commandHandler.send_message(
+            ctx.author, _("All params ([item_to_sell] [quantity] [price]) must be specified in order to make a sale!")
         )
         return
 
@@ -79,26 +82,31 @@ async def sell(ctx: Context, item_to_sell: str = None, quantity: int = None, pri
 
 
 @bot.command(name="list")
-async def sale_list(ctx: Context, query: str = None):
+async def sale_list(ctx: Context, query: Optional[str] = None, page: int = 1):
     """
-    Returns a list of all undergoing sales for the given search query.
+    Returns a list of all undergoing sales for the given search query, a page at a time, oldest first.
 
     Accepts both item names or a specific UID (which can be searched by either passing the UID directly or prefixing it
     with 'uid:')
 
-    If query is unspecified, returns all current offerings.
+    If query is unspecified (or '*'), returns all current offerings.
 
     :param query: The string to be searched.
+    :param page: The page to return. Defaults to the first one.
     """
 
-    if not query:
-        await commandHandler.list_all_handler(ctx)
+    if page < 1:
+        commandHandler.send_message(ctx.author, _("The page must be a positive number!"))
+        return
+
+    if not query or query == LIST_ALL_QUERY:
+        await commandHandler.list_all_handler(ctx, page)
     else:
-        await commandHandler.list_handler(ctx, query)
+        await commandHandler.list_handler(ctx, query, page)
 
 
 @bot.command(name="search")
-async def search(ctx: Context, query: str = None):
+async def search(ctx: Context, query: Optional[str] = None):
     """
     Returns the list of valid items that may be exchanged using the bot for the given search query.
 
@@ -111,21 +119,59 @@ async def search(ctx: Context, query: str = None):
     """
 
     if not query:
-        await ctx.author.send(_("You must specify something to search!"))
+        commandHandler.send_message(ctx.author, _("You must specify something to search!"))
         return
 
     await commandHandler.search_handler(ctx, query)
 
 
+@bot.command(name="complete")
+async def complete(ctx: Context, prefix: Optional[str] = None):
+    """
+    Returns the list of valid items whose name, or any word in it, starts with the given prefix, in alphabetical order.
+
+    For example: 'dag' completes to both 'Daga' and 'Daga de Plata'; while 'pla' completes to 'Daga de Plata'.
+
+    :param prefix: The beginning of the item's name.
+    """
+
+    if not prefix:
+        commandHandler.send_message(ctx.author, _("You must specify something to search!"))
+        return
+
+    await commandHandler.complete_handler(ctx, prefix)
+
+
+@bot.command(name="filter")
+async def item_filter(ctx: Context, *filters: str):
+    """
+    Returns the list of valid items whose attributes satisfy all of the given filters, which compare an attribute
+    against a value: 'precio', 'daño_min', 'daño_max', 'def_min', 'def_max', 'def_mag_min', 'def_mag_max', 'hambre' and
+    'sed' support '<', '<=', '=', '!=', '>=' and '>'; while 'clase', 'raza' and 'genero' match the items usable by the
+    given class, race or gender. 'orden=<attribute>' sorts the results ('orden=-<attribute>' in descending order).
+
+    For example: 'clase=Trabajador daño_max>=10 orden=precio' returns the items a Trabajador may use whose maximum
+    damage is 10 or more, cheapest first.
+
+    :param filters: The filters to apply.
+    """
+
+    if not filters:
+        commandHandler.send_message(ctx.author, _("You must specify at least one filter!"))
+        return
+
+    await commandHandler.filter_handler(ctx, filters)
+
+
 @bot.command(name="uid")
-async def search_uid(ctx: Context, query: str = None):
+async def search_uid(ctx: Context, query: Optional[str] = None):
     """
     Searches for the item that corresponds to the given UID.
 
     :param query: The UID to be searched.
     """
     if not query:
-        await ctx.author.send(_("You must specify something to search!"))
+        commandHandler.send_message(ctx.author, _("You must specify something to search!"))
         return
 
     await commandHandler.search_uid_handler(ctx, query)
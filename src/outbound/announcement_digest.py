@@ -0,0 +1,162 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from src.aux.logger import Logger
+from src.outbound.dispatcher import MESSAGE_MAX_LENGTH, Destination
+
+# sends a message to a channel: any channel, such as a discord.abc.Messageable when announcing through Discord
+Announcer = Callable[[Any, str], Any]
+
+
+class DigestStats(NamedTuple):
+    """Point-in-time metrics of an announcement digest: how big its digests are, and how long announcements wait."""
+
+    digests: int
+    announcements: int
+    max_digest_size: int
+    total_flush_latency: float  # in seconds, from a digest's first announcement until it is sent
+    max_flush_latency: float  # in seconds
+
+    @property
+    def mean_digest_size(self) -> float:
+        return self.announcements / self.digests if self.digests else 0.0
+
+    @property
+    def mean_flush_latency(self) -> float:
+        return self.total_flush_latency / self.digests if self.digests else 0.0
+
+    def __str__(self) -> str:
+        return (
+            "digests: {}, announcements: {}, digest size: {:.1f} mean/{} max, flush latency: {:.2f} mean/{:.2f} max s"
+        ).format(
+            self.digests,
+            self.announcements,
+            self.mean_digest_size,
+            self.max_digest_size,
+            self.mean_flush_latency,
+            self.max_flush_latency,
+        )
+
+
+class _Digest:
+    __slots__ = ("lines", "length", "started", "timer")
+
+    def __init__(self, started: float) -> None:
+        self.lines: List[str] = list()
+        self.length = -1  # of the lines joined by newlines
+        self.started = started
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class AnnouncementDigest:
+    """
+    Batches announcements (such as new sales) into digests, so that a busy announcement channel gets a single message
+    every now and then rather than one per announcement.
+
+    Announcements to a channel are buffered, and sent as a single message (one announcement per line) once the first of
+    them has waited for the configured interval, or as soon as enough of them pile up, or right before the next one
+    would no longer fit in a message. With an interval of zero, every announcement is sent right away on its own.
+    """
+
+    def __init__(
+        self,
+        send: Announcer,
+        interval: float,
+        max_size: int,
+        max_length: int = MESSAGE_MAX_LENGTH,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param send: Sends a message to a channel.
+        :param interval: How long, in seconds, an announcement may wait for others to share a digest with. Zero disables
+            digests.
+        :param max_size: The amount of buffered announcements that get sent right away, interval or not.
+        :param max_length: The maximum length of a message. Defaults to Discord's max.
+        :param clock: Returns the current time, in seconds.
+        """
+        if interval < 0:
+            raise ValueError("Announcement digest interval must not be negative, but was {}".format(interval))
+        if max_size < 1:
+            raise ValueError("Announcement digest size must be a positive integer, but was {}".format(max_size))
+
+        self._logger = Logger(self.__class__.__name__)
+
+        self._send = send
+        self._interval = interval
+        self._max_size = max_size
+        self._max_length = max_length
+        self._clock = clock
+
+        self._digests: Dict[Destination, _Digest] = dict()
+
+        self._digests_sent = 0
+        self._announcements = 0
+        self._max_digest_size = 0
+        self._total_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+
+    def announce(self, channel: Destination, announcement: str) -> None:
+        """
+        Buffers an announcement to be sent to the given channel within the next digest; or sends it right away, if
+        digests are disabled.
+
+        :param channel: The channel to announce to.
+        :param announcement: The announcement, as a single line.
+        """
+        digest: Optional[_Digest] = self._digests.get(channel)
+        if digest is not None and digest.length + 1 + len(announcement) > self._max_length:
+            self.flush(channel)  # it wouldn't fit
+            digest = None
+
+        if digest is None:
+            digest = self._digests[channel] = _Digest(self._clock())
+            if self._interval > 0:
+                digest.timer = asyncio.get_event_loop().call_later(self._interval, self.flush, channel)
+
+        digest.lines.append(announcement)
+        digest.length += 1 + len(announcement)
+        if len(digest.lines) >= self._max_size or self._interval == 0:
+            self.flush(channel)
+
+    def flush(self, channel: Destination) -> None:
+        """
+        Sends the buffered announcements to the given channel right away, without waiting for the interval.
+
+        :param channel: The channel whose announcements to send.
+        """
+        digest: Optional[_Digest] = self._digests.pop(channel, None)
+        if digest is None:
+            return
+        if digest.timer is not None:
+            digest.timer.cancel()
+
+        latency: float = self._clock() - digest.started
+        self._digests_sent += 1
+        self._announcements += len(digest.lines)
+        self._max_digest_size = max(self._max_digest_size, len(digest.lines))
+        self._total_flush_latency += latency
+        self._max_flush_latency = max(self._max_flush_latency, latency)
+
+        self._logger.debug("Sending digest of {} announcements to [{}]".format(len(digest.lines), channel))
+        self._send(channel, "\n".join(digest.lines))
+
+    def flush_all(self) -> None:
+        """Sends every buffered announcement right away."""
+        for channel in list(self._digests.keys()):
+            self.flush(channel)
+
+    @property
+    def pending(self) -> int:
+        """Returns the amount of buffered announcements."""
+        return sum(len(digest.lines) for digest in self._digests.values())
+
+    @property
+    def stats(self) -> DigestStats:
+        return DigestStats(
+            self._digests_sent,
+            self._announcements,
+            self._max_digest_size,
+            self._total_flush_latency,
+            self._max_flush_latency,
+        )
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, NamedTuple, Optional
+
+import discord
+
+from src.aux.logger import Logger
+from src.aux.lru_cache import LRUCache
+from src.aux.token_bucket import TokenBucket
+
+# Discord's limits: messages to a single channel (or DM) per second, and in a burst; requests per second, all routes
+DESTINATION_RATE: float = 1.0
+DESTINATION_BURST: int = 5
+GLOBAL_RATE: float = 50.0
+GLOBAL_BURST: int = 50
+# Discord's maximum message length; adjacent messages to the same destination get merged up to it
+MESSAGE_MAX_LENGTH: int = 2000
+# how many times a message gets sent before giving up on it, when told to retry later every time
+MAX_ATTEMPTS: int = 5
+# destinations whose rate limits are kept track of; the least recently messaged ones have long refilled when dropped
+MAX_TRACKED_DESTINATIONS: int = 10000
+
+Destination = Hashable
+Sender = Callable[[Any, str], Awaitable[None]]
+
+
+class RateLimited(Exception):
+    """A message was refused for going over a rate limit (HTTP 429), and should be sent again later."""
+
+    def __init__(self, retry_after: float, is_global: bool = False) -> None:
+        """
+        :param retry_after: How long, in seconds, to wait before sending again.
+        :param is_global: Whether the limit hit is the global one, rather than the destination's.
+        """
+        super().__init__("Rate limited{}: retry after {} seconds".format(" globally" if is_global else "", retry_after))
+        self.retry_after = retry_after
+        self.is_global = is_global
+
+
+class _Outgoing(NamedTuple):
+    content: str
+    delivery: "asyncio.Future[None]"
+
+
+async def send_to_discord(destination: discord.abc.Messageable, content: str) -> None:
+    """
+    Sends a message through Discord, telling 429 responses apart as RateLimited.
+
+    :param destination: The User or Channel to send the message to.
+    :param content: The message.
+    """
+    try:
+        await destination.send(content)
+    except discord.HTTPException as e:
+        if e.status != 429:
+            raise
+        headers = getattr(e.response, "headers", dict())
+        raise RateLimited(float(headers.get("Retry-After", 1)), is_global=bool(headers.get("X-RateLimit-Global")))
+
+
+class OutboundDispatcher:
+    """
+    Sends every outbound message of the bot, paced so as to stay within Discord's rate limits.
+
+    Each destination gets a FIFO queue of its own, so messages to a destination arrive in the order they were sent;
+    and a token bucket of its own, mirroring Discord's per-channel limit. Different destinations are sent to
+    concurrently, under a global token bucket. Messages queued up for the same destination get merged into as few
+    messages as fit Discord's length limit. Messages refused with a 429 get sent again once told to.
+
+    Sending returns right away: the returned future tells when (and whether) the message got delivered, for those who
+    care. Failures get logged, so the future need not be awaited.
+    """
+
+    def __init__(
+        self,
+        sender: Sender,
+        destination_rate: float = DESTINATION_RATE,
+        destination_burst: int = DESTINATION_BURST,
+        global_rate: float = GLOBAL_RATE,
+        global_burst: int = GLOBAL_BURST,
+        max_length: int = MESSAGE_MAX_LENGTH,
+        max_attempts: int = MAX_ATTEMPTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param sender: Actually sends a message to a destination, raising RateLimited if refused for going over a limit.
+        :param destination_rate: Messages per second to a single destination.
+        :param destination_burst: Messages to a single destination that may go at once.
+        :param global_rate: Messages per second, all destinations together.
+        :param global_burst: Messages that may go at once, all destinations together.
+        :param max_length: The maximum length of a message. Adjacent messages get merged up to it.
+        :param max_attempts: How many times a message gets sent before giving up on it.
+        :param clock: Returns the current time, in seconds.
+        """
+        self._logger = Logger(self.__class__.__name__)
+
+        self._sender = sender
+        self._destination_rate = destination_rate
+        self._destination_burst = destination_burst
+        self._max_length = max_length
+        self._max_attempts = max_attempts
+        self._clock = clock
+
+        self._global_bucket = TokenBucket(global_rate, global_burst, clock=clock)
+        self._queues: Dict[Destination, Deque[_Outgoing]] = dict()
+        self._buckets: LRUCache[Destination, TokenBucket] = LRUCache(MAX_TRACKED_DESTINATIONS)
+        self._workers: Dict[Destination, "asyncio.Task[None]"] = dict()
+
+    def send(self, destination: Destination, content: str) -> "asyncio.Future[None]":
+        """
+        Queues a message up to be sent. It returns right away.
+
+        :param destination: The User or Channel to send the message to.
+        :param content: The message.
+        :return: A future that completes once the message got delivered, or fails if it couldn't be.
+        """
+        delivery: "asyncio.Future[None]" = asyncio.get_event_loop().create_future()
+        delivery.add_done_callback(lambda d: d.cancelled() or d.exception())  # failures get logged instead
+
+        self._queues.setdefault(destination, deque()).append(_Outgoing(content, delivery))
+        if destination not in self._workers:
+            self._workers[destination] = asyncio.ensure_future(self._deliver(destination))
+        return delivery
+
+    async def drain(self) -> None:
+        """Waits for every queued message to be either delivered or given up on."""
+        while self._workers:
+            await asyncio.wait(list(self._workers.values()))
+
+    @property
+    def pending(self) -> int:
+        """Returns the amount of messages waiting to be sent."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def _deliver(self, destination: Destination) -> None:
+        queue: Deque[_Outgoing] = self._queues[destination]
+        try:
+            while queue:
+                batch: List[_Outgoing] = self._next_batch(queue)
+                error: Optional[BaseException] = await self._send(destination, "\n".join(o.content for o in batch))
+                for outgoing in batch:
+                    if outgoing.delivery.done():
+                        continue
+                    if error is None:
+                        outgoing.delivery.set_result(None)
+                    else:
+                        outgoing.delivery.set_exception(error)
+        finally:
+            # nothing got queued since the queue was last seen empty: there was no await in between
+            del self._workers[destination]
+            if not queue:
+                del self._queues[destination]
+
+    def _next_batch(self, queue: Deque[_Outgoing]) -> List[_Outgoing]:
+        """Takes the next message off the queue, along with as many following ones as fit in a single message."""
+        batch: List[_Outgoing] = [queue.popleft()]
+        length: int = len(batch[0].content)
+        while queue and length + 1 + len(queue[0].content) <= self._max_length:
+            length += 1 + len(queue[0].content)
+            batch.append(queue.popleft())
+        return batch
+
+    async def _send(self, destination: Destination, content: str) -> Optional[BaseException]:
+        """Sends a message, waiting for its turn and retrying it as told. Returns why it wasn't sent, if it wasn't."""
+        bucket: Optional[TokenBucket] = self._buckets.get(destination)
+        if bucket is None:
+            bucket = TokenBucket(self._destination_rate, self._destination_burst, clock=self._clock)
+            self._buckets.put(destination, bucket)
+
+        attempt: int = 0
+        while True:
+            attempt += 1
+            delay: float = max(bucket.reserve(), self._global_bucket.reserve())
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                await self._sender(destination, content)
+                return None
+            except RateLimited as e:
+                self._logger.warning(
+                    "Message to [{}] refused on attempt {} of {}: {}".format(
+                        destination, attempt, self._max_attempts, e
+                    )
+                )
+                if attempt >= self._max_attempts:
+                    return e
+                (self._global_bucket if e.is_global else bucket).block(e.retry_after)
+            except Exception as e:
+                self._logger.error("Message to [{}] could not be sent: {}".format(destination, e))
+                return e
@@ -0,0 +1,86 @@
+import textwrap
+from typing import Iterable, Iterator, List
+
+from src.outbound.dispatcher import MESSAGE_MAX_LENGTH
+
+# Discord's embed limits: characters in a field's value, fields per embed, and characters all over an embed
+EMBED_FIELD_MAX_LENGTH: int = 1024
+EMBED_MAX_FIELDS: int = 25
+EMBED_MAX_LENGTH: int = 6000
+# name of every packed field: fields must be named, and this one shows as a blank
+EMBED_FIELD_NAME: str = "\u200b"
+
+
+def pack_lines(lines: Iterable[str], max_length: int = MESSAGE_MAX_LENGTH) -> Iterator[str]:
+    """
+    Packs lines into as few messages as possible, never splitting a line across messages (unless the line alone is
+    longer than a message). Lines are taken lazily and kept in order, and each message is filled up before starting the
+    next one; which, lines being in order, is as few messages as they fit in.
+
+    :param lines: The lines to pack, such as rendered sales or search results.
+    :param max_length: The maximum length of a message. Defaults to Discord's max.
+    :return: The messages, lines joined by newlines.
+    """
+    message: List[str] = list()
+    length: int = -1  # of the message's lines joined by newlines
+    for line in _fitting(lines, max_length):
+        if message and length + 1 + len(line) > max_length:
+            yield from _non_blank("\n".join(message))
+            message, length = list(), -1
+        message.append(line)
+        length += 1 + len(line)
+
+    if message:
+        yield from _non_blank("\n".join(message))
+
+
+def pack_embeds(lines: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Packs lines into as few embeds as possible, the way pack_lines packs them into messages: lines fill a field up to
+    its limit, and fields fill an embed up to either the amount of fields or the total length limit.
+
+    :param lines: The lines to pack, such as rendered sales or search results.
+    :return: The embeds, as the values of their fields (each of them named EMBED_FIELD_NAME).
+    """
+    fields: List[str] = list()
+    field: List[str] = list()
+    field_length: int = -1
+    embed_length: int = 0  # of every field's name and value, the current one's included
+    for line in _fitting(lines, EMBED_FIELD_MAX_LENGTH):
+        if (
+            field
+            and field_length + 1 + len(line) <= EMBED_FIELD_MAX_LENGTH
+            and embed_length + 1 + len(line) <= EMBED_MAX_LENGTH
+        ):
+            field.append(line)
+            field_length += 1 + len(line)
+            embed_length += 1 + len(line)
+            continue
+
+        if field:
+            fields.append("\n".join(field))
+        if len(fields) == EMBED_MAX_FIELDS or embed_length + len(EMBED_FIELD_NAME) + len(line) > EMBED_MAX_LENGTH:
+            yield fields
+            fields, embed_length = list(), 0
+        field, field_length = [line], len(line)
+        embed_length += len(EMBED_FIELD_NAME) + len(line)
+
+    if field:
+        fields.append("\n".join(field))
+    if fields:
+        yield fields
+
+
+def _fitting(lines: Iterable[str], max_length: int) -> Iterator[str]:
+    """Splits every line longer than the given length, at whitespace when possible."""
+    for line in lines:
+        if len(line) <= max_length:
+            yield line
+        else:
+            yield from textwrap.wrap(text=line, width=max_length, replace_whitespace=False)
+
+
+def _non_blank(message: str) -> Iterator[str]:
+    """Discord refuses blank messages: drops the given one if blank."""
+    if message.strip():
+        yield message
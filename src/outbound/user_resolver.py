@@ -0,0 +1,73 @@
+import asyncio
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import discord
+
+from src.aux.logger import Logger
+from src.aux.lru_cache import CacheStats, LRUCache
+
+# users kept resolved, and for how long (in seconds) before being fetched again: names and avatars do change
+DEFAULT_MAX_USERS: int = 1024
+DEFAULT_TTL: float = 600
+
+
+class UserResolver:
+    """
+    Resolves Discord users by ID, so that they can be DMed.
+
+    Users in the bot's member cache are resolved right away. The rest are fetched from Discord (a round trip), and kept
+    in a bounded LRU cache for a while; concurrent resolutions of a user being fetched wait on that very same fetch.
+    """
+
+    def __init__(
+        self, maxsize: int = DEFAULT_MAX_USERS, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        :param maxsize: The maximum amount of fetched users kept.
+        :param ttl: How long, in seconds, a fetched user is kept.
+        :param clock: Returns the current time, in seconds.
+        """
+        self._logger = Logger(self.__class__.__name__)
+
+        self._ttl = ttl
+        self._clock = clock
+        self._users: LRUCache[int, Tuple[discord.User, float]] = LRUCache(maxsize)  # along with when they expire
+        self._fetches: Dict[int, "asyncio.Future[Optional[discord.User]]"] = dict()
+
+    async def resolve(self, client: discord.Client, user_id: int) -> Optional[discord.User]:
+        """
+        Resolves the user with the given ID.
+
+        :param client: The bot, whose member cache to look into and through which to fetch.
+        :param user_id: The user's ID.
+        :return: The user, or None if there is no such user.
+        :raises discord.HTTPException: If the user couldn't be fetched.
+        """
+        user: Optional[discord.User] = client.get_user(user_id)
+        if user is not None:
+            return user
+
+        cached: Optional[Tuple[discord.User, float]] = self._users.get(user_id)
+        if cached is not None and cached[1] > self._clock():
+            return cached[0]
+
+        fetch = self._fetches.get(user_id)
+        if fetch is None:
+            fetch = self._fetches[user_id] = asyncio.ensure_future(self._fetch(client, user_id))
+            fetch.add_done_callback(lambda _: self._fetches.pop(user_id, None))
+        return await asyncio.shield(fetch)
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        return self._users.stats
+
+    async def _fetch(self, client: discord.Client, user_id: int) -> Optional[discord.User]:
+        self._logger.debug("User [{}] not in cache. Fetching...".format(user_id))
+        try:
+            user: discord.User = await client.fetch_user(user_id)
+        except discord.NotFound:
+            return None
+
+        self._users.put(user_id, (user, self._clock() + self._ttl))
+        return user
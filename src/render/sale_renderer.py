@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, Tuple
+
+from src.aux.configuration import Configuration
+from src.aux.logger import Logger
+from src.aux.lru_cache import CacheStats, LRUCache
+from src.aux.singleton import Singleton
+from src.aux.typing import get_or_else_throw
+from src.handler.item import ItemHandler
+from src.i18n.i18n import I18n
+
+if TYPE_CHECKING:
+    from src.entity.sale import Sale
+
+_: Callable[[str], str] = lambda s: I18n().gettext(s)
+
+
+class SaleRenderer(metaclass=Singleton):
+    """
+    Renders sales as the lines listed to users.
+
+    The translated template is resolved once per language, and every sale's line is cached by its UID and language;
+    which is safe, as sales are immutable. Rendering a list is then just joining cached lines.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._logger = Logger(self.__class__.__name__)
+        self._logger.info("Initializing sale renderer...")
+
+        self._i18n = I18n()
+        self._catalog = ItemHandler().catalog
+        self._templates: Dict[str, str] = dict()  # by language
+        self._lines: LRUCache[Tuple[str, str], str] = LRUCache(Configuration().get_sale_render_cache_size())
+
+    def render(self, sale: Sale) -> str:
+        """
+        Returns the given sale's line.
+
+        :param sale: The sale to render.
+        """
+        language = self._i18n.language
+        key = (language, sale.sale_uid)
+
+        line = self._lines.get(key)
+        if line is None:
+            line = self._template(language).format(
+                sale.seller,
+                sale.quantity,
+                get_or_else_throw(self._catalog.get_by_uid(sale.item_uid)).name,
+                sale.price,
+                sale.from_day,
+                sale.to_day,
+                sale.sale_uid,
+            )
+            self._lines.put(key, line)
+        return line
+
+    def render_lines(self, sales: Iterable[Sale]) -> Iterator[str]:
+        """
+        Lazily renders the given sales, one line each.
+
+        :param sales: The sales to render.
+        """
+        return map(self.render, sales)
+
+    def render_list(self, sales: Iterable[Sale]) -> str:
+        """
+        Renders the given sales, one per line.
+
+        :param sales: The sales to render.
+        """
+        return "\n".join(self.render_lines(sales))
+
+    def invalidate(self, sale_uid: str) -> None:
+        """
+        Drops every cached line of the given sale. Only ever needed should sales become mutable.
+
+        :param sale_uid: The sale's UID.
+        """
+        for language in list(self._templates.keys()):
+            self._lines.pop((language, sale_uid))
+
+    @property
+    def cache_stats(self) -> CacheStats:
+        return self._lines.stats
+
+    def _template(self, language: str) -> str:
+        template = self._templates.get(language)
+        if template is None:
+            template = self._templates[language] = _(
+                "User [{}] offers [{}] units of item [{}] for [{}] coins, from [{}] until [{}]. Sale's UID: {}"
+            )
+        return template
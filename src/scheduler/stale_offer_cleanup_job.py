@@ -1,37 +1,91 @@
 from __future__ import annotations
 
 import asyncio
+import time
+from typing import Optional
 
 from src.aux.logger import Logger
-from src.aux.singleton import Singleton
-from src.handler.sale import SaleHandler
+from src.handler.async_sale import AsyncSaleHandler
 
 Task = asyncio.Task
 
+# how long to wait past a sale's expiry before removing it, so that sales expiring together are removed in one write
+EXPIRY_BATCH_WINDOW: float = 1.0
+# longest time the job sleeps without checking for expired sales, no matter how far away the next expiry is
+MAX_SLEEP: float = 3600
+# how often the in-memory sale index gets verified against the sale storage
+CONSISTENCY_CHECK_INTERVAL: float = 3600
+# how long to wait before trying again after a run failed
+RETRY_DELAY: float = 60
 
-class StaleOfferCleanupJob(metaclass=Singleton):
+
+class StaleOfferCleanupJob:
+    """
+    Removes sales as they expire. Instead of sweeping the whole market periodically, the job sleeps until the next sale
+    is due (plus a small batching window), removes everything that expired by then in one go, and repeats. It is woken
+    early whenever a sale gets created that expires sooner than the one it is waiting on. Sales that expired while the
+    bot was down get removed as soon as it starts. Each market gets a job of its own.
+    """
 
     _task: Task
 
-    def __init__(self) -> None:
+    def __init__(self, sale_handler: AsyncSaleHandler) -> None:
+        """
+        :param sale_handler: The handler of the market to clean up.
+        """
         super().__init__()
 
         self._logger = Logger(self.__class__.__name__)
-        self._logger.info("Initializing stale offers cleanup job...")
-        self._sale_handler = SaleHandler()
+        self._logger.info("Initializing stale offers cleanup job of {}...".format(sale_handler.market))
+        self._sale_handler = sale_handler
 
     async def _run(self) -> None:
-        self._logger.info("Stale offers scheduler started successfully. Will run once per hour.")
+        loop = asyncio.get_event_loop()
+        wake_up = asyncio.Event()
+
+        def on_expiry_changed(_expiry: float) -> None:
+            # called from the writer thread
+            loop.call_soon_threadsafe(wake_up.set)
+
+        self._sale_handler.add_expiry_listener(on_expiry_changed)
+
+        self._logger.info(
+            "Stale offers scheduler of {} started successfully. Will run as offers expire.".format(
+                self._sale_handler.market
+            )
+        )
+        last_consistency_check = time.time()
         while True:
-            # execute task
-            self._logger.info("Executing stale offers cleanup task...")
+            wake_up.clear()
+            try:
+                # execute task
+                removed_entries: int = await self._sale_handler.remove_stale_sales()
+                if removed_entries:
+                    self._logger.info(
+                        "Removed {} stale entries of {}.".format(removed_entries, self._sale_handler.market)
+                    )
 
-            removed_entries: int = self._sale_handler.remove_stale_sales()
+                if time.time() - last_consistency_check >= CONSISTENCY_CHECK_INTERVAL:
+                    await self._sale_handler.check_consistency()
+                    last_consistency_check = time.time()
 
-            self._logger.info("Removed {} stale entries.".format(removed_entries))
+                timeout: float = await self._seconds_until_next_run()
+            except Exception as e:
+                self._logger.error("Stale offers cleanup of {} failed: {}".format(self._sale_handler.market, e))
+                timeout = RETRY_DELAY
 
-            # wait before next iteration
-            await asyncio.sleep(3600)
+            # wait until the next expiry (or until a sooner one shows up) before next iteration
+            try:
+                await asyncio.wait_for(wake_up.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _seconds_until_next_run(self) -> float:
+        next_expiry: Optional[float] = await self._sale_handler.get_next_expiry()
+        if next_expiry is None:
+            return MAX_SLEEP
+
+        return min(max(next_expiry - time.time(), 0) + EXPIRY_BATCH_WINDOW, MAX_SLEEP)
 
     def start(self) -> StaleOfferCleanupJob:
         self._task = asyncio.get_event_loop().create_task(self._run())
@@ -39,3 +93,7 @@ class StaleOfferCleanupJob(metaclass=Singleton):
 
     def stop(self) -> bool:
         return self._task.cancel()
+
+    async def stopped(self) -> None:
+        """Waits for the job to be done, once stopped."""
+        await asyncio.wait([self._task])
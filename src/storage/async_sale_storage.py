@@ -0,0 +1,127 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence, TypeVar
+
+from src.entity.sale import Sale
+from src.storage.group_commit import GroupCommitStats, GroupCommitter
+from src.storage.sale_storage import SaleStorage
+
+T = TypeVar("T")
+
+# threads serving reads; writes always get a single thread of their own
+DEFAULT_READERS: int = 4
+
+
+class AsyncSaleStorage:
+    """
+    Asynchronous front of a SaleStorage, so that the event loop never blocks on it.
+
+    Reads run on a pool of reader threads. Writes run on a single writer thread, one after the other in the order they
+    were issued, so they are never reordered. With group commit on, inserts and removals are batched (see
+    GroupCommitter) on that very same writer thread. Every coroutine returns once its storage call returned.
+
+    Claims need no locking of their own: without group commit, each one is a single write, in order with the rest. With
+    it, a claim is a read plus a batched removal, and only the claim whose removal actually removed the Sale wins it;
+    claims of the same Sale racing each other just share a batch, where only the first removal removes anything.
+    """
+
+    def __init__(
+        self,
+        storage: SaleStorage,
+        readers: int = DEFAULT_READERS,
+        group_commit_window: float = 0,
+        group_commit_max_batch: int = 1,
+    ) -> None:
+        """
+        :param storage: The storage to front. It must be safe to use from several threads at once.
+        :param readers: The amount of reader threads.
+        :param group_commit_window: How long, in seconds, inserts and removals may wait for others to share their write
+            with. Zero disables group commit.
+        :param group_commit_max_batch: The amount of queued inserts and removals that get written right away.
+        """
+        self._storage = storage
+        self._reader = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="sale-reader")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sale-writer")
+
+        self._group_committer: Optional[GroupCommitter] = None
+        if group_commit_window > 0:
+            self._group_committer = GroupCommitter(
+                storage, window=group_commit_window, max_batch=group_commit_max_batch, writer=self._writer
+            )
+
+    async def insert(self, sale: Sale) -> None:
+        if self._group_committer is not None:
+            await self._group_committer.insert(sale)
+        else:
+            await self.write(self._storage.insert, sale)
+
+    async def get_by_sale_uid(self, sale_uid: str) -> Optional[Sale]:
+        return await self.read(self._storage.get_by_sale_uid, sale_uid)
+
+    async def get_all(self) -> List[Sale]:
+        return await self.read(self._storage.get_all)
+
+    async def get_by_item_uids(self, item_uids: Sequence[str]) -> List[Sale]:
+        return await self.read(self._storage.get_by_item_uids, item_uids)
+
+    async def remove_by_sale_uid(self, sale_uid: str) -> int:
+        if self._group_committer is not None:
+            return await self._group_committer.remove_by_sale_uid(sale_uid)
+        return await self.write(self._storage.remove_by_sale_uid, sale_uid)
+
+    async def claim(self, sale_uid: str) -> Optional[Sale]:
+        """See SaleStorage.claim."""
+        if self._group_committer is None:
+            return await self.write(self._storage.claim, sale_uid)
+
+        sale: Optional[Sale] = await self.get_by_sale_uid(sale_uid)
+        if sale is None or not await self._group_committer.remove_by_sale_uid(sale_uid):
+            return None
+        return sale
+
+    async def remove_expired(self, timestamp: float) -> int:
+        return await self.write(self._storage.remove_expired, timestamp)
+
+    async def count(self) -> int:
+        return await self.read(self._storage.count)
+
+    async def read(self, function: Callable[..., T], *args: Any) -> T:
+        """
+        Runs any other blocking read of the storage on a reader thread.
+
+        :param function: The blocking call.
+        :param args: Its arguments.
+        """
+        return await asyncio.get_event_loop().run_in_executor(self._reader, functools.partial(function, *args))
+
+    async def write(self, function: Callable[..., T], *args: Any) -> T:
+        """
+        Runs any other blocking write to the storage on the writer thread, in order with every other write. Queued group
+        commits get flushed first, so that they keep their place in that order.
+
+        :param function: The blocking call.
+        :param args: Its arguments.
+        """
+        if self._group_committer is not None:
+            self._group_committer.flush()
+        return await asyncio.get_event_loop().run_in_executor(self._writer, functools.partial(function, *args))
+
+    @property
+    def group_commit_stats(self) -> Optional[GroupCommitStats]:
+        """Returns the metrics of batched writes, or None if group commit is off."""
+        return self._group_committer.stats if self._group_committer is not None else None
+
+    async def drain(self) -> None:
+        """Flushes queued group commits, and waits for them to be written."""
+        if self._group_committer is not None:
+            await self._group_committer.drain()
+
+    def close(self) -> None:
+        """
+        Waits for every pending write, and shuts the reader and writer threads down. The underlying storage is left
+        open. It blocks, so it may run off the event loop; but then group commits queued by then are lost: drain them
+        first.
+        """
+        self._writer.shutdown(wait=True)
+        self._reader.shutdown(wait=True)
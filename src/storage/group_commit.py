@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+from src.aux.logger import Logger
+from src.entity.sale import Sale
+from src.storage.sale_storage import SaleStorage
+
+
+class GroupCommitStats(NamedTuple):
+    """Point-in-time metrics of a group committer: how big its batches are, and how long they take to be written."""
+
+    batches: int
+    operations: int
+    max_batch_size: int
+    total_flush_latency: float  # in seconds
+    max_flush_latency: float  # in seconds
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.operations / self.batches if self.batches else 0.0
+
+    @property
+    def mean_flush_latency(self) -> float:
+        return self.total_flush_latency / self.batches if self.batches else 0.0
+
+    def __str__(self) -> str:
+        return (
+            "batches: {}, operations: {}, batch size: {:.1f} mean/{} max, flush latency: {:.2f} mean/{:.2f} max ms"
+        ).format(
+            self.batches,
+            self.operations,
+            self.mean_batch_size,
+            self.max_batch_size,
+            self.mean_flush_latency * 1000,
+            self.max_flush_latency * 1000,
+        )
+
+
+class GroupCommitter:
+    """
+    Batches the Sale writes of concurrent commands, so that bursts of them cost a single write to the storage.
+
+    Inserts and removals are queued; and the queue is flushed, with a single SaleStorage.write_batch call, once the
+    oldest queued operation has waited for the configured window, or as soon as enough operations pile up. Every
+    operation's coroutine only returns once the batch it belongs to has been written (and is as durable as the storage
+    makes it), raising whatever the write raised should it fail.
+
+    Batches are written by a single background thread, one after the other and in the order they were flushed; so the
+    event loop never blocks on the storage, and writes are never reordered.
+    """
+
+    def __init__(
+        self, storage: SaleStorage, window: float, max_batch: int, writer: Optional[ThreadPoolExecutor] = None
+    ) -> None:
+        """
+        :param storage: The storage to write batches to.
+        :param window: How long, in seconds, an operation may wait for others to share its write.
+        :param max_batch: The amount of queued operations that triggers a flush right away, window or not.
+        :param writer: A single-threaded executor to write batches with, shared with other writes to the storage so
+            that all of them stay in order. If none is given, the committer uses (and shuts down) its own.
+        """
+        if window < 0:
+            raise ValueError("Group commit window must not be negative, but was {}".format(window))
+        if max_batch < 1:
+            raise ValueError("Group commit batch size must be a positive integer, but was {}".format(max_batch))
+
+        self._logger = Logger(self.__class__.__name__)
+
+        self._storage = storage
+        self._window = window
+        self._max_batch = max_batch
+
+        self._inserts: List[Tuple[Sale, asyncio.Future]] = list()
+        self._removals: List[Tuple[str, asyncio.Future]] = list()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: Set[asyncio.Future] = set()  # batches handed over to the writer thread, and not written yet
+        self._owns_writer = writer is None
+        self._writer = writer if writer is not None else ThreadPoolExecutor(1, thread_name_prefix="sale-writer")
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._operations = 0
+        self._max_batch_size = 0
+        self._total_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+
+    async def insert(self, sale: Sale) -> None:
+        """
+        Stores the given Sale, along with every other operation queued within the window.
+
+        :param sale: The Sale to store.
+        """
+        await self._enqueue(self._inserts, sale)
+
+    async def remove_by_sale_uid(self, sale_uid: str) -> int:
+        """
+        Removes the Sale with the given UID, along with every other operation queued within the window.
+
+        :param sale_uid: The Sale's UID.
+        :return: The amount of removed Sales.
+        """
+        return await self._enqueue(self._removals, sale_uid)
+
+    def flush(self) -> None:
+        """
+        Hands every queued operation over to the writer thread right away, without waiting for the window. It must be
+        called from the event loop's thread.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        inserts, self._inserts = self._inserts, list()
+        removals, self._removals = self._removals, list()
+        if not inserts and not removals:
+            return
+
+        written = asyncio.get_event_loop().run_in_executor(
+            self._writer, self._write, [sale for sale, _ in inserts], [sale_uid for sale_uid, _ in removals]
+        )
+        self._in_flight.add(written)
+        written.add_done_callback(self._in_flight.discard)
+        written.add_done_callback(lambda result: self._resolve(result, inserts, removals))
+
+    async def drain(self) -> None:
+        """Flushes every queued operation, and waits for every batch handed over to the writer thread to be written."""
+        self.flush()
+        if self._in_flight:
+            await asyncio.wait(list(self._in_flight))
+
+    def close(self) -> None:
+        """
+        Flushes every queued operation, and waits for every batch to be written if the writer is its own. It must be
+        called from the event loop's thread; use drain from coroutines, as this blocks.
+        """
+        self.flush()
+        if self._owns_writer:
+            self._writer.shutdown(wait=True)
+
+    @property
+    def stats(self) -> GroupCommitStats:
+        with self._stats_lock:
+            return GroupCommitStats(
+                self._batches,
+                self._operations,
+                self._max_batch_size,
+                self._total_flush_latency,
+                self._max_flush_latency,
+            )
+
+    def _enqueue(self, queue: List, operation: object) -> asyncio.Future:
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        queue.append((operation, future))
+
+        if len(self._inserts) + len(self._removals) >= self._max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self.flush)
+
+        return future
+
+    def _write(self, inserts: List[Sale], removals: List[str]) -> List[int]:
+        # runs on the writer thread
+        start = time.perf_counter()
+        removed = self._storage.write_batch(inserts, removals)
+        latency = time.perf_counter() - start
+
+        size = len(inserts) + len(removals)
+        with self._stats_lock:
+            self._batches += 1
+            self._operations += size
+            self._max_batch_size = max(self._max_batch_size, size)
+            self._total_flush_latency += latency
+            self._max_flush_latency = max(self._max_flush_latency, latency)
+
+        self._logger.debug("Wrote a batch of {} sale operations in {} ms.".format(size, round(latency * 1000, 2)))
+        return removed
+
+    @staticmethod
+    def _resolve(
+        written: asyncio.Future,
+        inserts: List[Tuple[Sale, asyncio.Future]],
+        removals: List[Tuple[str, asyncio.Future]],
+    ) -> None:
+        # runs on the event loop; futures whose commands were cancelled in the meantime are skipped
+        error: Optional[BaseException] = None if written.cancelled() else written.exception()
+        if written.cancelled() or error is not None:
+            for _, future in inserts + removals:
+                if future.done():
+                    continue
+                if error is None:
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+            return
+
+        for _, future in inserts:
+            if not future.done():
+                future.set_result(None)
+        for (_, future), removed in zip(removals, written.result()):
+            if not future.done():
+                future.set_result(removed)
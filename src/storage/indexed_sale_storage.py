@@ -0,0 +1,277 @@
+import bisect
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.entity.sale import Sale
+from src.storage.pagination import SaleKey, SalePage, decode_cursor, encode_cursor, sale_key
+from src.storage.sale_storage import SaleStorage
+
+# the expiry heap gets compacted once more than this share of its entries belong to Sales that are already gone
+STALE_EXPIRY_ENTRIES_RATIO: float = 0.5
+
+
+class IndexedSaleStorage(SaleStorage):
+    """
+    Write-through, in-memory index in front of another SaleStorage.
+
+    Every Sale is kept in memory in a dict by Sale UID, in a multimap by Item UID, in a min-heap by expiry, and in a
+    list sorted by creation time (for pagination); all of them (re)built from the backing storage on start up. Reads are
+    served from memory alone and never touch the backing storage. Writes go to the backing storage first, and to the
+    index only once they succeeded; so the index never holds a Sale that wasn't persisted.
+
+    Reads never return Sales that have already expired, even if they haven't been removed yet.
+
+    Sales are shared, not copied: they are immutable.
+    """
+
+    def __init__(self, storage: SaleStorage, clock: Callable[[], float] = time.time) -> None:
+        """
+        :param storage: The backing storage.
+        :param clock: Returns the current timestamp. Sales that ended before it are hidden from reads.
+        """
+        self._storage = storage
+        self._clock = clock
+        self._lock = threading.RLock()
+        # notified with the new earliest expiry whenever a Sale gets added that expires sooner than all the others
+        self._expiry_listeners: List[Callable[[float], None]] = list()
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """(Re)builds the whole index out of the backing storage."""
+        with self._lock:
+            self._sequence = itertools.count()
+            self._by_sale_uid: Dict[str, Sale] = dict()  # in insertion order
+            self._positions: Dict[str, int] = dict()  # insertion sequence number of every Sale, by Sale UID
+            self._by_item_uid: Dict[str, Dict[int, Sale]] = dict()  # Sales of every Item by sequence number, in order
+
+            self._by_creation: List[SaleKey] = list()  # sorted
+
+            for sale in self._storage.get_all():
+                self._add(sale, to_expiry=False, to_creation=False)
+            self._rebuild_expiry_heap()
+            self._by_creation = sorted(sale_key(sale) for sale in self._by_sale_uid.values())
+
+    def check_consistency(self) -> List[str]:
+        """
+        Verifies the index against the backing storage, which gets fully read.
+
+        :return: A description of every discrepancy found; empty if there were none.
+        """
+        with self._lock:
+            stored: Dict[str, Dict] = {sale.sale_uid: sale.to_dict() for sale in self._storage.get_all()}
+
+            discrepancies: List[str] = list()
+            for sale_uid in stored.keys() - self._by_sale_uid.keys():
+                discrepancies.append("Sale [{}] is stored but not indexed".format(sale_uid))
+            for sale_uid in self._by_sale_uid.keys() - stored.keys():
+                discrepancies.append("Sale [{}] is indexed but not stored".format(sale_uid))
+            for sale_uid in stored.keys() & self._by_sale_uid.keys():
+                if stored[sale_uid] != self._by_sale_uid[sale_uid].to_dict():
+                    discrepancies.append("Sale [{}] differs between index and storage".format(sale_uid))
+
+            indexed_by_item = sum(len(sales) for sales in self._by_item_uid.values())
+            live_expiry_entries = len(self._expiry_heap) - self._stale_expiry_entries
+            if not (
+                len(self._by_sale_uid)
+                == len(self._positions)
+                == indexed_by_item
+                == live_expiry_entries
+                == len(self._by_creation)
+            ):
+                discrepancies.append("Index structures disagree on the amount of sales")
+
+            return discrepancies
+
+    def insert(self, sale: Sale) -> None:
+        with self._lock:
+            self._storage.insert(sale)
+            self._add(sale)
+
+    def insert_many(self, sales: Iterable[Sale]) -> int:
+        sales = list(sales)
+        with self._lock:
+            inserted = self._storage.insert_many(sales)
+            for sale in sales:
+                self._add(sale)
+            return inserted
+
+    def write_batch(self, inserts: Sequence[Sale], removals: Sequence[str]) -> List[int]:
+        with self._lock:
+            removed = self._storage.write_batch(inserts, removals)
+            for sale in inserts:
+                self._add(sale)
+            for sale_uid in removals:
+                if sale_uid in self._by_sale_uid:
+                    self._remove(self._by_sale_uid[sale_uid])
+            return removed
+
+    def get_by_sale_uid(self, sale_uid: str) -> Optional[Sale]:
+        now = self._clock()
+        with self._lock:
+            sale = self._by_sale_uid.get(sale_uid)
+            return sale if sale is not None and not self._is_expired(sale, now) else None
+
+    def get_all(self) -> List[Sale]:
+        now = self._clock()
+        with self._lock:
+            return [sale for sale in self._by_sale_uid.values() if not self._is_expired(sale, now)]
+
+    def get_by_item_uids(self, item_uids: Sequence[str]) -> List[Sale]:
+        now = self._clock()
+        with self._lock:
+            sales = [self._by_item_uid[uid] for uid in dict.fromkeys(item_uids) if uid in self._by_item_uid]
+            if len(sales) == 1:
+                return [sale for sale in sales[0].values() if not self._is_expired(sale, now)]
+
+            # every Item's Sales are already in insertion order: merging them by sequence number keeps it
+            return [
+                sale
+                for _, sale in heapq.merge(*(item_sales.items() for item_sales in sales))
+                if not self._is_expired(sale, now)
+            ]
+
+    def get_page(self, limit: int, cursor: Optional[str] = None, item_uids: Optional[Sequence[str]] = None) -> SalePage:
+        """
+        Returns a page of Sales in a stable order, by creation time. Sales created or removed between pages don't make
+        others show up twice nor be skipped. Costs O(log n + limit) for the whole market, and O(m log limit) for the m
+        Sales of the given Items; memory is O(limit) either way.
+
+        :param limit: The maximum amount of Sales in the page.
+        :param cursor: The continuation token of the former page; or None for the first one.
+        :param item_uids: The Items whose Sales to page through; or None for the whole market.
+        :raises ValueError: If the cursor is malformed.
+        """
+        after: Optional[SaleKey] = decode_cursor(cursor) if cursor is not None else None
+        now = self._clock()
+        with self._lock:
+            # one past the limit, to know whether there is a next page
+            sales: List[Sale]
+            if item_uids is None:
+                start = bisect.bisect_right(self._by_creation, after) if after is not None else 0
+                candidates: Iterator[Sale] = (
+                    self._by_sale_uid[self._by_creation[i][1]] for i in range(start, len(self._by_creation))
+                )
+                sales = list(itertools.islice((s for s in candidates if not self._is_expired(s, now)), limit + 1))
+            else:
+                matches: Iterator[Sale] = (
+                    sale
+                    for uid in dict.fromkeys(item_uids)
+                    for sale in self._by_item_uid.get(uid, dict()).values()
+                    if (after is None or sale_key(sale) > after) and not self._is_expired(sale, now)
+                )
+                sales = heapq.nsmallest(limit + 1, matches, key=sale_key)
+
+        if len(sales) <= limit:
+            return SalePage(sales, None)
+        return SalePage(sales[:limit], encode_cursor(sale_key(sales[limit - 1])))
+
+    def remove_by_sale_uid(self, sale_uid: str) -> int:
+        with self._lock:
+            removed = self._storage.remove_by_sale_uid(sale_uid)
+            if sale_uid in self._by_sale_uid:
+                self._remove(self._by_sale_uid[sale_uid])
+            return removed
+
+    def claim(self, sale_uid: str) -> Optional[Sale]:
+        # one operation under the index's lock: the lookup is served from memory, and expired Sales can't be claimed
+        with self._lock:
+            return super().claim(sale_uid)
+
+    def remove_expired(self, timestamp: float) -> int:
+        """
+        Removes the Sales that ended before the given timestamp, all of them with a single write to the backing storage.
+        Finding them costs O(log n) per expired Sale. Nothing gets written if no Sale expired.
+
+        :param timestamp: The current timestamp.
+        :return: The amount of removed Sales.
+        """
+        with self._lock:
+            next_expiry = self.next_expiry()
+            if next_expiry is None or next_expiry >= timestamp:
+                return 0
+
+            removed = self._storage.remove_expired(timestamp)
+            while self._expiry_heap and self._expiry_heap[0][0] < timestamp:
+                _, sale_uid = heapq.heappop(self._expiry_heap)
+                if sale_uid in self._by_sale_uid:
+                    self._remove(self._by_sale_uid[sale_uid], from_expiry=False, from_creation=False)
+                else:
+                    self._stale_expiry_entries -= 1  # the Sale was removed beforehand
+            # removing each of them from the sorted list would be O(n) apiece: filter it once instead
+            self._by_creation = [key for key in self._by_creation if key[1] in self._by_sale_uid]
+
+            return removed
+
+    def next_expiry(self) -> Optional[float]:
+        """Returns the end timestamp of the Sale that expires the soonest, or None if there are no Sales."""
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][1] not in self._by_sale_uid:
+                heapq.heappop(self._expiry_heap)  # the Sale was removed beforehand
+                self._stale_expiry_entries -= 1
+
+            return self._expiry_heap[0][0] if self._expiry_heap else None
+
+    def add_expiry_listener(self, listener: Callable[[float], None]) -> None:
+        """
+        Registers a listener to be called, with the new earliest expiry, whenever a Sale gets added that expires sooner
+        than all the others. It gets called from whichever thread wrote the Sale, while the index is locked.
+
+        :param listener: The listener to register.
+        """
+        with self._lock:
+            self._expiry_listeners.append(listener)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._by_sale_uid)
+
+    def close(self) -> None:
+        self._storage.close()
+
+    @staticmethod
+    def _is_expired(sale: Sale, now: float) -> bool:
+        return sale.to_date_timestamp < now
+
+    def _add(self, sale: Sale, to_expiry: bool = True, to_creation: bool = True) -> None:
+        self._by_sale_uid[sale.sale_uid] = sale
+        position = self._positions[sale.sale_uid] = next(self._sequence)
+        self._by_item_uid.setdefault(sale.item_uid, dict())[position] = sale
+        if to_creation:
+            key = sale_key(sale)
+            if not self._by_creation or key > self._by_creation[-1]:
+                self._by_creation.append(key)  # the usual case: the newest Sale
+            else:
+                bisect.insort(self._by_creation, key)
+        if to_expiry:
+            earliest = self.next_expiry() if self._expiry_listeners else None
+            heapq.heappush(self._expiry_heap, (sale.to_date_timestamp, sale.sale_uid))
+            if self._expiry_listeners and (earliest is None or sale.to_date_timestamp < earliest):
+                for listener in self._expiry_listeners:
+                    listener(sale.to_date_timestamp)
+
+    def _remove(self, sale: Sale, from_expiry: bool = True, from_creation: bool = True) -> None:
+        del self._by_sale_uid[sale.sale_uid]
+        position = self._positions.pop(sale.sale_uid)
+        if from_creation:
+            del self._by_creation[bisect.bisect_left(self._by_creation, sale_key(sale))]
+
+        item_sales = self._by_item_uid[sale.item_uid]
+        del item_sales[position]
+        if not item_sales:
+            del self._by_item_uid[sale.item_uid]
+
+        if from_expiry:
+            # removing an arbitrary heap entry is O(n): leave it (and skip it once it surfaces) until too many pile up
+            self._stale_expiry_entries += 1
+            if self._stale_expiry_entries > len(self._expiry_heap) * STALE_EXPIRY_ENTRIES_RATIO:
+                self._rebuild_expiry_heap()
+
+    def _rebuild_expiry_heap(self) -> None:
+        self._expiry_heap: List[Tuple[float, str]] = [
+            (sale.to_date_timestamp, sale.sale_uid) for sale in self._by_sale_uid.values()
+        ]
+        heapq.heapify(self._expiry_heap)
+        self._stale_expiry_entries = 0
@@ -0,0 +1,282 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from src.aux.logger import Logger
+from src.entity.sale import Sale
+from src.storage.sale_storage import SaleStorage
+
+FSYNC_ALWAYS: str = "always"
+FSYNC_PERIODIC: str = "periodic"
+FSYNC_NEVER: str = "never"
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_PERIODIC, FSYNC_NEVER)
+
+# minimum time between fsyncs under the periodic policy
+FSYNC_INTERVAL: float = 1.0
+DEFAULT_COMPACTION_THRESHOLD: int = 4 * 1024 * 1024
+
+SNAPSHOT_SUFFIX: str = ".snapshot"
+COMPACTING_SUFFIX: str = ".compacting"
+
+_CREATE: str = "create"
+_REMOVE: str = "remove"
+_EXPIRE: str = "expire"
+
+
+class JournalSaleStorage(SaleStorage):
+    """
+    Stores Sales as an append-only journal of events (Sale created, Sale removed, Sales expired), one JSON object per
+    line, on top of a snapshot of the whole market.
+
+    Every write appends a single line, no matter how big the market is; and a crash can at most tear the last line,
+    which gets discarded on replay. How often the journal is fsync'ed is configurable: after every event, at most once
+    per second, or never (leaving it to the OS). The current state is kept in memory, rebuilt on start up by replaying
+    the journal over the snapshot.
+
+    Once the journal outgrows a threshold, it gets compacted: it is set aside (new events go to a fresh journal) and a
+    background thread writes the current state as the new snapshot, deleting the set aside journal afterwards. Replay is
+    idempotent, so a compaction interrupted at any point loses nothing: the set aside journal is just replayed again.
+    """
+
+    def __init__(
+        self, path: str, fsync: str = FSYNC_ALWAYS, compaction_threshold: int = DEFAULT_COMPACTION_THRESHOLD
+    ) -> None:
+        """
+        :param path: The journal's path. The snapshot lives next to it.
+        :param fsync: When to fsync the journal: 'always', 'periodic' or 'never'.
+        :param compaction_threshold: The journal size, in bytes, past which it gets compacted.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError("Unknown fsync policy [{}]. Expected one of {}.".format(fsync, list(FSYNC_POLICIES)))
+
+        self._logger = Logger(self.__class__.__name__)
+
+        self._path = path
+        self._snapshot_path = path + SNAPSHOT_SUFFIX
+        self._compacting_path = path + COMPACTING_SUFFIX
+        self._fsync = fsync
+        self._compaction_threshold = compaction_threshold
+
+        self._lock = threading.RLock()
+        self._sales: Dict[str, Sale] = dict()  # in insertion order
+        self._last_fsync = 0.0
+        self._compaction: Optional[threading.Thread] = None
+
+        self._replay()
+        self._journal = open(self._path, "a", encoding="UTF-8")
+
+    def insert(self, sale: Sale) -> None:
+        with self._lock:
+            self._append([{"op": _CREATE, "sale": sale.to_dict()}])
+            self._sales[sale.sale_uid] = sale
+            self._compact_if_needed()
+
+    def insert_many(self, sales: Iterable[Sale]) -> int:
+        sales = list(sales)
+        with self._lock:
+            self._append([{"op": _CREATE, "sale": sale.to_dict()} for sale in sales])
+            for sale in sales:
+                self._sales[sale.sale_uid] = sale
+            self._compact_if_needed()
+            return len(sales)
+
+    def write_batch(self, inserts: Sequence[Sale], removals: Sequence[str]) -> List[int]:
+        with self._lock:
+            events = [{"op": _CREATE, "sale": sale.to_dict()} for sale in inserts]
+            inserted = {sale.sale_uid for sale in inserts}
+
+            removed: List[int] = list()
+            removed_uids = set()
+            for sale_uid in removals:
+                exists = (sale_uid in self._sales or sale_uid in inserted) and sale_uid not in removed_uids
+                removed.append(1 if exists else 0)
+                if exists:
+                    removed_uids.add(sale_uid)
+                    events.append({"op": _REMOVE, "sale_uid": sale_uid})
+
+            if events:
+                self._append(events)  # a single append, and at most a single fsync
+            for sale in inserts:
+                self._sales[sale.sale_uid] = sale
+            for sale_uid in removed_uids:
+                del self._sales[sale_uid]
+            self._compact_if_needed()
+
+            return removed
+
+    def get_by_sale_uid(self, sale_uid: str) -> Optional[Sale]:
+        with self._lock:
+            return self._sales.get(sale_uid)
+
+    def get_all(self) -> List[Sale]:
+        with self._lock:
+            return list(self._sales.values())
+
+    def get_by_item_uids(self, item_uids: Sequence[str]) -> List[Sale]:
+        # a scan; meant to be put behind IndexedSaleStorage, like every other storage
+        wanted: Set[str] = set(item_uids)
+        with self._lock:
+            return [sale for sale in self._sales.values() if sale.item_uid in wanted]
+
+    def remove_by_sale_uid(self, sale_uid: str) -> int:
+        with self._lock:
+            if sale_uid not in self._sales:
+                return 0
+
+            self._append([{"op": _REMOVE, "sale_uid": sale_uid}])
+            del self._sales[sale_uid]
+            self._compact_if_needed()
+            return 1
+
+    def remove_expired(self, timestamp: float) -> int:
+        with self._lock:
+            expired = [sale.sale_uid for sale in self._sales.values() if sale.to_date_timestamp < timestamp]
+            if not expired:
+                return 0
+
+            self._append([{"op": _EXPIRE, "timestamp": timestamp}])
+            for sale_uid in expired:
+                del self._sales[sale_uid]
+            self._compact_if_needed()
+            return len(expired)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._sales)
+
+    def compact(self, wait: bool = False) -> bool:
+        """
+        Sets the current journal aside and writes a new snapshot out of the current state, in a background thread. Does
+        nothing if a compaction is already underway.
+
+        :param wait: Whether to wait for the compaction to finish.
+        :return: Whether a compaction was started.
+        """
+        with self._lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return False
+
+            # the journal set aside by a former, interrupted compaction must make it into the snapshot too: as it
+            # precedes the current journal, it is (idempotently) folded into the state being snapshotted right now
+            self._sync()
+            self._journal.close()
+            if os.path.exists(self._compacting_path):
+                with open(self._compacting_path, "a", encoding="UTF-8") as compacting, open(self._path) as journal:
+                    compacting.write(journal.read())
+                os.remove(self._path)
+            else:
+                os.replace(self._path, self._compacting_path)
+            self._journal = open(self._path, "a", encoding="UTF-8")
+
+            state = [sale.to_dict() for sale in self._sales.values()]
+            self._compaction = threading.Thread(target=self._write_snapshot, args=(state,), daemon=True)
+            self._compaction.start()
+
+        if wait:
+            self._compaction.join()
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+        with self._lock:
+            if not self._journal.closed:
+                self._sync()
+                self._journal.close()
+
+    def _append(self, events: List[Dict[str, Any]]) -> None:
+        self._journal.write("".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events))
+        self._journal.flush()
+
+        if self._fsync == FSYNC_ALWAYS or (
+            self._fsync == FSYNC_PERIODIC and time.monotonic() - self._last_fsync >= FSYNC_INTERVAL
+        ):
+            self._sync()
+
+    def _compact_if_needed(self) -> None:
+        # only ever called once the in-memory state reflects every journaled event, as it is what gets snapshotted
+        if self._journal.tell() >= self._compaction_threshold:
+            self.compact()
+
+    def _sync(self) -> None:
+        self._journal.flush()
+        if self._fsync != FSYNC_NEVER:
+            os.fsync(self._journal.fileno())
+            self._last_fsync = time.monotonic()
+
+    def _write_snapshot(self, state: List[Dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            # write to a temporary file first and swap it in, so that a crash never leaves a half-written snapshot
+            temporary_path = "{}.tmp".format(self._snapshot_path)
+            with open(temporary_path, "w", encoding="UTF-8") as snapshot_file:
+                json.dump(state, snapshot_file, separators=(",", ":"))
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temporary_path, self._snapshot_path)
+            os.remove(self._compacting_path)
+        except OSError as e:
+            # the set aside journal is kept, so nothing is lost: the next compaction will fold it in again
+            self._logger.error("Could not compact sale journal [{}]: {}".format(self._path, e))
+            return
+
+        self._logger.info(
+            "Compacted sale journal into a snapshot of {} sales in {} ms.".format(
+                len(state), round((time.perf_counter() - start) * 1000, 2)
+            )
+        )
+
+    def _replay(self) -> None:
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, encoding="UTF-8") as snapshot_file:
+                for persisted in json.load(snapshot_file):
+                    sale = Sale.from_dict(persisted)
+                    self._sales[sale.sale_uid] = sale
+
+        events = 0
+        for path in (self._compacting_path, self._path):
+            if os.path.exists(path):
+                events += self._replay_journal(path)
+
+        self._logger.info("Replayed {} journal events over a snapshot of the sales.".format(events))
+
+    def _replay_journal(self, path: str) -> int:
+        events = 0
+        valid_length = 0
+        with open(path, "rb") as journal_file:
+            for line in journal_file:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    event = None
+                if event is None or not line.endswith(b"\n"):
+                    # only ever the last line, torn by a crash mid-write
+                    self._logger.warning("Discarding torn event at the end of sale journal [{}].".format(path))
+                    break
+
+                self._apply(event)
+                events += 1
+                valid_length += len(line)
+
+        if valid_length != os.path.getsize(path):
+            with open(path, "r+b") as journal_file:
+                journal_file.truncate(valid_length)
+
+        return events
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        if event["op"] == _CREATE:
+            sale = Sale.from_dict(event["sale"])
+            self._sales[sale.sale_uid] = sale
+        elif event["op"] == _REMOVE:
+            self._sales.pop(event["sale_uid"], None)
+        elif event["op"] == _EXPIRE:
+            for sale_uid in [s.sale_uid for s in self._sales.values() if s.to_date_timestamp < event["timestamp"]]:
+                del self._sales[sale_uid]
+        else:
+            raise Exception("Unknown sale journal event [{}]".format(event))
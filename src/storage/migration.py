@@ -0,0 +1,43 @@
+import os
+
+from tinydb import TinyDB
+
+from src.aux.logger import Logger
+from src.entity.sale import Sale
+from src.storage.sale_storage import SaleStorage
+
+MIGRATED_SUFFIX: str = ".migrated"
+
+_logger = Logger("SaleStorageMigration")
+
+
+def migrate_tinydb_sales(tinydb_path: str, storage: SaleStorage) -> int:
+    """
+    One-shot migration of the Sales of a TinyDB JSON file into the given storage.
+
+    Does nothing if there is no such file. Otherwise, copies over the Sales the storage doesn't have yet, and then
+    renames the file (appending '.migrated' to its name) so that it is never migrated again but kept around just in
+    case. Should the migration be interrupted, running it again picks up where it left off.
+
+    :param tinydb_path: The path to the TinyDB JSON file.
+    :param storage: The storage to migrate the Sales into.
+    :return: The amount of migrated Sales.
+    """
+    if not os.path.exists(tinydb_path):
+        return 0
+
+    _logger.info("Migrating sales from [{}]...".format(tinydb_path))
+
+    db = TinyDB(tinydb_path)
+    try:
+        sales = [Sale.from_dict(document) for document in db.all()]
+    finally:
+        db.close()
+
+    migrated = storage.insert_many([sale for sale in sales if storage.get_by_sale_uid(sale.sale_uid) is None])
+    os.replace(tinydb_path, tinydb_path + MIGRATED_SUFFIX)
+
+    _logger.info(
+        "Migrated {} sales. The former database has been kept as [{}].".format(migrated, tinydb_path + MIGRATED_SUFFIX)
+    )
+    return migrated
@@ -0,0 +1,43 @@
+import base64
+import binascii
+from typing import List, NamedTuple, Optional, Tuple
+
+from src.entity.sale import Sale
+
+# the position of a Sale in the market's stable order: by creation time, ties broken by Sale UID
+SaleKey = Tuple[float, str]
+
+
+class SalePage(NamedTuple):
+    """A page of Sales, in creation order; and the cursor to the next page, or None if this is the last one."""
+
+    sales: List[Sale]
+    next_cursor: Optional[str]
+
+
+def sale_key(sale: Sale) -> SaleKey:
+    """Returns the position of the given Sale in the market's stable order."""
+    return sale.from_date_timestamp, sale.sale_uid
+
+
+def encode_cursor(key: SaleKey) -> str:
+    """
+    Encodes the position of the last Sale of a page as an opaque continuation token.
+
+    :param key: The position of the last Sale of the page.
+    """
+    return base64.urlsafe_b64encode("{!r}/{}".format(key[0], key[1]).encode("UTF-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> SaleKey:
+    """
+    Decodes a continuation token back into the position it was encoded from.
+
+    :param cursor: The continuation token.
+    :raises ValueError: If the token is malformed.
+    """
+    try:
+        timestamp, sale_uid = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("UTF-8").split("/", 1)
+        return float(timestamp), sale_uid
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Malformed sale cursor [{}]".format(cursor))
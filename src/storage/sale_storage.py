@@ -0,0 +1,96 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Sequence
+
+from src.entity.sale import Sale
+
+
+class SaleStorage(ABC):
+    """
+    Persistent store of Sales, underlying SaleHandler. Unless stated otherwise, Sales come back in insertion order.
+    """
+
+    @abstractmethod
+    def insert(self, sale: Sale) -> None:
+        """
+        Stores the given Sale.
+
+        :param sale: The Sale to store.
+        """
+
+    @abstractmethod
+    def insert_many(self, sales: Iterable[Sale]) -> int:
+        """
+        Stores all the given Sales at once.
+
+        :param sales: The Sales to store.
+        :return: The amount of stored Sales.
+        """
+
+    @abstractmethod
+    def get_by_sale_uid(self, sale_uid: str) -> Optional[Sale]:
+        """
+        Returns the Sale with the given UID, or None if there is none.
+
+        :param sale_uid: The Sale's UID.
+        """
+
+    @abstractmethod
+    def get_all(self) -> List[Sale]:
+        """Returns every stored Sale."""
+
+    @abstractmethod
+    def get_by_item_uids(self, item_uids: Sequence[str]) -> List[Sale]:
+        """
+        Returns the Sales of any of the given Items.
+
+        :param item_uids: The UIDs of the Items.
+        """
+
+    @abstractmethod
+    def remove_by_sale_uid(self, sale_uid: str) -> int:
+        """
+        Removes the Sale with the given UID.
+
+        :param sale_uid: The Sale's UID.
+        :return: The amount of removed Sales.
+        """
+
+    @abstractmethod
+    def remove_expired(self, timestamp: float) -> int:
+        """
+        Removes the Sales that ended before the given timestamp.
+
+        :param timestamp: The current timestamp.
+        :return: The amount of removed Sales.
+        """
+
+    def claim(self, sale_uid: str) -> Optional[Sale]:
+        """
+        Removes the Sale with the given UID and returns it: a compare-and-remove. Of several concurrent claims of the
+        same Sale, only the one whose removal actually removed it gets it; which holds as long as removals are atomic.
+
+        :param sale_uid: The Sale's UID.
+        :return: The claimed Sale, or None if there was none (or someone else claimed it first).
+        """
+        sale = self.get_by_sale_uid(sale_uid)
+        if sale is None or not self.remove_by_sale_uid(sale_uid):
+            return None
+        return sale
+
+    def write_batch(self, inserts: Sequence[Sale], removals: Sequence[str]) -> List[int]:
+        """
+        Stores and removes Sales all at once: with a single write, for storages that support it. Inserts go first.
+
+        :param inserts: The Sales to store.
+        :param removals: The UIDs of the Sales to remove.
+        :return: The amount of removed Sales for each removal, in the same order.
+        """
+        self.insert_many(inserts)
+        return [self.remove_by_sale_uid(sale_uid) for sale_uid in removals]
+
+    @abstractmethod
+    def count(self) -> int:
+        """Returns the amount of stored Sales."""
+
+    def close(self) -> None:
+        """Releases the storage's underlying resources. It must not be used afterwards."""
@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from src.entity.sale import Sale
+from src.storage.sale_storage import SaleStorage
+
+# columns, in the same order as Sale's constructor arguments (and Sale.PERSISTED_FIELDS)
+COLUMNS: Tuple[str, ...] = (
+    "item_uid",
+    "quantity",
+    "price",
+    "seller",
+    "seller_discord_id",
+    "from_date_timestamp",
+    "to_date_timestamp",
+    "sale_uid",
+)
+
+# stays well below SQLite's default limit of host parameters per statement (999 on older versions)
+MAX_PARAMETERS: int = 500
+
+_SCHEMA: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS sale (
+        item_uid TEXT NOT NULL,
+        quantity INTEGER NOT NULL,
+        price INTEGER NOT NULL,
+        seller TEXT NOT NULL,
+        seller_discord_id INTEGER NOT NULL,
+        from_date_timestamp REAL NOT NULL,
+        to_date_timestamp REAL NOT NULL,
+        sale_uid TEXT NOT NULL
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS sale_sale_uid ON sale (sale_uid)",
+    "CREATE INDEX IF NOT EXISTS sale_item_uid ON sale (item_uid)",
+    "CREATE INDEX IF NOT EXISTS sale_to_date_timestamp ON sale (to_date_timestamp)",
+)
+
+_SELECT: str = "SELECT {} FROM sale".format(", ".join(COLUMNS))
+_INSERT: str = "INSERT INTO sale ({}) VALUES ({})".format(", ".join(COLUMNS), ", ".join("?" * len(COLUMNS)))
+
+
+class SQLiteSaleStorage(SaleStorage):
+    """
+    Stores Sales as rows of an SQLite database.
+
+    Lookups by Sale UID and by Item UID, and removals of expired Sales, go through B-tree indexes; so their cost grows
+    with the amount of matching Sales, not with the size of the market. Writes only touch the affected rows, and the
+    database runs in write-ahead logging mode: readers don't block the writer, and commits don't need a full fsync of
+    the database file.
+
+    The connection is shared across threads, guarded by a lock.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")  # durable enough under WAL, at a fraction of the cost
+            for statement in _SCHEMA:
+                self._connection.execute(statement)
+
+    def insert(self, sale: Sale) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(_INSERT, self._to_row(sale))
+
+    def insert_many(self, sales: Iterable[Sale]) -> int:
+        with self._lock, self._connection:
+            return self._connection.executemany(_INSERT, (self._to_row(sale) for sale in sales)).rowcount
+
+    def write_batch(self, inserts: Sequence[Sale], removals: Sequence[str]) -> List[int]:
+        with self._lock, self._connection:  # a single transaction
+            self._connection.executemany(_INSERT, (self._to_row(sale) for sale in inserts))
+            return [
+                self._connection.execute("DELETE FROM sale WHERE sale_uid = ?", (sale_uid,)).rowcount
+                for sale_uid in removals
+            ]
+
+    def get_by_sale_uid(self, sale_uid: str) -> Optional[Sale]:
+        rows = self._select("WHERE sale_uid = ?", (sale_uid,))
+        return rows[0] if rows else None
+
+    def get_all(self) -> List[Sale]:
+        return self._select("ORDER BY rowid", ())
+
+    def get_by_item_uids(self, item_uids: Sequence[str]) -> List[Sale]:
+        item_uids = list(dict.fromkeys(item_uids))  # no duplicates, so that no Sale is returned twice
+
+        # (rowid, Sale) pairs, so that Sales of every chunk of Items can be merged back into insertion order
+        results: List[Tuple[int, Sale]] = list()
+        for i in range(0, len(item_uids), MAX_PARAMETERS):
+            chunk = item_uids[i : i + MAX_PARAMETERS]
+            with self._lock:
+                cursor = self._connection.execute(
+                    "SELECT rowid, {} FROM sale WHERE item_uid IN ({})".format(
+                        ", ".join(COLUMNS), ", ".join("?" * len(chunk))
+                    ),
+                    chunk,
+                )
+                results.extend((row[0], Sale(*row[1:])) for row in cursor.fetchall())
+
+        results.sort(key=lambda result: result[0])
+        return [sale for _, sale in results]
+
+    def remove_by_sale_uid(self, sale_uid: str) -> int:
+        with self._lock, self._connection:
+            return self._connection.execute("DELETE FROM sale WHERE sale_uid = ?", (sale_uid,)).rowcount
+
+    def remove_expired(self, timestamp: float) -> int:
+        with self._lock, self._connection:
+            return self._connection.execute("DELETE FROM sale WHERE to_date_timestamp < ?", (timestamp,)).rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM sale").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _select(self, clause: str, parameters: Sequence) -> List[Sale]:
+        with self._lock:
+            rows = self._connection.execute("{} {}".format(_SELECT, clause), parameters).fetchall()
+        return [Sale(*row) for row in rows]
+
+    @staticmethod
+    def _to_row(sale: Sale) -> Tuple:
+        return (
+            sale.item_uid,
+            sale.quantity,
+            sale.price,
+            sale.seller,
+            sale.seller_discord_id,
+            sale.from_date_timestamp,
+            sale.to_date_timestamp,
+            sale.sale_uid,
+        )
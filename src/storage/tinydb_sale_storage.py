@@ -0,0 +1,77 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from tinydb import Query, TinyDB
+
+from src.entity.sale import Sale
+from src.storage.sale_storage import SaleStorage
+
+
+class TinyDBSaleStorage(SaleStorage):
+    """
+    Stores Sales as documents of a TinyDB JSON file.
+
+    Simple and human-readable, but every write rewrites the whole file and every lookup deserializes and scans all of
+    the documents. Fine for small markets; see SQLiteSaleStorage for large ones.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._db = TinyDB(path)
+
+    def insert(self, sale: Sale) -> None:
+        self._db.insert(sale.to_dict())
+
+    def insert_many(self, sales: Iterable[Sale]) -> int:
+        return len(self._db.insert_multiple(sale.to_dict() for sale in sales))
+
+    def write_batch(self, inserts: Sequence[Sale], removals: Sequence[str]) -> List[int]:
+        # TinyDB rewrites the whole file on every write: one for all the inserts, and one for all the removals
+        if inserts:
+            self._db.insert_multiple(sale.to_dict() for sale in inserts)
+        if not removals:
+            return list()
+
+        sale = Query()
+        documents = self._db.search(sale["_sale_uid"].one_of(list(removals)))
+        if documents:
+            self._db.remove(doc_ids=[document.doc_id for document in documents])
+
+        existing = {document["_sale_uid"] for document in documents}
+        removed: List[int] = list()
+        for sale_uid in removals:
+            removed.append(1 if sale_uid in existing else 0)
+            existing.discard(sale_uid)  # a Sale removed twice in the same batch is only removed once
+        return removed
+
+    def get_by_sale_uid(self, sale_uid: str) -> Optional[Sale]:
+        sale = Query()
+        result = self._db.get(sale["_sale_uid"] == sale_uid)
+
+        if not result:
+            return None
+        else:
+            return Sale.from_dict(result)
+
+    def get_all(self) -> List[Sale]:
+        return self._parse_entities(self._db.all())
+
+    def get_by_item_uids(self, item_uids: Sequence[str]) -> List[Sale]:
+        sale = Query()
+        return self._parse_entities(self._db.search(sale["_item_uid"].one_of(list(item_uids))))
+
+    def remove_by_sale_uid(self, sale_uid: str) -> int:
+        sale = Query()
+        return len(self._db.remove(sale["_sale_uid"] == sale_uid))
+
+    def remove_expired(self, timestamp: float) -> int:
+        sale = Query()
+        return len(self._db.remove(sale["_to_date_timestamp"] < timestamp))
+
+    def count(self) -> int:
+        return len(self._db)
+
+    def close(self) -> None:
+        self._db.close()
+
+    @staticmethod
+    def _parse_entities(entities: List[Dict]) -> List[Sale]:
+        return list(map(lambda x: Sale.from_dict(x), entities))
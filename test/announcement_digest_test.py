@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+
+from src.outbound.announcement_digest import AnnouncementDigest
+
+INTERVAL = 0.05
+
+
+class TestAnnouncementDigest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sent = list()
+        self.now = 0.0
+
+    def digest(self, interval=INTERVAL, max_size=10, max_length=2000):
+        return AnnouncementDigest(
+            lambda channel, message: self.sent.append((channel, message)),
+            interval=interval,
+            max_size=max_size,
+            max_length=max_length,
+            clock=lambda: self.now,
+        )
+
+    async def test_flushes_after_the_interval(self):
+        digest = self.digest()
+        digest.announce("channel", "sale 1")
+        digest.announce("channel", "sale 2")
+        digest.announce("another channel", "sale 3")
+
+        self.assertEqual([], self.sent)
+        self.assertEqual(3, digest.pending)
+        await asyncio.sleep(INTERVAL * 2)
+
+        self.assertEqual([("channel", "sale 1\nsale 2"), ("another channel", "sale 3")], self.sent)
+        self.assertEqual(0, digest.pending)
+
+    async def test_flushes_when_full(self):
+        digest = self.digest(max_size=3)
+        for i in range(7):
+            digest.announce("channel", "sale {}".format(i))
+
+        self.assertEqual([("channel", "sale 0\nsale 1\nsale 2"), ("channel", "sale 3\nsale 4\nsale 5")], self.sent)
+        digest.flush_all()
+        self.assertEqual(("channel", "sale 6"), self.sent[-1])
+
+    async def test_flushes_before_overflowing_a_message(self):
+        digest = self.digest(max_length=15)
+        for i in range(3):
+            digest.announce("channel", "sale {}".format(i))
+        digest.flush_all()
+
+        self.assertEqual([("channel", "sale 0\nsale 1"), ("channel", "sale 2")], self.sent)
+
+    async def test_immediate_mode(self):
+        digest = self.digest(interval=0)
+        digest.announce("channel", "sale 1")
+        digest.announce("channel", "sale 2")
+
+        self.assertEqual([("channel", "sale 1"), ("channel", "sale 2")], self.sent)
+
+    async def test_stats(self):
+        digest = self.digest(max_size=2)
+        digest.announce("channel", "sale 1")
+        self.now = 3
+        digest.announce("channel", "sale 2")
+        digest.announce("channel", "sale 3")
+        self.now = 4
+        digest.flush_all()
+
+        stats = digest.stats
+        self.assertEqual((2, 3, 2), (stats.digests, stats.announcements, stats.max_digest_size))
+        self.assertEqual(1.5, stats.mean_digest_size)
+        self.assertEqual((2.0, 3.0), (stats.mean_flush_latency, stats.max_flush_latency))
+
+    def test_rejects_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            self.digest(interval=-1)
+        with self.assertRaises(ValueError):
+            self.digest(max_size=0)
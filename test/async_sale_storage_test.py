@@ -0,0 +1,157 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from src.entity.sale import Sale
+from src.storage.async_sale_storage import AsyncSaleStorage
+from src.storage.sqlite_sale_storage import SQLiteSaleStorage
+
+# how long a "large" write takes
+WRITE_TIME = 0.5
+# how often the heartbeat ticks, and how late a tick may be for the event loop to count as responsive
+HEARTBEAT = 0.01
+MAX_HEARTBEAT_DELAY = 0.1
+
+
+def sale(item_uid):
+    return Sale(item_uid, 1, 100, "seller#0001", 1234, 1000.0, 2000.0)
+
+
+class RecordingSaleStorage(SQLiteSaleStorage):
+    """SQLiteSaleStorage that records the order of its writes, and whose inserts can be made slow."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.writes = list()
+        self.slow = False
+
+    def insert(self, sale):
+        if self.slow:
+            time.sleep(WRITE_TIME)  # a write of a large market
+        super().insert(sale)
+        self.writes.append(("insert", sale.sale_uid))
+
+    def remove_by_sale_uid(self, sale_uid):
+        self.writes.append(("remove", sale_uid))
+        return super().remove_by_sale_uid(sale_uid)
+
+    def write_batch(self, inserts, removals):
+        if self.slow:
+            time.sleep(WRITE_TIME)
+        self.writes.extend([("insert", s.sale_uid) for s in inserts] + [("remove", uid) for uid in removals])
+        return super().write_batch(inserts, removals)
+
+
+class TestAsyncSaleStorage(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = RecordingSaleStorage(os.path.join(self.directory.name, "sale.sqlite3"))
+        self.async_storage = AsyncSaleStorage(self.storage)
+
+    def tearDown(self):
+        self.async_storage.close()
+        self.storage.close()
+        self.directory.cleanup()
+
+    async def longest_heartbeat_delay(self, work):
+        """Runs the given coroutine while ticking a heartbeat, and returns how late the latest tick was."""
+        done = asyncio.Event()
+        delays = [0.0]
+
+        async def heartbeat():
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(HEARTBEAT)
+                delays.append(time.perf_counter() - start - HEARTBEAT)
+
+        async def run():
+            await work
+            done.set()
+
+        await asyncio.gather(heartbeat(), run())
+        return max(delays)
+
+    async def test_event_loop_stays_responsive_during_a_large_write(self):
+        self.storage.slow = True
+
+        async def write():
+            await self.async_storage.insert(sale("AAAAAAAA"))
+
+        self.assertLess(await self.longest_heartbeat_delay(write()), MAX_HEARTBEAT_DELAY)
+        self.assertEqual(1, self.storage.count())
+
+        async def blocking_write():
+            self.storage.insert(sale("AAAAAAAA"))  # straight from the event loop, as it used to be
+
+        self.assertGreaterEqual(await self.longest_heartbeat_delay(blocking_write()), WRITE_TIME - HEARTBEAT)
+
+    async def test_reads_are_not_stuck_behind_writes(self):
+        existing = sale("AAAAAAAA")
+        self.storage.insert(existing)
+        self.storage.slow = True
+
+        write = asyncio.ensure_future(self.async_storage.insert(sale("BBBBBBBB")))
+        await asyncio.sleep(HEARTBEAT)  # let the write start
+        self.assertEqual(existing.sale_uid, (await self.async_storage.get_by_sale_uid(existing.sale_uid)).sale_uid)
+        self.assertFalse(write.done())
+        await write
+
+    async def test_writes_are_ordered(self):
+        sales = [sale("AAAAAAAA") for _ in range(20)]
+        writes = list()
+        for s in sales:
+            writes.append(self.async_storage.insert(s))
+            writes.append(self.async_storage.remove_by_sale_uid(s.sale_uid))
+
+        results = await asyncio.gather(*writes)
+
+        self.assertEqual([None, 1] * 20, results)
+        self.assertEqual([(op, s.sale_uid) for s in sales for op in ("insert", "remove")], self.storage.writes)
+        self.assertEqual(0, await self.async_storage.count())
+
+    async def test_only_one_coroutine_claims_a_sale(self):
+        contested = sale("AAAAAAAA")
+        self.storage.insert_many([contested])
+
+        claims = await asyncio.gather(*(self.async_storage.claim(contested.sale_uid) for _ in range(100)))
+
+        self.assertEqual([contested.sale_uid], [c.sale_uid for c in claims if c is not None])
+        self.assertEqual([("remove", contested.sale_uid)], self.storage.writes)  # losers didn't even write
+
+
+class TestGroupCommittedAsyncSaleStorage(TestAsyncSaleStorage):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = RecordingSaleStorage(os.path.join(self.directory.name, "sale.sqlite3"))
+        self.async_storage = AsyncSaleStorage(self.storage, group_commit_window=0.01, group_commit_max_batch=100)
+
+    async def test_only_one_coroutine_claims_a_sale(self):
+        contested = sale("AAAAAAAA")
+        self.storage.insert_many([contested])
+
+        claims = await asyncio.gather(*(self.async_storage.claim(contested.sale_uid) for _ in range(100)))
+
+        self.assertEqual([contested.sale_uid], [c.sale_uid for c in claims if c is not None])
+        # losers' removals got batched along with the winner's, where they removed nothing
+        self.assertLess(self.async_storage.group_commit_stats.batches, 10)
+        self.assertEqual(0, self.storage.count())
+
+    async def test_claims_of_different_sales_share_a_write(self):
+        sales = [sale("AAAAAAAA") for _ in range(50)]
+        self.storage.insert_many(sales)
+
+        claims = await asyncio.gather(*(self.async_storage.claim(s.sale_uid) for s in sales for _ in range(4)))
+
+        self.assertEqual(sorted(s.sale_uid for s in sales), sorted(c.sale_uid for c in claims if c is not None))
+        self.assertEqual(0, self.storage.count())
+        self.assertLess(self.async_storage.group_commit_stats.batches, 10)
+
+    async def test_writes_are_ordered(self):
+        sales = [sale("AAAAAAAA") for _ in range(20)]
+        await asyncio.gather(*(self.async_storage.insert(s) for s in sales))
+        await self.async_storage.remove_expired(3000.0)
+        await asyncio.gather(*(self.async_storage.insert(s) for s in sales[:5]))
+
+        self.assertEqual(5, await self.async_storage.count())  # the batch before the expiry was flushed before it
@@ -0,0 +1,97 @@
+import unittest
+
+from src.entity.item import Item
+from src.entity.item_attributes import CLASSES, ItemAttributes
+from src.handler.item import ItemHandler
+from src.index.attribute import AttributeFilter, AttributeIndex, AttributeQuery, parse_query
+
+
+def entry(**attributes):
+    return dict({"nombre": "Whatever", "precio": "1"}, **attributes)
+
+
+class TestItemAttributes(unittest.TestCase):
+    def test_ranges(self):
+        attributes = ItemAttributes.from_item_list_entry(entry(**{"daño": "4 / 9", "def mag": "1 / 1", "def": ""}))
+        self.assertEqual((4, 9), (attributes.min_damage, attributes.max_damage))
+        self.assertEqual((1, 1), (attributes.min_magic_defense, attributes.max_magic_defense))
+        self.assertEqual((None, None), (attributes.min_defense, attributes.max_defense))
+
+    def test_classes(self):
+        def classes(value):
+            return ItemAttributes.from_item_list_entry(entry(**{"clases permitidas": value})).classes
+
+        self.assertIsNone(classes("Todas"))
+        self.assertIsNone(classes("-"))
+        self.assertEqual({"Guerrero", "Ladrón"}, classes("Guerrero y Ladrón"))
+        self.assertEqual({"Clérigo"}, classes("Clerigo"))
+        self.assertEqual(set(CLASSES) - {"Mago", "Bardo"}, classes("Todas menos mago y Bardo"))
+
+    def test_races_and_genders(self):
+        attributes = ItemAttributes.from_item_list_entry(entry(raza="HumanoElfoElfo Oscuro", **{"género": "Mujer"}))
+        self.assertEqual({"Humano", "Elfo", "Elfo Oscuro"}, attributes.races)
+        self.assertEqual({"Mujer"}, attributes.genders)
+        self.assertEqual({"Enano", "Gnomo"}, ItemAttributes.from_item_list_entry(entry(raza="Enano Gnomo")).races)
+        self.assertIsNone(ItemAttributes.from_item_list_entry(entry(**{"género": "Ambos"})).genders)
+
+    def test_malformed(self):
+        self.assertRaises(ValueError, ItemAttributes.from_item_list_entry, entry(**{"daño": "mucho"}))
+        self.assertRaises(ValueError, ItemAttributes.from_item_list_entry, entry(raza="Orco"))
+
+
+class TestAttributeIndex(unittest.TestCase):
+    def setUp(self):
+        self.dagger, self.axe, self.armor, self.apple = [
+            Item("Daga", 100, attributes=ItemAttributes(min_damage=2, max_damage=5)),
+            Item(
+                "Hacha", 300, attributes=ItemAttributes(min_damage=4, max_damage=12, classes=frozenset(["Trabajador"]))
+            ),
+            Item("Túnica", 200, attributes=ItemAttributes(min_defense=1, max_defense=3, genders=frozenset(["Mujer"]))),
+            Item("Manzana", 2, attributes=ItemAttributes(hunger=10)),
+        ]
+        self.index = AttributeIndex([self.dagger, self.axe, self.armor, self.apple])
+
+    def query(self, *expressions, k=None):
+        return self.index.query(parse_query(expressions), k=k)
+
+    def test_numeric_filters(self):
+        self.assertEqual([self.axe], self.query("daño_max>=10"))
+        self.assertEqual([self.axe], self.query("dano_max>5"))
+        self.assertEqual([self.dagger], self.query("damage_max<=5"))
+        self.assertEqual([self.dagger, self.armor], self.query("precio>=100", "precio<300"))
+        self.assertEqual([self.dagger, self.axe, self.apple], self.query("precio!=200"))
+        self.assertEqual([self.apple], self.query("hambre=10"))
+
+    def test_restriction_filters(self):
+        self.assertEqual([self.dagger, self.armor, self.apple], self.query("clase=Mago"))
+        self.assertEqual([self.dagger, self.axe, self.apple], self.query("genero=Hombre"))
+        self.assertEqual([self.dagger, self.axe, self.armor, self.apple], self.query("raza=elfo_oscuro"))
+
+    def test_sorting(self):
+        self.assertEqual([self.apple, self.dagger, self.armor, self.axe], self.query("orden=precio"))
+        self.assertEqual([self.axe, self.armor], self.query("orden=-precio", k=2))
+        # items lacking the attribute always come last
+        self.assertEqual([self.axe, self.dagger, self.armor, self.apple], self.query("orden=-daño_max"))
+        self.assertEqual([self.dagger, self.axe, self.armor, self.apple], self.query("orden=daño_min"))
+
+    def test_parse_query(self):
+        self.assertEqual(
+            AttributeQuery(
+                (AttributeFilter("class", "=", "Ladrón"), AttributeFilter("max_damage", ">=", 10.0)), "base_price"
+            ),
+            parse_query(["clase=ladron", "daño_max >= 10", "orden=precio"]),
+        )
+        for expression in ["clase>Mago", "clase=Orco", "color=rojo", "precio=barato", "orden=clase", "precio"]:
+            self.assertRaises(ValueError, parse_query, [expression])
+
+
+class TestItemHandlerFilter(unittest.TestCase):
+    def test_filter_items(self):
+        results = ItemHandler().filter_items(parse_query(["clase=Trabajador", "daño_max>=10", "orden=precio"]), k=None)
+
+        self.assertTrue(results)
+        prices = [item.base_price for item in results]
+        self.assertEqual(sorted(prices), prices)
+        for item in results:
+            self.assertGreaterEqual(item.attributes.max_damage, 10)
+            self.assertTrue(item.attributes.classes is None or "Trabajador" in item.attributes.classes)
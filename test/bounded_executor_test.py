@@ -0,0 +1,68 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from src.aux.bounded_executor import BoundedExecutor
+from src.handler.async_item import _load_catalog, _ranked_search
+from src.handler.item import FUZZY_CUTOFF, ItemHandler
+
+# how long a "slow" piece of work takes
+WORK_TIME = 0.2
+
+
+class TestBoundedExecutor(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.executor = BoundedExecutor(ThreadPoolExecutor(max_workers=4), max_pending=2, timeout=WORK_TIME / 2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    async def test_runs_off_the_event_loop(self):
+        self.assertNotEqual(threading.get_ident(), await self.executor.run(threading.get_ident))
+
+    async def test_times_out(self):
+        start = time.perf_counter()
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.executor.run(time.sleep, WORK_TIME)
+
+        self.assertLess(time.perf_counter() - start, WORK_TIME)
+        self.assertEqual(1, self.executor.pending)  # still running: its slot is still taken
+        await asyncio.sleep(WORK_TIME)
+        self.assertEqual(0, self.executor.pending)
+
+    async def test_bounds_pending_work(self):
+        slow = [asyncio.ensure_future(self.executor.run(time.sleep, WORK_TIME)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        # both slots are taken by (timed out) slow work: further work waits for one until timing out itself
+        ran = list()
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.executor.run(ran.append, "too late")
+        self.assertEqual([], ran)
+
+        await asyncio.gather(*slow, return_exceptions=True)
+        await asyncio.sleep(WORK_TIME)
+        await self.executor.run(ran.append, "on time")
+        self.assertEqual(["on time"], ran)
+
+    def test_rejects_invalid_bounds(self):
+        with self.assertRaises(ValueError):
+            BoundedExecutor(ThreadPoolExecutor(), max_pending=0, timeout=1)
+        with self.assertRaises(ValueError):
+            BoundedExecutor(ThreadPoolExecutor(), max_pending=1, timeout=0)
+
+
+class TestProcessPoolSearch(unittest.IsolatedAsyncioTestCase):
+    async def test_worker_processes_search_like_the_item_handler(self):
+        pool = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn"), initializer=_load_catalog)
+        executor = BoundedExecutor(pool, max_pending=4, timeout=60)  # generous: includes spawning the worker
+        try:
+            for query in ("Espada Larga", "espda larg", "manzana"):
+                expected = ItemHandler().uncached_ranked_search(query, 10, FUZZY_CUTOFF)
+                matches = await executor.run(_ranked_search, query, 10, FUZZY_CUTOFF)
+                self.assertEqual([(m.item.uid, m.score) for m in expected], matches)
+        finally:
+            executor.shutdown()
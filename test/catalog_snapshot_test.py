@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.entity.item import Item
+from src.entity.item_attributes import ItemAttributes
+from src.index.snapshot import CatalogSnapshot
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.directory.name, "items.json")
+        self.snapshot = CatalogSnapshot(self.source_path, os.path.join(self.directory.name, "items.snapshot"))
+        self.write_source(["Manzana Roja", "Árbol"])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_source(self, names):
+        with open(self.source_path, "w") as source_file:
+            json.dump([{"nombre": name, "precio": "1", "daño": "1 / 3"} for name in names], source_file)
+
+    def build(self):
+        with open(self.source_path) as source_file:
+            return [
+                Item(i["nombre"], int(i["precio"]), attributes=ItemAttributes.from_item_list_entry(i))
+                for i in json.load(source_file)
+            ]
+
+    def test_compiles_and_then_reuses_snapshot(self):
+        built, from_snapshot = self.snapshot.load(self.build)
+        self.assertFalse(from_snapshot)
+
+        loaded, from_snapshot = self.snapshot.load(self.build)
+        self.assertTrue(from_snapshot)
+        self.assertEqual(
+            [(item.name, item.uid, item.sanitized_name, item.base_price, item.attributes) for item in built],
+            [(item.name, item.uid, item.sanitized_name, item.base_price, item.attributes) for item in loaded],
+        )
+
+    def test_recompiles_when_source_changes(self):
+        self.snapshot.load(self.build)
+        self.write_source(["Manzana Roja", "Árbol", "Daga"])
+
+        items, from_snapshot = self.snapshot.load(self.build)
+        self.assertFalse(from_snapshot)
+        self.assertEqual(3, len(items))
+
+    def test_recompiles_corrupt_snapshot(self):
+        with open(os.path.join(self.directory.name, "items.snapshot"), "wb") as snapshot_file:
+            snapshot_file.write(b"garbage")
+
+        items, from_snapshot = self.snapshot.load(self.build)
+        self.assertFalse(from_snapshot)
+        self.assertEqual(2, len(items))
@@ -0,0 +1,124 @@
+import asyncio
+import time
+import unittest
+
+from src.outbound.dispatcher import OutboundDispatcher, RateLimited
+
+# how long the fake sender takes to deliver a message, and tells to retry after on a 429
+SEND_TIME = 0.05
+RETRY_AFTER = 0.05
+
+
+class FakeSender:
+    """Delivers messages offline, after a while; and answers 429 to the first `limited` messages to each destination."""
+
+    def __init__(self, limited=0, is_global=False):
+        self.delivered = list()
+        self.attempts = 0
+        self.limited = limited
+        self.is_global = is_global
+        self.refusals = dict()
+
+    async def __call__(self, destination, content):
+        self.attempts += 1
+        await asyncio.sleep(SEND_TIME)
+        if self.refusals.get(destination, 0) < self.limited:
+            self.refusals[destination] = self.refusals.get(destination, 0) + 1
+            raise RateLimited(RETRY_AFTER, is_global=self.is_global)
+        self.delivered.append((destination, content))
+
+
+class TestOutboundDispatcher(unittest.IsolatedAsyncioTestCase):
+    def dispatcher(self, sender, **limits):
+        return OutboundDispatcher(sender, **{"destination_rate": 1000, "destination_burst": 1000, **limits})
+
+    async def test_sending_returns_right_away(self):
+        sender = FakeSender()
+        dispatcher = self.dispatcher(sender)
+
+        delivery = dispatcher.send("user", "hello")
+
+        self.assertFalse(delivery.done())
+        self.assertEqual(1, dispatcher.pending)
+        await delivery
+        self.assertEqual([("user", "hello")], sender.delivered)
+        self.assertEqual(0, dispatcher.pending)
+
+    async def test_merges_adjacent_messages_in_order(self):
+        sender = FakeSender()
+        dispatcher = self.dispatcher(sender, max_length=20)
+
+        deliveries = [dispatcher.send("user", "message {}".format(i)) for i in range(5)]
+        await asyncio.gather(*deliveries)
+
+        self.assertEqual(
+            [("user", "message 0\nmessage 1"), ("user", "message 2\nmessage 3"), ("user", "message 4")],
+            sender.delivered,
+        )
+
+    async def test_sends_to_different_destinations_concurrently(self):
+        sender = FakeSender()
+        dispatcher = self.dispatcher(sender)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(dispatcher.send("user {}".format(i), "hello") for i in range(10)))
+
+        self.assertLess(time.perf_counter() - start, SEND_TIME * 3)
+        self.assertEqual(10, len(sender.delivered))
+
+    async def test_paces_messages_to_a_destination(self):
+        sender = FakeSender()
+        dispatcher = self.dispatcher(sender, destination_rate=20, destination_burst=1, max_length=10)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(dispatcher.send("user", "message {}".format(i)) for i in range(5)))
+
+        self.assertGreaterEqual(time.perf_counter() - start, 4 / 20)  # 1 at once, 4 one every 1/20 seconds
+        self.assertEqual(["message {}".format(i) for i in range(5)], [content for _, content in sender.delivered])
+
+    async def test_retries_when_rate_limited(self):
+        sender = FakeSender(limited=2)
+        dispatcher = self.dispatcher(sender)
+
+        start = time.perf_counter()
+        await dispatcher.send("user", "hello")
+
+        self.assertGreaterEqual(time.perf_counter() - start, 2 * RETRY_AFTER)
+        self.assertEqual(3, sender.attempts)
+        self.assertEqual([("user", "hello")], sender.delivered)
+
+    async def test_global_rate_limit_holds_back_every_destination(self):
+        sender = FakeSender(limited=1, is_global=True)
+        dispatcher = self.dispatcher(sender)
+
+        await asyncio.gather(dispatcher.send("user", "hello"), dispatcher.send("another user", "hello"))
+
+        self.assertEqual(4, sender.attempts)
+        self.assertEqual(2, len(sender.delivered))
+
+    async def test_gives_up_after_max_attempts(self):
+        sender = FakeSender(limited=10)
+        dispatcher = self.dispatcher(sender, max_attempts=3)
+
+        delivery = dispatcher.send("user", "hello")
+        following = dispatcher.send("user", "x" * 2000)  # too long to be merged: sent on its own
+
+        with self.assertRaises(RateLimited):
+            await delivery
+        with self.assertRaises(RateLimited):
+            await following
+        self.assertEqual(6, sender.attempts)
+        self.assertEqual([], sender.delivered)
+
+    async def test_failures_do_not_stop_the_queue(self):
+        async def sender(destination, content):
+            if content == "fail":
+                raise IOError("Cannot send messages to this user")
+
+        dispatcher = self.dispatcher(sender, max_length=4)
+        failed = dispatcher.send("user", "fail")
+        delivered = dispatcher.send("user", "ok")
+        await dispatcher.drain()
+
+        self.assertIsInstance(failed.exception(), IOError)
+        self.assertIsNone(delivered.result())
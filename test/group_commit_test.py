@@ -0,0 +1,96 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from src.entity.sale import Sale
+from src.storage.group_commit import GroupCommitter
+from src.storage.sqlite_sale_storage import SQLiteSaleStorage
+
+
+def sale(item_uid):
+    return Sale(item_uid, 1, 100, "seller#0001", 1234, 1000.0, 2000.0)
+
+
+class BatchRecordingSaleStorage(SQLiteSaleStorage):
+    """SQLiteSaleStorage that records every batch written to it, and can be made to fail or to hold writes back."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.batches = list()
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def write_batch(self, inserts, removals):
+        self.release.wait()
+        if self.fail:
+            raise OSError("disk full")
+        self.batches.append((list(inserts), list(removals)))
+        return super().write_batch(inserts, removals)
+
+
+class TestGroupCommitter(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = BatchRecordingSaleStorage(os.path.join(self.directory.name, "sale.sqlite3"))
+
+    def tearDown(self):
+        self.storage.close()
+        self.directory.cleanup()
+
+    def build_committer(self, window=0.05, max_batch=100):
+        committer = GroupCommitter(self.storage, window=window, max_batch=max_batch)
+        self.addCleanup(committer.close)
+        return committer
+
+    async def test_concurrent_writes_share_a_single_write(self):
+        committer = self.build_committer()
+        existing = sale("AAAAAAAA")
+        self.storage.insert(existing)
+
+        sales = [sale("BBBBBBBB") for _ in range(10)]
+        results = await asyncio.gather(
+            *(committer.insert(s) for s in sales),
+            committer.remove_by_sale_uid(existing.sale_uid),
+            committer.remove_by_sale_uid("nope"),
+        )
+
+        self.assertEqual([None] * 10 + [1, 0], results)
+        self.assertEqual(1, len(self.storage.batches))
+        self.assertEqual(10, self.storage.count())
+
+        stats = committer.stats
+        self.assertEqual((1, 12, 12), (stats.batches, stats.operations, stats.max_batch_size))
+        self.assertEqual(12, stats.mean_batch_size)
+        self.assertGreater(stats.max_flush_latency, 0)
+
+    async def test_full_batches_are_flushed_without_waiting(self):
+        committer = self.build_committer(window=60, max_batch=5)
+
+        await asyncio.wait_for(asyncio.gather(*(committer.insert(sale("AAAAAAAA")) for _ in range(10))), timeout=5)
+        self.assertEqual([5, 5], [len(inserts) for inserts, _ in self.storage.batches])
+
+    async def test_writes_only_return_once_written(self):
+        committer = self.build_committer(window=0)
+        self.storage.release.clear()
+
+        insert = asyncio.ensure_future(committer.insert(sale("AAAAAAAA")))
+        await asyncio.sleep(0.05)
+        self.assertFalse(insert.done())
+        self.assertEqual(0, self.storage.count())
+
+        self.storage.release.set()
+        await insert
+        self.assertEqual(1, self.storage.count())
+
+    async def test_failed_writes_fail_every_command_of_the_batch(self):
+        committer = self.build_committer()
+        self.storage.fail = True
+
+        results = await asyncio.gather(
+            committer.insert(sale("AAAAAAAA")), committer.remove_by_sale_uid("nope"), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(result, OSError) for result in results))
+        self.assertEqual(0, committer.stats.batches)
@@ -0,0 +1,94 @@
+import unittest
+
+from src.entity.item import UID_PREFIX, Item
+from src.handler.item import ItemHandler
+from src.index.catalog import ItemCatalog
+
+
+class TestItemCatalog(unittest.TestCase):
+    def test_lookups(self):
+        apple = Item("Manzana Roja", 2)
+        catalog = ItemCatalog([apple, Item("Daga de Plata", 100)])
+
+        self.assertEqual(2, len(catalog))
+        self.assertIs(apple, catalog.get_by_uid(apple.uid))
+        self.assertIs(apple, catalog.get_by_sanitized_name("manzana roja"))
+        self.assertIn(apple.uid, catalog)
+        self.assertIsNone(catalog.get_by_uid("00000000"))
+        self.assertIsNone(catalog.get_by_sanitized_name("manzana"))
+
+    def test_sanitized_name_is_precomputed(self):
+        self.assertEqual("arbol", Item("Árbol", 1).sanitized_name)
+
+
+class TestItemHandler(unittest.TestCase):
+    def setUp(self):
+        self.item_handler = ItemHandler()
+        self.item = self.item_handler.search("Espada Larga").pop()
+
+    def test_uid_search(self):
+        self.assertIs(self.item, self.item_handler.uid_search(self.item.uid))
+        self.assertIs(self.item, self.item_handler.uid_search(UID_PREFIX + self.item.uid))
+        self.assertIsNone(self.item_handler.uid_search("not an uid"))
+
+    def test_is_uid(self):
+        self.assertTrue(self.item_handler.is_uid(self.item.uid))
+        self.assertTrue(self.item_handler.is_uid(UID_PREFIX + "whatever"))
+        self.assertFalse(self.item_handler.is_uid("Espada Larga"))
+        self.assertEqual(self.item.uid, self.item_handler.sanitize_uid(UID_PREFIX + self.item.uid))
+        self.assertIsNone(self.item_handler.sanitize_uid("Espada Larga"))
+
+    def test_exact_search_is_case_and_accent_insensitive(self):
+        self.assertEqual({self.item}, self.item_handler.search("ESPADA LÁRGA"))
+
+    def test_fuzzy_search(self):
+        self.assertIn(self.item, self.item_handler.search("espada"))
+
+    def test_substring_matches_rank_above_fuzzy_ones(self):
+        names = [match.item.sanitized_name for match in self.item_handler.ranked_search("arco")]
+
+        self.assertIn("barca", names)  # a close fuzzy match, which scores better than any "arco ..." item
+        contains = ["arco" in name for name in names]
+        self.assertEqual(sorted(contains, reverse=True), contains)
+
+    def test_search_cache(self):
+        items = list(self.item_handler.catalog.items)
+        self.item_handler._index(items)  # start from a clean cache
+
+        self.assertFalse(self.item_handler.is_search_cached("POCIÓN roja"))
+        first = self.item_handler.ranked_search("POCIÓN roja")
+        self.assertTrue(self.item_handler.is_search_cached("pocion roja"))
+
+        hits = self.item_handler.search_cache_stats.hits
+        self.assertEqual(first, self.item_handler.ranked_search("pocion roja"))
+        self.assertEqual(hits + 1, self.item_handler.search_cache_stats.hits)
+
+        self.item_handler._index(items)  # catalog changes invalidate the cache
+        self.assertFalse(self.item_handler.is_search_cached("pocion roja"))
+
+    def test_search_many(self):
+        queries = ["Espada Larga", "espada larg", "nothing like it"]
+        results = self.item_handler.search_many(queries)
+
+        self.assertEqual(len(queries), len(results))
+        self.assertEqual(self.item_handler.ranked_search(queries[0]), results[0])
+        self.assertIs(self.item, results[1][0].item)
+        self.assertEqual([], results[2])
+
+    def test_search_many_matches_ranked_search(self):
+        queries = [
+            "espda larga",
+            "pocion",
+            "arco",
+            "daga de plata",
+            "armadra de cuero",
+            "espadda",
+            "manzna roja",
+            "xyz",
+        ]
+
+        self.assertEqual([self.item_handler.ranked_search(q) for q in queries], self.item_handler.search_many(queries))
+        self.assertEqual(
+            [self.item_handler.ranked_search(q, k=None) for q in queries],
+            self.item_handler.search_many(queries, k=None),
+        )
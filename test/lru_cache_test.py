@@ -0,0 +1,48 @@
+import unittest
+
+from src.aux.lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache: LRUCache[str, int] = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.put("c", 3)
+
+        self.assertEqual(1, cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(3, cache.get("c"))
+
+    def test_stats(self):
+        cache: LRUCache[str, int] = LRUCache(1)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+        cache.put("b", 2)
+        self.assertIn("b", cache)  # membership checks are not lookups
+
+        stats = cache.stats
+        self.assertEqual((1, 1, 1, 1, 1), tuple(stats))
+        self.assertEqual(0.5, stats.hit_rate)
+
+    def test_clear(self):
+        cache: LRUCache[str, int] = LRUCache(2)
+        cache.put("a", 1)
+        cache.clear()
+
+        self.assertEqual(0, len(cache))
+        self.assertIsNone(cache.get("a"))
+
+    def test_pop(self):
+        cache: LRUCache[str, int] = LRUCache(2)
+        cache.put("a", 1)
+
+        self.assertEqual(1, cache.pop("a"))
+        self.assertIsNone(cache.pop("a"))
+        self.assertEqual((0, 0), (cache.stats.hits, cache.stats.misses))  # pops are not lookups
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
@@ -0,0 +1,51 @@
+import unittest
+
+from src.entity.item import Item
+from src.index.ngram import NGramIndex
+
+
+class TestNGramIndex(unittest.TestCase):
+    def setUp(self):
+        self.items = [Item(name, 1) for name in ["Daga", "Daga de Plata", "Espada Larga", "Arco Simple", "Pocion Roja"]]
+        self.index = NGramIndex(self.items)
+
+    def test_ngrams_are_padded(self):
+        self.assertEqual({" da", "dag", "aga", "ga "}, self.index.ngrams("daga"))
+
+    def test_substring_search(self):
+        self.assertEqual(self.items[:2], self.index.substring_search("daga"))
+        self.assertEqual([self.items[3]], self.index.substring_search("rc"))
+        self.assertEqual([], self.index.substring_search("hacha"))
+
+    def test_substring_search_with_repeated_ngrams(self):
+        ananana = Item("Anillo de Ananana", 1)
+        index = NGramIndex(self.items + [ananana])
+
+        # 'ana' and 'nan' repeat: the query has 5 unpadded trigrams, but only 2 distinct ones
+        self.assertEqual([ananana], index.substring_search("ananana"))
+        self.assertEqual([ananana], [item for item, _ in index.search_many(["ananana"], cutoff=1.0)[0]])
+
+    def test_search_ranks_best_first(self):
+        results = self.index.search("dagga", k=2)
+
+        self.assertEqual(self.items[:2], [item for item, _ in results])
+        self.assertGreater(results[0][1], results[1][1])
+        self.assertEqual(1.0, self.index.search("espada larga", k=1)[0][1])
+
+    def test_search_ignores_unrelated_items(self):
+        self.assertNotIn(self.items[4], [item for item, _ in self.index.search("daga")])
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            NGramIndex(self.items, n=0)
+
+    def test_search_many_matches_search(self):
+        queries = ["dagga", "espada larga", "arco", "pocion azl", "zzzz"]
+
+        self.assertEqual([self.index.search(q, k=3) for q in queries], self.index.search_many(queries, k=3))
+        self.assertEqual([self.index.search(q) for q in queries], self.index.search_many(queries))
+
+    def test_search_many_cutoff_spares_substrings(self):
+        [results] = self.index.search_many(["daga"], cutoff=0.9)
+
+        self.assertEqual(self.items[:2], [item for item, _ in results])
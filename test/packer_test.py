@@ -0,0 +1,74 @@
+import unittest
+
+from src.outbound.packer import (
+    EMBED_FIELD_MAX_LENGTH,
+    EMBED_FIELD_NAME,
+    EMBED_MAX_FIELDS,
+    EMBED_MAX_LENGTH,
+    pack_embeds,
+    pack_lines,
+)
+
+
+def lines(amount, length):
+    return ["{:0{}d}".format(i, length) for i in range(amount)]
+
+
+class TestPackLines(unittest.TestCase):
+    def test_packs_whole_lines_in_order(self):
+        messages = list(pack_lines(lines(10, 9), max_length=20))
+
+        self.assertEqual(5, len(messages))
+        self.assertEqual(lines(10, 9), "\n".join(messages).split("\n"))
+        self.assertTrue(all(len(m) <= 20 for m in messages))
+
+    def test_never_splits_a_line(self):
+        messages = list(pack_lines(["a" * 15, "b" * 15, "c" * 3], max_length=20))
+
+        self.assertEqual(["a" * 15, "b" * 15 + "\n" + "c" * 3], messages)
+
+    def test_splits_lines_longer_than_a_message(self):
+        messages = list(pack_lines(["short", "word " * 10], max_length=20))
+
+        self.assertTrue(all(len(m) <= 20 for m in messages))
+        self.assertEqual("short", messages[0].split("\n")[0])
+        self.assertEqual(("word " * 10).split(), " ".join(messages[1:] + messages[0].split("\n")[1:]).split())
+
+    def test_takes_lines_lazily(self):
+        taken = list()
+
+        def generate():
+            for line in lines(100, 9):
+                taken.append(line)
+                yield line
+
+        first = next(pack_lines(generate(), max_length=20))
+
+        self.assertEqual(2, len(first.split("\n")))
+        self.assertEqual(3, len(taken))  # the one that didn't fit, and no more
+
+    def test_drops_blank_messages(self):
+        self.assertEqual([], list(pack_lines([])))
+        self.assertEqual([], list(pack_lines(["", " "])))
+
+
+class TestPackEmbeds(unittest.TestCase):
+    def test_fills_fields_and_embeds(self):
+        embeds = list(pack_embeds(lines(1000, 99)))
+
+        for fields in embeds:
+            self.assertLessEqual(len(fields), EMBED_MAX_FIELDS)
+            self.assertTrue(all(len(f) <= EMBED_FIELD_MAX_LENGTH for f in fields))
+            self.assertLessEqual(sum(len(EMBED_FIELD_NAME) + len(f) for f in fields), EMBED_MAX_LENGTH)
+        self.assertEqual(lines(1000, 99), "\n".join("\n".join(fields) for fields in embeds).split("\n"))
+        # 100 characters a line, newline or field name included: 60 lines (6000 characters) an embed
+        self.assertEqual(17, len(embeds))
+
+    def test_fields_are_bounded(self):
+        self.assertEqual([[199]], [[len(f) for f in fields] for fields in pack_embeds(["x"] * 100)])  # share a field
+
+        embeds = list(pack_embeds(["x" * EMBED_FIELD_MAX_LENGTH for _ in range(30)]))
+        self.assertEqual([5] * 6, [len(fields) for fields in embeds])  # bounded by total length
+
+        embeds = list(pack_embeds(["x" * 600 for _ in range(20)]))
+        self.assertEqual([9, 9, 2], [len(fields) for fields in embeds])  # a field each, as two don't fit in one
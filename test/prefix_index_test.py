@@ -0,0 +1,39 @@
+import unittest
+
+from src.entity.item import Item
+from src.handler.item import ItemHandler
+from src.index.prefix import PrefixIndex
+
+
+class TestPrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.daga, self.daga_de_plata, self.arco, self.plato = [
+            Item(name, 1) for name in ["Daga", "Daga de Plata", "Arco Simple", "Plato"]
+        ]
+        self.index = PrefixIndex([self.daga, self.daga_de_plata, self.arco, self.plato])
+
+    def test_name_prefix(self):
+        self.assertEqual([self.daga, self.daga_de_plata], self.index.complete("dag"))
+
+    def test_word_prefix(self):
+        self.assertEqual([self.daga_de_plata, self.plato], self.index.complete("plat"))
+        self.assertEqual([self.arco], self.index.complete("simple"))
+
+    def test_items_show_up_once(self):
+        self.assertEqual([self.daga_de_plata], self.index.complete("d", k=None)[1:2])
+        self.assertEqual(2, len(self.index.complete("d")))
+
+    def test_limit(self):
+        self.assertEqual([self.daga], self.index.complete("dag", k=1))
+        self.assertEqual([], self.index.complete("dag", k=0))
+
+    def test_no_match(self):
+        self.assertEqual([], self.index.complete("hacha"))
+        self.assertEqual([], self.index.complete(""))
+
+
+class TestItemHandlerComplete(unittest.TestCase):
+    def test_complete_is_case_and_accent_insensitive(self):
+        results = ItemHandler().complete("POCIÓN a", k=None)
+
+        self.assertEqual(["Poción Amarilla", "Poción Azul"], [x.name for x in results])
@@ -0,0 +1,52 @@
+import difflib
+import unittest
+
+from src.entity.item import Item
+from src.handler.item import ItemHandler
+from src.index.ranking import ScoredItem, rank
+
+
+class TestRank(unittest.TestCase):
+    def setUp(self):
+        self.items = list(ItemHandler().catalog.items)
+
+    def brute_force(self, query, k, cutoff):
+        scored = [
+            (difflib.SequenceMatcher(None, item.sanitized_name, query).ratio(), -position, item)  # as get_close_matches
+            for position, item in enumerate(self.items)
+        ]
+        return [ScoredItem(item, score) for score, _, item in sorted(scored, reverse=True) if score >= cutoff][:k]
+
+    def test_pruned_ranking_matches_brute_force(self):
+        for query in ["espada larga", "pocion azl", "daga", "armadura de placas", "x"]:
+            with self.subTest(query=query):
+                self.assertEqual(self.brute_force(query, 10, 0.3), rank(query, self.items, k=10, cutoff=0.3))
+
+    def test_unbounded_ranking(self):
+        self.assertEqual(self.brute_force("daga", None, 0.6), rank("daga", self.items, k=None, cutoff=0.6))
+
+    def test_ties_are_broken_by_candidate_order(self):
+        first, second = Item("Daga Roja", 1), Item("Daga Azul", 1)
+
+        self.assertEqual([first, second], [match.item for match in rank("daga", [first, second], k=2, cutoff=0)])
+        self.assertEqual([second], [match.item for match in rank("daga", [second, first], k=1, cutoff=0)])
+
+    def test_unconditional_candidates_skip_cutoff(self):
+        item = Item("Daga de Plata Reforzada", 1)
+
+        self.assertEqual([], rank("daga", [item], k=5, cutoff=0.6))
+        self.assertEqual([item], [match.item for match in rank("daga", [item], k=5, cutoff=0.6, unconditional={item})])
+
+    def test_empty_heap(self):
+        self.assertEqual([], rank("daga", self.items, k=0, cutoff=0))
+
+
+class TestRankedSearch(unittest.TestCase):
+    def test_best_match_first(self):
+        results = ItemHandler().ranked_search("espada larg", k=3)
+
+        self.assertEqual("Espada Larga", results[0].item.name)
+        self.assertEqual(sorted(results, key=lambda x: x.score, reverse=True), results)
+
+    def test_results_are_deterministic(self):
+        self.assertEqual(ItemHandler().ranked_search("pocion"), ItemHandler().ranked_search("pocion"))
@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+
+from src.aux.resource_pool import ResourcePool
+
+IDLE_TIMEOUT = 60
+
+
+class FakeResources:
+    """Opens and closes fake resources, keeping track of them; opening can be held back."""
+
+    def __init__(self):
+        self.opened = list()
+        self.closed = list()
+        self.may_open = asyncio.Event()
+        self.may_open.set()
+        self.may_close = asyncio.Event()
+        self.may_close.set()
+        self.failing = set()
+
+    async def open(self, key):
+        await self.may_open.wait()
+        if key in self.failing:
+            raise IOError("Can't open [{}]".format(key))
+        self.opened.append(key)
+        return "resource-{}".format(key)
+
+    async def close(self, resource):
+        await self.may_close.wait()
+        self.closed.append(resource)
+
+
+class TestResourcePool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.resources = FakeResources()
+        self.pool = ResourcePool(
+            self.resources.open, self.resources.close, idle_timeout=IDLE_TIMEOUT, clock=lambda: self.now
+        )
+
+    async def use(self, key):
+        async with self.pool.use(key) as resource:
+            return resource
+
+    async def test_opens_lazily_and_once(self):
+        self.assertNotIn("a", self.pool)
+
+        self.assertEqual("resource-a", await self.use("a"))
+        self.assertEqual("resource-a", await self.use("a"))
+        self.assertEqual("resource-b", await self.use("b"))
+
+        self.assertEqual(["a", "b"], self.resources.opened)
+        self.assertEqual(2, len(self.pool))
+
+    async def test_concurrent_first_uses_share_the_opening(self):
+        self.resources.may_open.clear()
+        uses = asyncio.gather(*(self.use("a") for _ in range(10)))
+        await asyncio.sleep(0)
+        self.resources.may_open.set()
+
+        self.assertEqual(["resource-a"] * 10, await uses)
+        self.assertEqual(["a"], self.resources.opened)
+
+    async def test_closes_only_idle_resources(self):
+        await self.use("a")
+        self.now = 30
+        await self.use("b")
+
+        self.now = IDLE_TIMEOUT
+        self.assertEqual(["a"], await self.pool.close_idle())
+        self.assertEqual(["resource-a"], self.resources.closed)
+        self.assertNotIn("a", self.pool)
+        self.assertIn("b", self.pool)
+
+        self.assertEqual("resource-a", await self.use("a"))  # reopened on next use
+        self.assertEqual(["a", "b", "a"], self.resources.opened)
+
+    async def test_does_not_close_resources_in_use(self):
+        async with self.pool.use("a"):
+            self.now = IDLE_TIMEOUT * 10
+            self.assertEqual([], await self.pool.close_idle())
+
+        self.assertEqual([], await self.pool.close_idle())  # just used
+        self.now += IDLE_TIMEOUT
+        self.assertEqual(["a"], await self.pool.close_idle())
+
+    async def test_does_not_close_resources_used_while_closing_others(self):
+        await self.use("a")
+        await self.use("b")
+        self.now = IDLE_TIMEOUT
+        self.resources.may_close.clear()
+        closing = asyncio.ensure_future(self.pool.close_idle())
+        await asyncio.sleep(0.01)  # "a" is being closed; "b" is next
+
+        async with self.pool.use("b") as resource:
+            self.resources.may_close.set()
+            self.assertEqual(["a"], await closing)
+            self.assertNotIn(resource, self.resources.closed)
+            self.assertIn("b", self.pool)
+
+    async def test_failed_openings_are_retried(self):
+        self.resources.failing.add("a")
+        with self.assertRaises(IOError):
+            await self.use("a")
+        self.assertNotIn("a", self.pool)
+
+        self.resources.failing.clear()
+        self.assertEqual("resource-a", await self.use("a"))
+
+    async def test_close_all(self):
+        await self.use("a")
+        await self.use("b")
+
+        await self.pool.close_all()
+
+        self.assertEqual(["resource-a", "resource-b"], self.resources.closed)
+        self.assertEqual(0, len(self.pool))
@@ -0,0 +1,35 @@
+import unittest
+from datetime import datetime
+
+from src.entity.sale import Sale
+from src.render.sale_renderer import SaleRenderer
+
+
+class TestSaleRenderer(unittest.TestCase):
+    def setUp(self):
+        from_timestamp, to_timestamp = datetime(2020, 11, 1, 12).timestamp(), datetime(2020, 11, 8, 12).timestamp()
+        self.sale = Sale("E3622EA7", 5, 1000, "seller#0001", 1234, from_timestamp, to_timestamp, sale_uid="uid-1")
+        self.renderer = SaleRenderer()
+
+    def test_render(self):
+        self.assertEqual(
+            "User [seller#0001] offers [5] units of item [Daga de Plata] for [1000] coins, from [2020-11-01] until "
+            "[2020-11-08]. Sale's UID: uid-1",
+            self.renderer.render(self.sale),
+        )
+        self.assertEqual(self.renderer.render(self.sale), str(self.sale))
+
+    def test_lines_are_cached(self):
+        self.renderer.invalidate(self.sale.sale_uid)
+        hits = self.renderer.cache_stats.hits
+
+        first = self.renderer.render(self.sale)
+        self.assertIs(first, self.renderer.render(self.sale))
+        self.assertEqual(hits + 1, self.renderer.cache_stats.hits)
+
+    def test_render_list(self):
+        other = Sale("E3622EA7", 1, 10, "seller#0002", 1234, self.sale.from_date_timestamp, self.sale.to_date_timestamp)
+
+        rendered = self.renderer.render_list([self.sale, other])
+        self.assertEqual([str(self.sale), str(other)], rendered.split("\n"))
+        self.assertEqual("", self.renderer.render_list([]))
@@ -0,0 +1,389 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from tinydb import TinyDB
+
+from src.entity.sale import Sale
+from src.storage.indexed_sale_storage import IndexedSaleStorage
+from src.storage.journal_sale_storage import COMPACTING_SUFFIX, FSYNC_NEVER, SNAPSHOT_SUFFIX, JournalSaleStorage
+from src.storage.migration import MIGRATED_SUFFIX, migrate_tinydb_sales
+from src.storage.sqlite_sale_storage import SQLiteSaleStorage
+from src.storage.tinydb_sale_storage import TinyDBSaleStorage
+
+
+def sale(item_uid, to_date_timestamp=2000.0, sale_uid=None):
+    return Sale(item_uid, 1, 100, "seller#0001", 1234, 1000.0, to_date_timestamp, sale_uid=sale_uid)
+
+
+class SaleStorageTest:
+    """Behaviour every SaleStorage must have. Subclasses provide the storage under test."""
+
+    def build_storage(self, path):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.storage = self.build_storage(os.path.join(self.directory.name, "sale"))
+
+    def tearDown(self):
+        self.storage.close()
+        self.directory.cleanup()
+
+    def uids(self, sales):
+        return [s.sale_uid for s in sales]
+
+    def test_insert_and_get(self):
+        first, second, third = sale("AAAAAAAA"), sale("BBBBBBBB"), sale("AAAAAAAA")
+        self.storage.insert(first)
+        self.assertEqual(2, self.storage.insert_many([second, third]))
+
+        self.assertEqual(3, self.storage.count())
+        self.assertEqual(first.to_dict(), self.storage.get_by_sale_uid(first.sale_uid).to_dict())
+        self.assertIsNone(self.storage.get_by_sale_uid("nope"))
+        self.assertEqual(self.uids([first, second, third]), self.uids(self.storage.get_all()))
+        self.assertEqual(self.uids([first, third]), self.uids(self.storage.get_by_item_uids(["AAAAAAAA"])))
+        self.assertEqual(
+            self.uids([first, second, third]), self.uids(self.storage.get_by_item_uids(["BBBBBBBB", "AAAAAAAA"]))
+        )
+        self.assertEqual([], self.storage.get_by_item_uids([]))
+
+    def test_remove(self):
+        first, second = sale("AAAAAAAA"), sale("BBBBBBBB")
+        self.storage.insert_many([first, second])
+
+        self.assertEqual(1, self.storage.remove_by_sale_uid(first.sale_uid))
+        self.assertEqual(0, self.storage.remove_by_sale_uid(first.sale_uid))
+        self.assertEqual(self.uids([second]), self.uids(self.storage.get_all()))
+
+    def test_remove_expired(self):
+        expired, live = sale("AAAAAAAA", to_date_timestamp=1500.0), sale("AAAAAAAA", to_date_timestamp=2500.0)
+        self.storage.insert_many([expired, live])
+
+        self.assertEqual(1, self.storage.remove_expired(2000.0))
+        self.assertEqual(self.uids([live]), self.uids(self.storage.get_all()))
+
+    def test_claim(self):
+        first = sale("AAAAAAAA")
+        self.storage.insert(first)
+
+        self.assertEqual(first.to_dict(), self.storage.claim(first.sale_uid).to_dict())
+        self.assertIsNone(self.storage.claim(first.sale_uid))
+        self.assertEqual(0, self.storage.count())
+
+    def test_write_batch(self):
+        first, second, third = sale("AAAAAAAA"), sale("BBBBBBBB"), sale("AAAAAAAA")
+        self.storage.insert(first)
+
+        removed = self.storage.write_batch([second, third], [first.sale_uid, third.sale_uid, first.sale_uid, "nope"])
+        self.assertEqual([1, 1, 0, 0], removed)
+        self.assertEqual(self.uids([second]), self.uids(self.storage.get_all()))
+        self.assertEqual([], self.storage.write_batch([], []))
+
+
+class TestTinyDBSaleStorage(SaleStorageTest, unittest.TestCase):
+    def build_storage(self, path):
+        return TinyDBSaleStorage(path + ".json")
+
+
+class TestSQLiteSaleStorage(SaleStorageTest, unittest.TestCase):
+    def build_storage(self, path):
+        return SQLiteSaleStorage(path + ".sqlite3")
+
+    def test_lookups_use_indexes(self):
+        connection = self.storage._connection
+        for query in [
+            "SELECT * FROM sale WHERE sale_uid = 'x'",
+            "SELECT * FROM sale WHERE item_uid IN ('x', 'y')",
+            "DELETE FROM sale WHERE to_date_timestamp < 0",
+        ]:
+            plan = " ".join(str(row) for row in connection.execute("EXPLAIN QUERY PLAN " + query))
+            self.assertIn("USING INDEX", plan, query)
+
+    def test_many_item_uids(self):
+        sales = [sale("{:08X}".format(i)) for i in range(1200)]
+        self.storage.insert_many(sales)
+
+        item_uids = [s.item_uid for s in reversed(sales)]
+        self.assertEqual(self.uids(sales), self.uids(self.storage.get_by_item_uids(item_uids)))
+
+
+class TestJournalSaleStorage(SaleStorageTest, unittest.TestCase):
+    def build_storage(self, path):
+        self.path = path + ".journal"
+        return JournalSaleStorage(self.path, compaction_threshold=10**9)
+
+    def reopen(self, **kwargs):
+        self.storage.close()
+        self.storage = JournalSaleStorage(self.path, **kwargs)
+
+    def test_replays_journal(self):
+        first, second, third = sale("AAAAAAAA", to_date_timestamp=1500.0), sale("BBBBBBBB"), sale("CCCCCCCC")
+        self.storage.insert_many([first, second, third])
+        self.storage.remove_by_sale_uid(second.sale_uid)
+        self.storage.remove_expired(1600.0)
+
+        self.reopen()
+        self.assertEqual(self.uids([third]), self.uids(self.storage.get_all()))
+
+    def test_batch_is_a_single_append(self):
+        first, second = sale("AAAAAAAA"), sale("BBBBBBBB")
+        self.storage.insert(first)
+        size = os.path.getsize(self.path)
+
+        self.storage.write_batch([second], [first.sale_uid])
+        with open(self.path) as journal:
+            self.assertEqual(3, len(journal.readlines()))
+        self.assertGreater(os.path.getsize(self.path), size)
+
+        self.reopen()
+        self.assertEqual(self.uids([second]), self.uids(self.storage.get_all()))
+
+    def test_discards_torn_event(self):
+        first = sale("AAAAAAAA")
+        self.storage.insert(first)
+        self.storage.close()
+        with open(self.path, "a") as journal:
+            journal.write('{"op":"remove","sale_u')  # crashed mid-write
+
+        self.reopen()
+        self.assertEqual(self.uids([first]), self.uids(self.storage.get_all()))
+
+        second = sale("BBBBBBBB")
+        self.storage.insert(second)
+        self.reopen()
+        self.assertEqual(self.uids([first, second]), self.uids(self.storage.get_all()))
+
+    def test_compaction(self):
+        sales = [sale("AAAAAAAA") for _ in range(50)]
+        self.reopen(fsync=FSYNC_NEVER, compaction_threshold=2048)
+        for s in sales:
+            self.storage.insert(s)
+        self.storage.close()  # waits for any ongoing compaction
+
+        self.assertTrue(os.path.exists(self.path + SNAPSHOT_SUFFIX))
+        self.reopen()
+        self.assertEqual(self.uids(sales), self.uids(self.storage.get_all()))
+
+    def test_interrupted_compaction_loses_nothing(self):
+        first, second = sale("AAAAAAAA"), sale("BBBBBBBB")
+        self.storage.insert_many([first, second])
+        self.assertTrue(self.storage.compact(wait=True))
+
+        # as if the journal had been set aside, but the bot crashed before the new snapshot was written
+        self.storage.remove_by_sale_uid(first.sale_uid)
+        self.storage.close()
+        os.replace(self.path, self.path + COMPACTING_SUFFIX)
+        third = sale("CCCCCCCC")
+        with open(self.path, "w") as journal:
+            journal.write('{{"op":"create","sale":{}}}\n'.format(json.dumps(third.to_dict())))
+
+        self.reopen()
+        self.assertEqual(self.uids([second, third]), self.uids(self.storage.get_all()))
+        self.assertTrue(self.storage.compact(wait=True))
+        self.assertFalse(os.path.exists(self.path + COMPACTING_SUFFIX))
+
+        self.reopen()
+        self.assertEqual(self.uids([second, third]), self.uids(self.storage.get_all()))
+
+
+class TestMigration(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.tinydb_path = os.path.join(self.directory.name, "sale.json")
+        self.storage = SQLiteSaleStorage(os.path.join(self.directory.name, "sale.sqlite3"))
+
+    def tearDown(self):
+        self.storage.close()
+        self.directory.cleanup()
+
+    def test_migrates_once(self):
+        sales = [sale("AAAAAAAA"), sale("BBBBBBBB")]
+        db = TinyDB(self.tinydb_path)
+        db.insert_multiple(s.to_dict() for s in sales)
+        db.close()
+        self.storage.insert(sales[0])  # as if a former migration had been interrupted
+
+        self.assertEqual(1, migrate_tinydb_sales(self.tinydb_path, self.storage))
+        self.assertEqual([s.to_dict() for s in sales], [s.to_dict() for s in self.storage.get_all()])
+        self.assertFalse(os.path.exists(self.tinydb_path))
+        self.assertTrue(os.path.exists(self.tinydb_path + MIGRATED_SUFFIX))
+
+        self.assertEqual(0, migrate_tinydb_sales(self.tinydb_path, self.storage))
+
+
+class CountingSaleStorage(TinyDBSaleStorage):
+    """TinyDBSaleStorage that counts its reads."""
+
+    reads = 0
+
+    def get_by_sale_uid(self, sale_uid):
+        self.reads += 1
+        return super().get_by_sale_uid(sale_uid)
+
+    def get_all(self):
+        self.reads += 1
+        return super().get_all()
+
+    def get_by_item_uids(self, item_uids):
+        self.reads += 1
+        return super().get_by_item_uids(item_uids)
+
+    writes = 0
+
+    def remove_expired(self, timestamp):
+        self.writes += 1
+        return super().remove_expired(timestamp)
+
+
+class TestIndexedSaleStorage(SaleStorageTest, unittest.TestCase):
+    def build_storage(self, path):
+        self.now = 0.0
+        self.backing_storage = CountingSaleStorage(path + ".json")
+        return IndexedSaleStorage(self.backing_storage, clock=lambda: self.now)
+
+    def test_rebuilds_from_backing_storage(self):
+        sales = [sale("AAAAAAAA", to_date_timestamp=3000.0), sale("BBBBBBBB", to_date_timestamp=1500.0)]
+        self.backing_storage.insert_many(sales)
+
+        storage = IndexedSaleStorage(self.backing_storage, clock=lambda: self.now)
+        self.assertEqual(self.uids(sales), self.uids(storage.get_all()))
+        self.assertEqual(1, storage.remove_expired(2000.0))
+        self.assertEqual([], storage.check_consistency())
+
+    def test_reads_are_served_from_memory(self):
+        first = sale("AAAAAAAA")
+        self.storage.insert(first)
+        reads = self.backing_storage.reads
+
+        self.assertIs(first, self.storage.get_by_sale_uid(first.sale_uid))
+        self.assertEqual([first], self.storage.get_by_item_uids(["AAAAAAAA", "BBBBBBBB"]))
+        self.assertEqual([first], self.storage.get_all())
+        self.assertEqual(reads, self.backing_storage.reads)
+
+    def test_consistency_check(self):
+        self.storage.insert_many([sale("AAAAAAAA"), sale("BBBBBBBB")])
+        self.assertEqual([], self.storage.check_consistency())
+
+        self.backing_storage.insert(sale("CCCCCCCC"))  # behind the index's back
+        self.assertEqual(1, len(self.storage.check_consistency()))
+
+        self.storage.rebuild()
+        self.assertEqual([], self.storage.check_consistency())
+        self.assertEqual(3, self.storage.count())
+
+    def test_reads_hide_expired_sales(self):
+        expired, live = sale("AAAAAAAA", to_date_timestamp=1500.0), sale("AAAAAAAA", to_date_timestamp=2500.0)
+        self.storage.insert_many([expired, live])
+        self.now = 2000.0
+
+        self.assertIsNone(self.storage.get_by_sale_uid(expired.sale_uid))
+        self.assertEqual([live], self.storage.get_all())
+        self.assertEqual([live], self.storage.get_by_item_uids(["AAAAAAAA", "BBBBBBBB"]))
+
+    def test_expiries_are_removed_in_order_and_in_batches(self):
+        sales = [sale("AAAAAAAA", to_date_timestamp=float(t)) for t in [1300, 1100, 1200, 1400]]
+        self.storage.insert_many(sales)
+        self.storage.remove_by_sale_uid(sales[1].sale_uid)
+        self.assertEqual(1200.0, self.storage.next_expiry())
+
+        self.assertEqual(0, self.storage.remove_expired(1200.0))
+        self.assertEqual(0, self.backing_storage.writes)  # nothing expired: nothing written
+
+        self.assertEqual(2, self.storage.remove_expired(1350.0))
+        self.assertEqual(1, self.backing_storage.writes)
+        self.assertEqual([sales[3]], self.storage.get_all())
+        self.assertEqual(1400.0, self.storage.next_expiry())
+        self.assertEqual([], self.storage.check_consistency())
+
+        self.storage.remove_by_sale_uid(sales[3].sale_uid)
+        self.assertIsNone(self.storage.next_expiry())
+
+    def test_expiry_listeners_hear_of_sooner_expiries(self):
+        expiries = list()
+        self.storage.add_expiry_listener(expiries.append)
+
+        first = sale("AAAAAAAA", to_date_timestamp=1300.0)
+        self.storage.insert(first)
+        self.storage.insert(sale("AAAAAAAA", to_date_timestamp=1400.0))
+        self.storage.remove_by_sale_uid(first.sale_uid)
+        self.storage.write_batch([sale("AAAAAAAA", to_date_timestamp=1350.0)], [])
+
+        self.assertEqual([1300.0, 1350.0], expiries)
+
+    def test_expired_sales_cant_be_claimed(self):
+        expired = sale("AAAAAAAA", to_date_timestamp=1500.0)
+        self.storage.insert(expired)
+        self.now = 1600.0
+
+        self.assertIsNone(self.storage.claim(expired.sale_uid))
+
+    def test_only_one_thread_claims_a_sale(self):
+        contested = sale("AAAAAAAA")
+        self.storage.insert(contested)
+
+        claims = list()
+        start = threading.Barrier(16)
+
+        def claim():
+            start.wait()
+            claims.append(self.storage.claim(contested.sale_uid))
+
+        threads = [threading.Thread(target=claim) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([contested.sale_uid], [c.sale_uid for c in claims if c is not None])
+
+    def page_through(self, limit, item_uids=None):
+        pages, cursor = list(), None
+        while True:
+            page = self.storage.get_page(limit, cursor=cursor, item_uids=item_uids)
+            pages.append(self.uids(page.sales))
+            if page.next_cursor is None:
+                return pages
+            cursor = page.next_cursor
+
+    def test_pages_in_creation_order(self):
+        # inserted out of creation order
+        sales = [
+            Sale("AAAAAAAA" if i % 2 else "BBBBBBBB", 1, 100, "seller", 1234, 1000.0 + i, 2000.0) for i in range(7)
+        ]
+        self.storage.insert_many(reversed(sales))
+        uids = self.uids(sales)
+
+        self.assertEqual([uids[0:3], uids[3:6], uids[6:7]], self.page_through(3))
+        self.assertEqual([uids[1:7:2]], self.page_through(3, item_uids=["AAAAAAAA"]))
+        self.assertEqual([uids[0:2], uids[2:4], uids[4:6], uids[6:7]], self.page_through(2, ["BBBBBBBB", "AAAAAAAA"]))
+        self.assertEqual([[]], self.page_through(3, item_uids=["CCCCCCCC"]))
+
+    def test_pages_are_stable_across_writes(self):
+        sales = [Sale("AAAAAAAA", 1, 100, "seller", 1234, 1000.0 + i, 2000.0) for i in range(6)]
+        self.storage.insert_many(sales)
+
+        first = self.storage.get_page(3)
+        self.storage.remove_by_sale_uid(sales[2].sale_uid)  # the last one of the page
+        self.storage.remove_by_sale_uid(sales[4].sale_uid)
+        newer = Sale("AAAAAAAA", 1, 100, "seller", 1234, 1010.0, 2000.0)
+        self.storage.insert(newer)
+
+        second = self.storage.get_page(3, cursor=first.next_cursor)
+        self.assertEqual(self.uids([sales[3], sales[5], newer]), self.uids(second.sales))
+        self.assertIsNone(second.next_cursor)
+
+    def test_pages_hide_expired_sales(self):
+        expired, live = sale("AAAAAAAA", to_date_timestamp=1500.0), sale("AAAAAAAA", to_date_timestamp=2500.0)
+        self.storage.insert_many([expired, live])
+        self.now = 1600.0
+
+        self.assertEqual([self.uids([live])], self.page_through(1))
+        self.storage.remove_expired(1600.0)
+        self.assertEqual([], self.storage.check_consistency())
+
+    def test_malformed_cursor(self):
+        with self.assertRaises(ValueError):
+            self.storage.get_page(3, cursor="not a cursor")
@@ -0,0 +1,28 @@
+import unittest
+from datetime import date, datetime
+
+from src.entity.sale import Sale
+
+
+class TestSale(unittest.TestCase):
+    def setUp(self):
+        self.from_date = datetime(2020, 11, 1, 12, 30)
+        self.to_date = datetime(2020, 11, 8, 12, 30)
+        self.sale = Sale("E3622EA7", 5, 1000, "seller#0001", 1234, self.from_date.timestamp(), self.to_date.timestamp())
+
+    def test_persisted_form_round_trip(self):
+        persisted = self.sale.to_dict()
+
+        self.assertEqual(set(Sale.PERSISTED_FIELDS), set(persisted))
+        self.assertEqual(persisted, Sale.from_dict(persisted).to_dict())
+
+    def test_days(self):
+        self.assertEqual(date(2020, 11, 1), self.sale.from_day)
+        self.assertEqual(date(2020, 11, 8), self.sale.to_day)
+        self.assertEqual(self.from_date, self.sale.from_date)
+
+    def test_uids_are_interned(self):
+        persisted = self.sale.to_dict()
+        persisted["_item_uid"] = "".join("E3622EA7")  # a distinct, equal string; like decoded JSON would yield
+
+        self.assertIs(self.sale.item_uid, Sale.from_dict(persisted).item_uid)
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src.scheduler import stale_offer_cleanup_job
+from src.scheduler.stale_offer_cleanup_job import StaleOfferCleanupJob
+
+# how long the tests wait for the job to react
+REACTION_TIME = 0.5
+
+
+class FakeSaleHandler:
+    """Stands in for an AsyncSaleHandler holding a single sale, counting the cleanups the job runs."""
+
+    market = "test"
+
+    def __init__(self, next_expiry=None, failures=0):
+        self.next_expiry = next_expiry
+        self.failures = failures
+        self.runs = 0
+        self.listeners = list()
+
+    async def remove_stale_sales(self):
+        self.runs += 1
+        if self.failures:
+            self.failures -= 1
+            raise Exception("storage unavailable")
+        if self.next_expiry is not None and self.next_expiry <= time.time():
+            self.next_expiry = None
+            return 1
+        return 0
+
+    async def get_next_expiry(self):
+        return self.next_expiry
+
+    async def check_consistency(self):
+        return True
+
+    def add_expiry_listener(self, listener):
+        self.listeners.append(listener)
+
+    def expire_at(self, expiry):
+        """Notifies the listeners from another thread, the way the writer thread does."""
+        self.next_expiry = expiry
+        thread = threading.Thread(target=lambda: [listener(expiry) for listener in self.listeners])
+        thread.start()
+        thread.join()
+
+
+class TestStaleOfferCleanupJob(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.job = None
+
+    async def asyncTearDown(self):
+        if self.job:
+            self.job.stop()
+            await self.job.stopped()
+
+    async def test_runs_on_start(self):
+        sale_handler = FakeSaleHandler()
+        self.job = StaleOfferCleanupJob(sale_handler).start()
+
+        await asyncio.sleep(REACTION_TIME)
+        self.assertEqual(1, sale_handler.runs)
+
+    async def test_wakes_up_when_a_sooner_sale_expires(self):
+        sale_handler = FakeSaleHandler(next_expiry=time.time() + 3600)
+        self.job = StaleOfferCleanupJob(sale_handler).start()
+        await asyncio.sleep(REACTION_TIME)
+        self.assertEqual(1, sale_handler.runs)
+
+        with mock.patch.object(stale_offer_cleanup_job, "EXPIRY_BATCH_WINDOW", 0):
+            sale_handler.expire_at(time.time())
+            await asyncio.sleep(REACTION_TIME)
+
+        self.assertEqual(2, sale_handler.runs)
+
+    async def test_keeps_running_after_a_failure(self):
+        sale_handler = FakeSaleHandler(failures=1)
+        with mock.patch.object(stale_offer_cleanup_job, "RETRY_DELAY", 0):
+            self.job = StaleOfferCleanupJob(sale_handler).start()
+            await asyncio.sleep(REACTION_TIME)
+
+        self.assertEqual(2, sale_handler.runs)
+        self.assertFalse(self.job._task.done())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from src.aux.token_bucket import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.bucket = TokenBucket(rate=2, capacity=3, clock=lambda: self.now)
+
+    def test_bursts_then_paces(self):
+        self.assertEqual([0, 0, 0], [self.bucket.reserve() for _ in range(3)])
+        self.assertEqual([0.5, 1.0, 1.5], [self.bucket.reserve() for _ in range(3)])
+
+    def test_refills_up_to_capacity(self):
+        for _ in range(3):
+            self.bucket.reserve()
+
+        self.now = 1
+        self.assertEqual(2, self.bucket.tokens)
+        self.now = 100
+        self.assertEqual(3, self.bucket.tokens)
+
+    def test_block(self):
+        self.bucket.block(5)
+
+        self.assertEqual(5, self.bucket.reserve())
+        self.now = 5
+        self.assertEqual(0.5, self.bucket.reserve())
+
+    def test_rejects_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0, capacity=1)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, capacity=0)
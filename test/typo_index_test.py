@@ -0,0 +1,49 @@
+import unittest
+
+from src.entity.item import Item
+from src.handler.item import ItemHandler
+from src.index.typo import TypoIndex, edit_distance
+
+
+class TestEditDistance(unittest.TestCase):
+    def test_distances(self):
+        self.assertEqual(0, edit_distance("daga", "daga", 2))
+        self.assertEqual(1, edit_distance("dgaa", "daga", 2))  # transposition
+        self.assertEqual(1, edit_distance("espda", "espada", 2))  # insertion
+        self.assertEqual(2, edit_distance("azl", "azul ", 2))
+
+    def test_stops_beyond_max_distance(self):
+        self.assertEqual(3, edit_distance("daga", "espada larga", 2))
+        self.assertEqual(2, edit_distance("abcdef", "xyzdef", 1))
+
+
+class TestTypoIndex(unittest.TestCase):
+    def setUp(self):
+        self.daga, self.espada, self.pocion = [
+            Item(name, 1) for name in ["Daga", "Espada Larga de Plata Reforzada", "Poción Azul"]
+        ]
+        self.index = TypoIndex([self.daga, self.espada, self.pocion])
+
+    def test_full_name_lookup(self):
+        self.assertEqual([(self.pocion, 1)], self.index.lookup("pocion azl"))
+        self.assertEqual([(self.espada, 2)], self.index.lookup("espda larga de plata reforzda"))
+
+    def test_word_lookup(self):
+        self.assertEqual([(self.espada, 1)], self.index.lookup("plta"))
+        self.assertEqual([(self.daga, 1)], self.index.lookup("dgaa"))
+
+    def test_max_distance(self):
+        self.assertEqual([], self.index.lookup("dgaa", max_distance=0))
+        self.assertEqual([], self.index.lookup("xyzzy"))
+
+    def test_invalid_prefix_length(self):
+        with self.assertRaises(ValueError):
+            TypoIndex([], max_distance=2, prefix_length=2)
+
+
+class TestTypoFallback(unittest.TestCase):
+    def test_did_you_mean(self):
+        results = ItemHandler().ranked_search("dgaa")
+
+        self.assertEqual("Daga", results[0].item.name)
+        self.assertEqual(ItemHandler().ranked_search("xyzzy"), [])
@@ -0,0 +1,76 @@
+import asyncio
+import types
+import unittest
+
+import discord
+
+from src.outbound.user_resolver import UserResolver
+
+# how long the fake client takes to fetch a user
+FETCH_TIME = 0.05
+TTL = 60
+
+
+class FakeClient:
+    """A bot with some users in its member cache, and some more that can only be fetched; after a while."""
+
+    def __init__(self, cached, fetchable):
+        self.cached = cached
+        self.fetchable = fetchable
+        self.fetches = list()
+        self.failing = False
+
+    def get_user(self, user_id):
+        return self.cached.get(user_id)
+
+    async def fetch_user(self, user_id):
+        self.fetches.append(user_id)
+        await asyncio.sleep(FETCH_TIME)
+        if self.failing:
+            raise discord.HTTPException(types.SimpleNamespace(status=500, reason="Server Error"), "Try again")
+        if user_id not in self.fetchable:
+            raise discord.NotFound(types.SimpleNamespace(status=404, reason="Not Found"), "Unknown User")
+        return self.fetchable[user_id]
+
+
+class TestUserResolver(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.client = FakeClient(cached={1: "member"}, fetchable={2: "stranger"})
+        self.resolver = UserResolver(maxsize=10, ttl=TTL, clock=lambda: self.now)
+
+    async def test_resolves_members_without_fetching(self):
+        self.assertEqual("member", await self.resolver.resolve(self.client, 1))
+        self.assertEqual([], self.client.fetches)
+
+    async def test_falls_back_to_fetching_and_caches(self):
+        self.assertEqual("stranger", await self.resolver.resolve(self.client, 2))
+        self.assertEqual("stranger", await self.resolver.resolve(self.client, 2))
+
+        self.assertEqual([2], self.client.fetches)
+        self.assertEqual(1, self.resolver.cache_stats.hits)
+
+    async def test_fetched_users_expire(self):
+        await self.resolver.resolve(self.client, 2)
+        self.now = TTL
+
+        self.assertEqual("stranger", await self.resolver.resolve(self.client, 2))
+        self.assertEqual([2, 2], self.client.fetches)
+
+    async def test_concurrent_resolutions_share_a_fetch(self):
+        users = await asyncio.gather(*(self.resolver.resolve(self.client, 2) for _ in range(10)))
+
+        self.assertEqual(["stranger"] * 10, users)
+        self.assertEqual([2], self.client.fetches)
+
+    async def test_unknown_users_resolve_to_none(self):
+        self.assertIsNone(await self.resolver.resolve(self.client, 3))
+
+    async def test_failed_fetches_are_raised_and_retried(self):
+        self.client.failing = True
+        with self.assertRaises(discord.HTTPException):
+            await self.resolver.resolve(self.client, 2)
+
+        self.client.failing = False
+        self.assertEqual("stranger", await self.resolver.resolve(self.client, 2))
+        self.assertEqual([2, 2], self.client.fetches)